@@ -0,0 +1,114 @@
+"""
+Analyse d'une configuration (/analyze) : viabilité, tendance, solutions de stabilité,
+recommandations et risques.
+
+Indépendant de la couche HTTP : utilisé par l'endpoint /analyze et par la file de jobs.
+"""
+from typing import Any, Dict, Optional
+
+from cancellation import CancellationToken
+from result_cache import simulate_config_cached
+from simulation_engine import DetailLevel, analyze_stock_trend, find_stability_solutions, result_statistics
+
+
+def analyze_configuration(
+    config_dict: Dict,
+    search_width: int = 1,
+    cancel: Optional[CancellationToken] = None
+) -> Dict[str, Any]:
+    """
+    Analyse une configuration et fournit des recommandations.
+
+    Args:
+        config_dict: Configuration (mêmes clés que run_simulation_with_config)
+        search_width: Points évalués ensemble par tour dans la recherche de stabilité
+        cancel: Jeton d'annulation de la recherche de stabilité (OperationCancelled)
+
+    Returns:
+        - viability: Analyse de viabilité de la configuration
+        - trend_analysis: Analyse de tendance sur 30 jours
+        - stability_solutions: Solutions pour atteindre la stabilité
+        - recommendations: Recommandations d'amélioration
+        - risks: Risques identifiés
+        - metrics: Jours de stock moyens, taille et fréquence des commandes
+    """
+    # Exécuter une simulation pour analyser
+    result = simulate_config_cached(config_dict, detail_level=DetailLevel.STATS)
+    stats = result_statistics(result)
+
+    # Analyse de tendance sur 30 jours
+    trend_analysis = analyze_stock_trend(result.daily_details, 30)
+
+    # Analyse de stabilité et solutions proposées
+    stability_solutions = find_stability_solutions(config_dict, search_width=search_width, cancel=cancel)
+
+    # Analyse de viabilité globale
+    is_viable = trend_analysis["is_viable"] and stats["stockouts_count"] == 0
+    service_level = ((config_dict["simulation_days"] - stats["stockouts_count"]) /
+                    config_dict["simulation_days"] * 100)
+
+    # Recommandations
+    recommendations = []
+    risks = []
+
+    # Analyse basée sur la tendance
+    if trend_analysis["trend"] == "descending":
+        risks.append(f"📉 {trend_analysis['description']}")
+        recommendations.append("Augmenter la quantité maximum par livraison")
+        recommendations.append("Réduire le délai de livraison si possible")
+        recommendations.append("Augmenter le stock initial")
+    elif trend_analysis["trend"] == "ascending":
+        if stats["average_stock"] > config_dict["max_stock"] * 0.8:
+            recommendations.append("Stock élevé : considérer une réduction du seuil de réapprovisionnement")
+
+    if stats["stockouts_count"] > 0:
+        risks.append(f"⚠️ {stats['stockouts_count']} jour(s) de rupture de stock détecté(s)")
+        recommendations.append("Augmenter le seuil de réapprovisionnement")
+
+    if stats["min_stock"] < 10 and stats["min_stock"] >= 0:
+        risks.append(f"Stock minimum très bas: {stats['min_stock']:.2f} unités")
+        recommendations.append("Augmenter le seuil de réapprovisionnement pour plus de sécurité")
+
+    # Analyser le taux de rotation
+    avg_days_of_stock = stats["average_stock"] / config_dict["daily_consumption"] if config_dict["daily_consumption"] > 0 else 0
+    if avg_days_of_stock > 14:
+        recommendations.append(f"Stock moyen élevé ({avg_days_of_stock:.1f} jours): envisager de réduire le seuil")
+    elif avg_days_of_stock < 5 and avg_days_of_stock > 0:
+        risks.append(f"Stock moyen faible ({avg_days_of_stock:.1f} jours): risque de rupture")
+
+    # Efficacité des commandes
+    if stats["total_orders"] > 0:
+        avg_order_size = stats["total_ordered"] / stats["total_orders"]
+        if avg_order_size < config_dict["max_order_quantity"] * 0.5:
+            recommendations.append("Les commandes sont souvent petites: optimiser la politique de commande")
+
+    # Ajouter les solutions de stabilité aux recommandations
+    if stability_solutions["solutions"]:
+        for solution in stability_solutions["solutions"]:
+            if solution["type"] not in ["consumption_ok", "max_order_ok"]:
+                recommendations.append(solution["message"])
+
+    return {
+        "viability": {
+            "is_viable": is_viable,
+            "service_level": round(service_level, 2),
+            "status": "✅ Configuration viable" if is_viable else "❌ Configuration non viable"
+        },
+        "trend_analysis": trend_analysis,
+        "stability_solutions": {
+            "message": stability_solutions["message"],
+            "current_consumption": stability_solutions["current_consumption"],
+            "current_max_order": stability_solutions["current_max_order"],
+            "max_viable_consumption": stability_solutions["max_viable_consumption"],
+            "min_required_max_order": stability_solutions["min_required_max_order"],
+            "solutions": stability_solutions["solutions"],
+            "search_statistics": stability_solutions["search_statistics"]
+        },
+        "recommendations": recommendations if recommendations else ["✅ Configuration optimale"],
+        "risks": risks if risks else ["✅ Aucun risque identifié"],
+        "metrics": {
+            "average_days_of_stock": round(avg_days_of_stock, 2) if avg_days_of_stock > 0 else 0,
+            "average_order_size": round(stats["total_ordered"] / stats["total_orders"], 2) if stats["total_orders"] > 0 else 0,
+            "order_frequency": round(stats["total_orders"] / (config_dict["simulation_days"] / 7), 2)  # commandes par semaine
+        }
+    }
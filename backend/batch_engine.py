@@ -0,0 +1,396 @@
+"""
+Moteur de simulation par lots : exécute N configurations en une seule passe.
+
+Toutes les configurations avancent ensemble, jour par jour, avec des tableaux NumPy
+indexés sur un axe "configuration" (stock, livraisons en attente, démarrage des ventes,
+décisions de commande). Les règles sont exactement celles d'InventorySimulator :
+les statistiques et les séries quotidiennes produites sont identiques.
+
+Les décisions de commande passent par l'étape vectorisée (`order_batch`) de la politique
+de réapprovisionnement de chaque configuration ; les configurations sont regroupées par
+type de politique pour cette étape.
+"""
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from replenishment import ReplenishmentPolicy, SingleOrderMaxPolicy, stack_parameters
+from simulation_engine import (
+    SimulationConfig,
+    SimulationResult,
+    DailySeries,
+    Order,
+    WorkingCalendar,
+    config_from_dict,
+)
+
+
+@dataclass
+class BatchResult:
+    """
+    Résultats d'un lot de simulations, stockés en tableaux (configuration x jour).
+
+    Les colonnes au-delà de simulation_days d'une configuration ne sont pas significatives.
+    Les identifiants valent 0 quand il n'y a pas de commande/livraison.
+    """
+    configs: List[SimulationConfig]
+    start_dates: List[datetime]
+    policies: List[ReplenishmentPolicy]
+    simulation_days: np.ndarray
+    stock_start: np.ndarray
+    deliveries: np.ndarray
+    consumption: np.ndarray
+    stock_end: np.ndarray
+    order_quantity: np.ndarray
+    order_id: np.ndarray
+    order_delivery_day: np.ndarray  # Jour (index) de livraison prévu de la commande passée, -1 sinon
+    delivery_id: np.ndarray
+    is_working_day: np.ndarray
+    has_threshold_crossed: np.ndarray
+    has_stockout: np.ndarray
+    final_stock: np.ndarray
+    stockouts_count: np.ndarray
+    total_ordered: np.ndarray
+    average_stock: np.ndarray
+    min_stock: np.ndarray
+    max_stock: np.ndarray
+    total_events: np.ndarray
+    total_orders: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.configs)
+
+    def statistics(self, index: int) -> Dict:
+        """Statistiques d'une configuration, au format de run_simulation_with_config"""
+        return {
+            "final_stock": float(self.final_stock[index]),
+            "stockouts_count": int(self.stockouts_count[index]),
+            "total_ordered": int(self.total_ordered[index]),
+            "average_stock": float(self.average_stock[index]),
+            "min_stock": float(self.min_stock[index]),
+            "max_stock": float(self.max_stock[index]),
+            "total_events": int(self.total_events[index]),
+            "total_orders": int(self.total_orders[index])
+        }
+
+    def daily_series(self, index: int) -> DailySeries:
+        """Copie les séries quotidiennes d'une configuration dans une DailySeries"""
+        days = int(self.simulation_days[index])
+        series = DailySeries(self.start_dates[index], days)
+        for name in ("stock_start", "deliveries", "consumption", "stock_end", "order_quantity",
+                     "order_id", "delivery_id", "is_working_day", "has_threshold_crossed", "has_stockout"):
+            column = getattr(series, name)
+            values = getattr(self, name)[index, :days].astype(_COLUMN_DTYPES[column.typecode])
+            setattr(series, name, array(column.typecode, values.tobytes()))
+        return series
+
+    def orders(self, index: int) -> List[Order]:
+        """Reconstruit la liste des commandes d'une configuration"""
+        days = int(self.simulation_days[index])
+        start_date = self.start_dates[index]
+        orders = []
+        for day in np.flatnonzero(self.order_id[index, :days]):
+            delivery_day = int(self.order_delivery_day[index, day])
+            orders.append(Order(
+                order_id=int(self.order_id[index, day]),
+                order_date=start_date + timedelta(days=int(day)),
+                delivery_date=start_date + timedelta(days=delivery_day),
+                quantity=int(self.order_quantity[index, day]),
+                delivered=bool(day < delivery_day < days)
+            ))
+        return orders
+
+    def result(self, index: int) -> SimulationResult:
+        """Vue SimulationResult d'une configuration (sans événements)"""
+        series = self.daily_series(index)
+        stats = self.statistics(index)
+        return SimulationResult(
+            orders=self.orders(index),
+            daily_details=series.rows(),
+            final_stock=stats["final_stock"],
+            stockouts_count=stats["stockouts_count"],
+            total_ordered=stats["total_ordered"],
+            average_stock=stats["average_stock"],
+            min_stock=stats["min_stock"],
+            max_stock=stats["max_stock"],
+            total_events=stats["total_events"],
+            series=series
+        )
+
+
+_COLUMN_DTYPES = {'d': np.float64, 'q': np.int64, 'b': np.int8}
+
+
+def simulate_batch(
+    configs: Sequence[Union[Dict, SimulationConfig]],
+    start_date: Optional[datetime] = None,
+    closed_weekdays: Iterable[int] = (6,),
+    holidays: Iterable[Union[date, datetime]] = (),
+    demand: Optional[np.ndarray] = None,
+    policies: Union[None, ReplenishmentPolicy, Sequence[ReplenishmentPolicy]] = None
+) -> BatchResult:
+    """
+    Simule toutes les configurations ensemble.
+
+    Args:
+        configs: Dictionnaires (comme run_simulation_with_config) ou SimulationConfig
+        start_date: Date de début par défaut (sinon aujourd'hui), utilisée quand une
+            configuration ne précise pas la sienne
+        closed_weekdays: Jours de la semaine fermés (dimanche par défaut)
+        holidays: Jours fériés fermés
+        demand: Demande réalisée (configuration x jour), optionnelle. Les décisions de commande
+            restent fondées sur daily_consumption ; seule la consommation appliquée change.
+        policies: Politique de réapprovisionnement commune, ou une par configuration
+            (règle historique par défaut)
+
+    Returns:
+        BatchResult avec les séries (configuration x jour) et les statistiques
+    """
+    default_start = start_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    parsed: List[SimulationConfig] = []
+    start_dates: List[datetime] = []
+    for config in configs:
+        if isinstance(config, SimulationConfig):
+            parsed.append(config)
+            start_dates.append(default_start)
+        else:
+            sim_config, config_start = config_from_dict(config)
+            parsed.append(sim_config)
+            start_dates.append(config_start or default_start)
+
+    n = len(parsed)
+    if policies is None or isinstance(policies, ReplenishmentPolicy):
+        policies = [policies or SingleOrderMaxPolicy()] * n
+    elif len(policies) != n:
+        raise ValueError("Il faut une politique par configuration")
+    simulation_days = np.array([c.simulation_days for c in parsed], dtype=np.int64)
+    horizon = int(simulation_days.max()) if n else 0
+    shape = (n, horizon)
+
+    result = BatchResult(
+        configs=parsed,
+        start_dates=start_dates,
+        policies=list(policies),
+        simulation_days=simulation_days,
+        stock_start=np.zeros(shape),
+        deliveries=np.zeros(shape),
+        consumption=np.zeros(shape),
+        stock_end=np.zeros(shape),
+        order_quantity=np.zeros(shape, dtype=np.int64),
+        order_id=np.zeros(shape, dtype=np.int64),
+        order_delivery_day=np.full(shape, -1, dtype=np.int64),
+        delivery_id=np.zeros(shape, dtype=np.int64),
+        is_working_day=np.zeros(shape, dtype=bool),
+        has_threshold_crossed=np.zeros(shape, dtype=bool),
+        has_stockout=np.zeros(shape, dtype=bool),
+        final_stock=np.zeros(n),
+        stockouts_count=np.zeros(n, dtype=np.int64),
+        total_ordered=np.zeros(n, dtype=np.int64),
+        average_stock=np.zeros(n),
+        min_stock=np.zeros(n),
+        max_stock=np.zeros(n),
+        total_events=np.zeros(n, dtype=np.int64),
+        total_orders=np.zeros(n, dtype=np.int64)
+    )
+
+    # Une passe par date de début : le calendrier des jours ouvrés est partagé dans un groupe
+    groups: Dict[datetime, List[int]] = {}
+    for i, group_start in enumerate(start_dates):
+        groups.setdefault(group_start, []).append(i)
+    holidays = tuple(holidays)
+    for group_start, rows in groups.items():
+        calendar = WorkingCalendar(group_start, closed_weekdays=closed_weekdays, holidays=holidays)
+        rows = np.array(rows, dtype=np.int64)
+        _simulate_group(result, rows, calendar, demand[rows] if demand is not None else None)
+
+    return result
+
+
+def _delivery_day_table(calendar: WorkingCalendar, days: int, lead_times: np.ndarray) -> np.ndarray:
+    """
+    Pour chaque délai (en jours ouvrés) et chaque jour d, l'index du jour de livraison
+    d'une commande passée le jour d (lecture directe dans l'index du calendrier).
+    """
+    if days > 0 and len(lead_times):
+        calendar.add_working_days(days - 1, int(lead_times.max()))
+    ordinal = np.frombuffer(calendar.ordinal, dtype=np.int64)
+    working_days = np.frombuffer(calendar.working_days, dtype=np.int64)
+    table = np.empty((len(lead_times), days), dtype=np.int64)
+    day_index = np.arange(days)
+    for row, lead in enumerate(lead_times):
+        if lead <= 0:
+            table[row] = day_index
+        else:
+            table[row] = working_days[ordinal[:days] + lead - 1]
+    return table
+
+
+def _policy_groups(
+    policies: List[ReplenishmentPolicy],
+    configs: List[SimulationConfig]
+) -> List[Tuple[ReplenishmentPolicy, Optional[np.ndarray], Dict[str, np.ndarray]]]:
+    """
+    Regroupe les configurations par type de politique : (politique, lignes, paramètres empilés).
+    Lignes None quand toutes les configurations partagent le même type (pas d'indexation).
+    """
+    by_type: Dict[type, List[int]] = {}
+    for i, policy in enumerate(policies):
+        by_type.setdefault(type(policy), []).append(i)
+    groups = []
+    for members in by_type.values():
+        params = stack_parameters([policies[i].parameters(configs[i]) for i in members])
+        index = None if len(by_type) == 1 else np.array(members, dtype=np.int64)
+        groups.append((policies[members[0]], index, params))
+    return groups
+
+
+def _policy_step(
+    groups: List[Tuple[ReplenishmentPolicy, Optional[np.ndarray], Dict[str, np.ndarray]]],
+    n: int,
+    stock: np.ndarray,
+    on_order: np.ndarray,
+    pending: np.ndarray,
+    working_day: int,
+    lead_days: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Étape vectorisée de chaque politique : (masque des commandes, quantités)"""
+    if len(groups) == 1 and groups[0][1] is None:
+        policy, _, params = groups[0]
+        return policy.order_batch(params, stock, on_order, pending, working_day, lead_days)
+    ordering = np.zeros(n, dtype=bool)
+    quantity = np.zeros(n, dtype=np.int64)
+    for policy, index, params in groups:
+        ordering[index], quantity[index] = policy.order_batch(
+            params, stock[index], on_order[index], pending[index], working_day, lead_days[index]
+        )
+    return ordering, quantity
+
+
+def _simulate_group(
+    result: BatchResult,
+    rows: np.ndarray,
+    calendar: WorkingCalendar,
+    demand: Optional[np.ndarray] = None
+) -> None:
+    """Simule les configurations `rows` (même date de début) et remplit `result`"""
+    configs = [result.configs[i] for i in rows]
+    days = result.simulation_days[rows]
+    horizon = int(days.max()) if len(days) else 0
+
+    daily_consumption = np.array([c.daily_consumption for c in configs], dtype=np.float64)
+    reorder_threshold = np.array([c.reorder_threshold for c in configs], dtype=np.float64)
+    min_stock_to_start_sales = np.array([c.min_stock_to_start_sales for c in configs], dtype=np.float64)
+    lead_times = np.array([c.delivery_lead_time_days for c in configs], dtype=np.int64)
+
+    calendar.extend(horizon)
+    unique_leads, lead_index = np.unique(lead_times, return_inverse=True)
+    delivery_table = _delivery_day_table(calendar, horizon, unique_leads)
+    is_working_day = np.frombuffer(calendar.working, dtype=np.int8)[:horizon].astype(bool)
+    ordinal = np.frombuffer(calendar.ordinal, dtype=np.int64)
+
+    n = len(rows)
+    policy_groups = _policy_groups([result.policies[i] for i in rows], configs)
+    stock = np.array([c.initial_stock for c in configs], dtype=np.float64)
+    sales_started = stock > 0
+    pending = np.zeros(n, dtype=np.int64)  # Nombre de commandes en attente
+    on_order = np.zeros(n, dtype=np.int64)  # Quantité commandée non livrée
+    next_order_id = np.ones(n, dtype=np.int64)
+    stockout_events = np.zeros((n, horizon), dtype=bool)
+    events = np.zeros((n, horizon), dtype=np.int64)
+    announce_start = min_stock_to_start_sales > 0
+
+    stock_start = np.empty((n, horizon))
+    # Les livraisons (quantité, identifiant) sont inscrites à leur jour d'arrivée dès la commande :
+    # avec un délai fixe, deux commandes d'une configuration n'arrivent jamais le même jour
+    deliveries = np.zeros((n, horizon))
+    consumption = np.zeros((n, horizon))
+    stock_end = np.empty((n, horizon))
+    order_quantity = np.zeros((n, horizon), dtype=np.int64)
+    order_id = np.zeros((n, horizon), dtype=np.int64)
+    order_delivery_day = np.full((n, horizon), -1, dtype=np.int64)
+    delivery_id = np.zeros((n, horizon), dtype=np.int64)
+    has_threshold_crossed = np.zeros((n, horizon), dtype=bool)
+
+    for day in range(horizon):
+        working = is_working_day[day]
+        day_events = np.zeros(n, dtype=np.int64)
+
+        if working:
+            # 1. Livraisons du jour
+            arriving = delivery_id[:, day] > 0
+            if arriving.any():
+                stock = np.where(arriving, stock + deliveries[:, day], stock)
+                pending -= arriving
+                on_order -= deliveries[:, day].astype(np.int64)
+                day_events += arriving
+
+            # 2. Commande selon la politique de chaque configuration
+            delivery_day = delivery_table[lead_index, day]
+            lead_days = delivery_day - day
+            ordering, quantity = _policy_step(policy_groups, n, stock, on_order, pending, int(ordinal[day]) - 1, lead_days)
+            if ordering.any():
+                order_quantity[:, day] = np.where(ordering, quantity, 0)
+                order_id[:, day] = np.where(ordering, next_order_id, 0)
+                order_delivery_day[:, day] = np.where(ordering, delivery_day, -1)
+                # Une commande à délai nul n'est jamais livrée (comme dans InventorySimulator)
+                due = np.flatnonzero(ordering & (delivery_day > day) & (delivery_day < horizon))
+                deliveries[due, delivery_day[due]] = quantity[due]
+                delivery_id[due, delivery_day[due]] = next_order_id[due]
+                pending += ordering
+                on_order += np.where(ordering, quantity, 0)
+                next_order_id += ordering
+                day_events += ordering
+
+        stock_start[:, day] = stock  # Stock après livraisons = stock début de journée
+
+        # 3. Consommation (seulement si les ventes ont démarré)
+        starting = ~sales_started & (stock >= min_stock_to_start_sales)
+        sales_started = sales_started | starting
+        stock_before = stock
+        today_demand = daily_consumption if demand is None else demand[:, day]
+        stock = np.where(sales_started, stock - today_demand, stock)
+        consumption[:, day] = np.where(sales_started, today_demand, 0.0)
+        crossed = (stock_before >= reorder_threshold) & (stock < reorder_threshold)
+        stockout_events[:, day] = sales_started & (stock < 0)
+        has_threshold_crossed[:, day] = crossed
+        stock_end[:, day] = stock
+
+        # Nombre d'événements générés par InventorySimulator pour cette journée
+        day_events += starting & announce_start
+        day_events += ~sales_started
+        day_events += sales_started * (1 + stockout_events[:, day] + crossed)
+        events[:, day] = day_events
+
+    # Écrire les colonnes du groupe dans le résultat global
+    result.stock_start[rows, :horizon] = stock_start
+    result.deliveries[rows, :horizon] = deliveries
+    result.consumption[rows, :horizon] = consumption
+    result.stock_end[rows, :horizon] = stock_end
+    result.order_quantity[rows, :horizon] = order_quantity
+    result.order_id[rows, :horizon] = order_id
+    result.order_delivery_day[rows, :horizon] = order_delivery_day
+    result.delivery_id[rows, :horizon] = delivery_id
+    result.is_working_day[rows, :horizon] = is_working_day
+    result.has_threshold_crossed[rows, :horizon] = has_threshold_crossed
+    result.has_stockout[rows, :horizon] = stock_end < 0
+
+    # Statistiques, calculées sur l'horizon propre à chaque configuration
+    in_horizon = np.arange(horizon) < days[:, None]
+    has_days = days > 0
+    last_day = np.maximum(days - 1, 0)
+    row_index = np.arange(n)
+    # Somme cumulée séquentielle : même ordre d'addition que sum() sur l'historique
+    cumulative = np.cumsum(stock_end, axis=1) if horizon else np.zeros((n, 1))
+    initial_stock = np.array([c.initial_stock for c in configs], dtype=np.float64)
+
+    result.final_stock[rows] = np.where(has_days, stock_end[row_index, last_day] if horizon else 0.0, initial_stock)
+    result.average_stock[rows] = np.where(has_days, cumulative[row_index, last_day] / np.maximum(days, 1), 0.0)
+    result.min_stock[rows] = np.where(has_days, np.where(in_horizon, stock_end, np.inf).min(axis=1, initial=np.inf), 0.0)
+    result.max_stock[rows] = np.where(has_days, np.where(in_horizon, stock_end, -np.inf).max(axis=1, initial=-np.inf), 0.0)
+    result.stockouts_count[rows] = (stockout_events & in_horizon).sum(axis=1)
+    result.total_ordered[rows] = np.where(in_horizon, order_quantity, 0).sum(axis=1)
+    result.total_orders[rows] = ((order_id > 0) & in_horizon).sum(axis=1)
+    result.total_events[rows] = np.where(in_horizon, events, 0).sum(axis=1)
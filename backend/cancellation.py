@@ -0,0 +1,106 @@
+"""
+Annulation coopérative des calculs longs (recherches de /optimize et /analyze).
+
+Le calcul reçoit un CancellationToken et le vérifie entre deux simulations (l'oracle de
+viabilité le fait avant chaque évaluation) : un calcul abandonné s'arrête donc au plus
+une simulation (ou un lot) plus tard, en levant OperationCancelled.
+
+Côté API, run_cancellable exécute le calcul dans un thread (celui d'une voie bornée
+d'executors si elle est fournie) et déclenche le jeton quand le client se déconnecte ou
+quand une requête plus récente de la même session (en-tête X-Session-Id) le remplace.
+"""
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class OperationCancelled(Exception):
+    """Le calcul a été annulé (client déconnecté ou requête remplacée)"""
+
+
+class CancellationToken:
+    """Drapeau d'annulation partagé entre la requête et le calcul (utilisable depuis plusieurs threads)"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "Calcul annulé") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled(self.reason)
+
+
+class SessionRegistry:
+    """Calcul en cours par clé de session : en démarrer un nouveau annule le précédent"""
+
+    def __init__(self):
+        self._tokens: Dict[Hashable, CancellationToken] = {}
+        self._lock = threading.Lock()
+
+    def start(self, key: Hashable) -> CancellationToken:
+        token = CancellationToken()
+        with self._lock:
+            previous = self._tokens.get(key)
+            self._tokens[key] = token
+        if previous is not None:
+            previous.cancel("Requête remplacée par une requête plus récente")
+        return token
+
+    def finish(self, key: Hashable, token: CancellationToken) -> None:
+        with self._lock:
+            if self._tokens.get(key) is token:
+                del self._tokens[key]
+
+    def active(self) -> int:
+        with self._lock:
+            return len(self._tokens)
+
+
+sessions = SessionRegistry()
+
+
+async def run_cancellable(
+    compute: Callable[[CancellationToken], Any],
+    request: Optional[Any] = None,
+    session_key: Optional[Hashable] = None,
+    poll_interval: float = 0.1,
+    lane: Optional[Any] = None,
+    client: Optional[str] = None
+) -> Any:
+    """
+    Exécute compute(token) dans un thread et attend son résultat.
+
+    Le jeton est déclenché si `request` (Request Starlette) se déconnecte, ou si un autre
+    calcul démarre avec la même `session_key`. compute lève alors OperationCancelled,
+    qui est propagée à l'appelant.
+
+    Avec `lane` (executors.ExecutorLane), le calcul passe par la voie et peut être refusé
+    (LaneOverloaded) ; le calcul précédent de la session est annulé dans tous les cas.
+    """
+    token = sessions.start(session_key) if session_key is not None else CancellationToken()
+    try:
+        if lane is not None:
+            task = lane.submit(compute, token, client=client)
+        else:
+            task = asyncio.ensure_future(asyncio.to_thread(compute, token))
+        while not task.done():
+            await asyncio.wait({task}, timeout=poll_interval)
+            if not task.done() and request is not None and await request.is_disconnected():
+                token.cancel("Client déconnecté")
+                break
+        return await task
+    except asyncio.CancelledError:
+        token.cancel("Requête interrompue")
+        raise
+    finally:
+        if session_key is not None:
+            sessions.finish(session_key, token)
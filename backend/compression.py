@@ -0,0 +1,147 @@
+"""
+Compression des réponses (brotli ou gzip selon Accept-Encoding).
+
+Middleware ASGI : la réponse est mise en mémoire puis compressée si elle dépasse
+COMPRESSION_MIN_SIZE octets. Les flux Server-Sent Events et les réponses déjà encodées
+passent sans modification. Un ETag fort reçoit le suffixe de l'encodage ("-gzip", "-br"),
+les deux représentations n'étant pas identiques à l'octet près. Toute autre réponse porte
+Vary: Accept-Encoding, compressée ou non (petite réponse, client sans encodage accepté),
+pour que les caches ne confondent pas les représentations.
+
+brotli est optionnel : sans le module, seul gzip est proposé.
+"""
+import gzip
+from typing import Dict, List, Optional
+
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+try:
+    import brotli
+except ImportError:  # Dépendance optionnelle
+    brotli = None
+
+
+def available_encodings() -> List[str]:
+    """Encodages proposés, par ordre de préférence à qualité égale"""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Encodage à utiliser pour l'en-tête Accept-Encoding (None : réponse non compressée)"""
+    if not accept_encoding:
+        return None
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, *parameters = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    candidates = [
+        (-qualities.get(coding, qualities.get("*", 0.0)), position, coding)
+        for position, coding in enumerate(available_encodings())
+    ]
+    quality, _, coding = min(candidates)
+    return coding if quality < 0 else None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """Compresse les réponses HTTP de plus de `minimum_size` octets"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            async def send_uncompressed(message):
+                if message["type"] == "http.response.start" and not _is_passthrough(message):
+                    message = {**message, "headers": _vary_headers(message.get("headers", []))}
+                await send(message)
+
+            await self.app(scope, receive, send_uncompressed)
+            return
+
+        start_message = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                if _is_passthrough(message):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            if len(body) < self.minimum_size:
+                await send({**start_message, "headers": _vary_headers(start_message.get("headers", []))})
+                await send({"type": "http.response.body", "body": body})
+                return
+            body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            await send({**start_message, "headers": _compressed_headers(start_message.get("headers", []), encoding, len(body))})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _is_passthrough(start_message) -> bool:
+    """Flux SSE ou réponse déjà encodée : ni compression ni Vary"""
+    headers = {key.lower(): value for key, value in start_message.get("headers", [])}
+    return headers.get(b"content-type", b"").startswith(b"text/event-stream") or b"content-encoding" in headers
+
+
+def _vary_headers(headers) -> list:
+    """En-têtes avec Accept-Encoding ajouté à Vary (un seul en-tête Vary)"""
+    result = []
+    vary = []
+    for key, value in headers:
+        if key.lower() == b"vary":
+            vary.append(value)
+        else:
+            result.append((key, value))
+    return result + [(b"vary", b", ".join(vary + [b"Accept-Encoding"]))]
+
+
+def _compressed_headers(headers, encoding: str, length: int) -> list:
+    """En-têtes de la réponse compressée : encodage, longueur, Vary et ETag suffixé"""
+    result = []
+    for key, value in headers:
+        name = key.lower()
+        if name == b"content-length":
+            continue
+        if name == b"etag" and not value.startswith(b"W/") and value.endswith(b'"'):
+            value = value[:-1] + f'-{encoding}"'.encode("latin-1")
+        result.append((key, value))
+    result += [
+        (b"content-encoding", encoding.encode("latin-1")),
+        (b"content-length", str(length).encode("latin-1")),
+    ]
+    return _vary_headers(result)
@@ -0,0 +1,287 @@
+"""
+Exécuteurs bornés pour les calculs lourds : la boucle d'événements ne simule jamais elle-même.
+
+Chaque voie (lane) regroupe des endpoints de coût comparable et possède son exécuteur,
+avec au plus `workers` calculs simultanés, `queue_size` calculs en attente et
+`per_client` calculs (en cours ou en attente) par client. Au-delà, la requête est
+refusée immédiatement, avec un en-tête Retry-After estimé d'après la durée moyenne des
+calculs de la voie :
+- 503 si la voie est pleine (serveur surchargé)
+- 429 si le client a déjà trop de calculs en cours
+
+Un calcul abandonné (client déconnecté) est retiré de la file s'il n'a pas commencé ;
+sinon il occupe sa place jusqu'à la fin de son exécution (un thread ne s'interrompt pas,
+d'où l'annulation coopérative des analyses).
+
+Voies configurables par variables d'environnement (LANE_<NOM>_WORKERS, _QUEUE,
+_PER_CLIENT, _EXECUTOR = thread ou process). Avec un exécuteur de processus, les
+fonctions soumises et leurs arguments doivent être sérialisables (pickle) : les voies
+qui passent des jetons d'annulation ou des callbacks refusent l'exécuteur de processus.
+
+Le client est identifié par l'adresse de la connexion. Les en-têtes X-Real-IP et
+X-Forwarded-For ne sont lus que si la connexion vient d'un proxy de confiance
+(TRUSTED_PROXIES : adresses ou réseaux séparés par des virgules, ex. le nginx du
+déploiement) ; sinon un client pourrait changer d'identité à chaque requête.
+"""
+import asyncio
+import ipaddress
+import math
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class LaneOverloaded(HTTPException):
+    """Voie saturée (503) ou client au-delà de sa limite (429), avec Retry-After"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(status_code=status_code, detail=detail, headers={"Retry-After": str(retry_after)})
+        self.retry_after = retry_after
+
+
+class ExecutorLane:
+    """Exécuteur borné d'une famille d'endpoints, avec file d'attente limitée"""
+
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        queue_size: int,
+        per_client: Optional[int] = None,
+        kind: str = "thread"
+    ):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Exécuteur inconnu pour la voie {name}: {kind} (attendu: {', '.join(EXECUTOR_KINDS)})")
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.per_client = per_client
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Condition()  # Notifié à chaque place libérée (call)
+        self._pending = 0  # Calculs en cours ou en attente
+        self._by_client: Counter = Counter()
+        self._average_seconds = 1.0  # Moyenne glissante des durées d'exécution
+        self.completed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(
+        cls,
+        name: str,
+        workers: int,
+        queue_size: int,
+        per_client: Optional[int] = None,
+        kind: str = "thread",
+        allow_process: bool = True
+    ) -> "ExecutorLane":
+        """
+        Voie configurée par LANE_<NOM>_* (valeurs par défaut sinon).
+        Lève ValueError si LANE_<NOM>_EXECUTOR=process alors que `allow_process` est faux.
+        """
+        prefix = f"LANE_{name.upper()}_"
+        per_client = int(os.getenv(prefix + "PER_CLIENT", str(per_client or 0))) or None
+        kind = os.getenv(prefix + "EXECUTOR", kind)
+        if kind == "process" and not allow_process:
+            raise ValueError(
+                f"{prefix}EXECUTOR=process non supporté : les calculs de la voie {name} "
+                "reçoivent des jetons d'annulation et des callbacks (non sérialisables)"
+            )
+        return cls(
+            name,
+            workers=max(1, int(os.getenv(prefix + "WORKERS", str(workers)))),
+            queue_size=max(0, int(os.getenv(prefix + "QUEUE", str(queue_size)))),
+            per_client=per_client,
+            kind=kind
+        )
+
+    @property
+    def executor(self) -> Executor:
+        # Créé au premier calcul (un pool de processus n'est pas créé à l'import)
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"lane-{self.name}")
+            return self._executor
+
+    def check(self, client: Optional[str] = None) -> None:
+        """Lève LaneOverloaded si un calcul de plus serait refusé (sans réserver de place)"""
+        with self._lock:
+            self._check(client)
+
+    def submit(self, fn: Callable, *args: Any, client: Optional[str] = None, **kwargs: Any) -> "asyncio.Future":
+        """
+        Réserve une place et exécute fn(*args, **kwargs) dans l'exécuteur de la voie.
+        Lève LaneOverloaded immédiatement si la voie ou le client est à sa limite.
+        Annuler le futur retourné retire le calcul de la file s'il n'a pas commencé.
+        """
+        with self._lock:
+            self._check(client)
+            self._pending += 1
+            if client is not None:
+                self._by_client[client] += 1
+        try:
+            work = self.executor.submit(_timed, fn, args, kwargs)
+        except BaseException:
+            self._release(client, None)
+            raise
+
+        result: Future = Future()
+
+        def finished(done: Future) -> None:
+            if done.cancelled():
+                self._release(client, None)
+                result.cancel()
+            elif done.exception() is not None:
+                self._release(client, None)
+                if result.set_running_or_notify_cancel():
+                    result.set_exception(done.exception())
+            else:
+                value, seconds = done.result()
+                self._release(client, seconds)
+                if result.set_running_or_notify_cancel():
+                    result.set_result(value)
+
+        work.add_done_callback(finished)
+        result.add_done_callback(lambda abandoned: work.cancel() if abandoned.cancelled() else None)
+        return asyncio.wrap_future(result)
+
+    async def run(self, fn: Callable, *args: Any, client: Optional[str] = None, **kwargs: Any) -> Any:
+        return await self.submit(fn, *args, client=client, **kwargs)
+
+    def call(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Exécute fn(*args, **kwargs) dans la voie depuis un thread bloquant (workers de la
+        file de jobs) : attend qu'une place se libère au lieu d'être refusé. Le calcul
+        occupe sa place comme une requête HTTP.
+        """
+        with self._lock:
+            while self._pending >= self.workers + self.queue_size:
+                self._lock.wait()
+            self._pending += 1
+        try:
+            value, seconds = self.executor.submit(_timed, fn, args, kwargs).result()
+        except BaseException:
+            self._release(None, None)
+            raise
+        self._release(None, seconds)
+        return value
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "per_client": self.per_client,
+                "executor": self.kind,
+                "pending": self._pending,
+                "running": min(self._pending, self.workers),
+                "queued": max(0, self._pending - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "average_seconds": round(self._average_seconds, 4)
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _check(self, client: Optional[str]) -> None:
+        if self._pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise LaneOverloaded(
+                503, f"Serveur saturé ({self.name}: {self._pending} calculs en cours ou en attente), réessayer plus tard",
+                self._retry_after(self._pending - self.workers + 1)
+            )
+        if client is not None and self.per_client is not None and self._by_client[client] >= self.per_client:
+            self.rejected += 1
+            raise LaneOverloaded(
+                429, f"Trop de calculs simultanés pour ce client ({self.name}: maximum {self.per_client})",
+                self._retry_after(1)
+            )
+
+    def _retry_after(self, waiting: int) -> int:
+        """Secondes estimées avant qu'une place se libère (1 à 60)"""
+        seconds = self._average_seconds * max(waiting, 1) / self.workers
+        return min(60, max(1, math.ceil(seconds)))
+
+    def _release(self, client: Optional[str], duration: Optional[float]) -> None:
+        with self._lock:
+            self._pending -= 1
+            if client is not None:
+                self._by_client[client] -= 1
+                if self._by_client[client] <= 0:
+                    del self._by_client[client]
+            if duration is not None:
+                self.completed += 1
+                self._average_seconds = 0.8 * self._average_seconds + 0.2 * duration
+            self._lock.notify()
+
+
+def _timed(fn: Callable, args: tuple, kwargs: Dict) -> Tuple[Any, float]:
+    """fn(*args, **kwargs) et sa durée d'exécution (hors attente dans la file)"""
+    started = time.monotonic()
+    return fn(*args, **kwargs), time.monotonic() - started
+
+
+def parse_networks(value: str) -> List[Network]:
+    """Réseaux d'une liste d'adresses ou de réseaux séparés par des virgules"""
+    return [ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip()]
+
+
+TRUSTED_PROXIES = parse_networks(os.getenv("TRUSTED_PROXIES", ""))
+
+
+def is_trusted_proxy(host: Optional[str], trusted: List[Network]) -> bool:
+    if not host or not trusted:
+        return False
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in trusted)
+
+
+def client_key(request: Any, trusted_proxies: Optional[List[Network]] = None) -> Optional[str]:
+    """
+    Identifiant du client pour la limite par client : adresse de la connexion, ou adresse
+    transmise par un proxy de confiance (X-Real-IP, sinon la dernière adresse de
+    X-Forwarded-For qui n'est pas un proxy de confiance).
+    """
+    if request is None:
+        return None
+    trusted = TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies
+    peer = request.client.host if request.client is not None else None
+    if not is_trusted_proxy(peer, trusted):
+        return peer
+    real_ip = request.headers.get("x-real-ip", "").strip()
+    if real_ip:
+        return real_ip
+    # Chaque proxy ajoute l'adresse qu'il a vue à droite : les entrées de gauche sont du client
+    for host in reversed([item.strip() for item in request.headers.get("x-forwarded-for", "").split(",")]):
+        if host and not is_trusted_proxy(host, trusted):
+            return host
+    return peer
+
+
+# Voies des endpoints : simulations unitaires, calculs par lots, analyses et optimisations
+simulate_lane = ExecutorLane.from_env("simulate", workers=4, queue_size=32, per_client=8)
+batch_lane = ExecutorLane.from_env("batch", workers=2, queue_size=8, per_client=2)
+# Jetons d'annulation et callbacks de progression : threads uniquement
+analysis_lane = ExecutorLane.from_env("analysis", workers=2, queue_size=8, per_client=2, allow_process=False)
+
+LANES = {lane.name: lane for lane in (simulate_lane, batch_lane, analysis_lane)}
@@ -0,0 +1,52 @@
+"""
+Validation HTTP des résultats déterministes (/simulate, /analyze, /optimize) par ETag.
+
+Avec une start_date explicite, le résultat ne dépend que de la configuration, de la
+version du moteur et des options de la requête : l'ETag est leur hash canonique
+(config_hash, qui inclut ENGINE_VERSION). Une requête dont l'en-tête If-None-Match
+contient cet ETag reçoit 304 sans aucun calcul. Sans start_date (aujourd'hui par défaut),
+le résultat dépend du jour : pas d'ETag.
+
+Les ETags faibles (W/) désignent des résultats équivalents mais pas identiques à
+l'octet près (durées de calcul de /optimize). Le suffixe ajouté par la compression
+(-gzip, -br) est ignoré à la comparaison.
+"""
+from typing import Any, Dict, Optional
+
+from fastapi.responses import Response
+
+from compression import ENCODING_SUFFIXES
+from result_cache import config_hash
+
+
+def result_etag(config_dict: Dict, endpoint: str, weak: bool = False, **options: Any) -> Optional[str]:
+    """ETag du résultat de `endpoint` pour cette configuration et ces options (None si non déterministe)"""
+    if not config_dict.get("start_date"):
+        return None
+    tag = f'"{config_hash(config_dict, endpoint=endpoint, **options)}"'
+    return f"W/{tag}" if weak else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Comparaison faible (RFC 9110) de l'ETag avec la liste de l'en-tête If-None-Match"""
+    if not if_none_match or etag is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def _opaque(tag: str) -> str:
+    """Partie opaque d'un ETag, sans W/ ni suffixe de compression"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
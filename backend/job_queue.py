@@ -0,0 +1,251 @@
+"""
+File de jobs pour les analyses lourdes (/analyze, /optimize) : soumission, suivi, résultat.
+
+- Un job est identifié par le hash canonique de sa configuration, de son type et de ses
+  options : soumettre deux fois la même analyse renvoie le même job (et son résultat
+  tant qu'il n'a pas expiré). Un job en échec est relancé à la soumission suivante.
+- Backend Redis (JOB_QUEUE_REDIS_URL) : file et résultats partagés entre les réplicas de
+  l'API et des workers dédiés (`python job_queue.py`). InMemoryJobBackend le remplace en
+  local et dans les tests ; il est propre au processus (avec plusieurs workers uvicorn,
+  configurer Redis).
+- Les jobs sont conservés JOB_RESULT_TTL secondes ; JOB_WORKERS threads prennent les
+  jobs dans le processus de l'API (0 pour laisser le calcul aux workers dédiés).
+- Le calcul d'un job s'exécute dans la voie des analyses (executors.analysis_lane),
+  comme /analyze et /optimize : il compte dans ses limites de concurrence. Un job attend
+  qu'une place se libère au lieu d'être refusé ; JOB_WORKERS borne le nombre de places
+  que les jobs peuvent occuper ensemble.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from analysis_service import analyze_configuration
+from executors import ExecutorLane, analysis_lane
+from optimization_service import calculate_equilibrium_point
+from result_cache import config_hash
+
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+# Points évalués ensemble par tour dans les recherches (comme SEARCH_WIDTH de l'API)
+SEARCH_WIDTH = int(os.getenv("SEARCH_WIDTH", "1"))
+
+
+def _encode(record: Dict) -> bytes:
+    # Les résultats peuvent contenir des scalaires NumPy
+    return json.dumps(record, separators=(",", ":"), default=lambda value: value.item()).encode("utf-8")
+
+
+class InMemoryJobBackend:
+    """Remplaçant local de Redis : enregistrements avec expiration et file FIFO du processus"""
+
+    def __init__(self):
+        self._records: Dict[str, Tuple[bytes, float]] = {}
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, record: Dict, ttl: int) -> Optional[Dict]:
+        """Enregistre le job s'il n'existe pas ; sinon retourne l'enregistrement existant"""
+        with self._lock:
+            existing = self._load(job_id)
+            if existing is not None:
+                return existing
+            self._records[job_id] = (_encode(record), time.monotonic() + ttl)
+            return None
+
+    def save(self, job_id: str, record: Dict, ttl: int) -> None:
+        with self._lock:
+            self._records[job_id] = (_encode(record), time.monotonic() + ttl)
+
+    def load(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._load(job_id)
+
+    def _load(self, job_id: str) -> Optional[Dict]:
+        item = self._records.get(job_id)
+        if item is None:
+            return None
+        raw, expires_at = item
+        if expires_at < time.monotonic():
+            del self._records[job_id]
+            return None
+        return json.loads(raw)
+
+    def push(self, job_id: str) -> None:
+        self._queue.put(job_id)
+
+    def pop(self, timeout: float) -> Optional[str]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class RedisJobBackend:
+    """File et enregistrements dans Redis (partagés entre processus et machines)"""
+
+    def __init__(self, url: str, namespace: str = "jobs"):
+        import redis  # Dépendance optionnelle, seulement si un Redis est configuré
+        self._client = redis.Redis.from_url(url)
+        self.namespace = namespace
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.namespace}:{job_id}"
+
+    def create(self, job_id: str, record: Dict, ttl: int) -> Optional[Dict]:
+        if self._client.set(self._key(job_id), _encode(record), nx=True, ex=ttl):
+            return None
+        return self.load(job_id)
+
+    def save(self, job_id: str, record: Dict, ttl: int) -> None:
+        self._client.set(self._key(job_id), _encode(record), ex=ttl)
+
+    def load(self, job_id: str) -> Optional[Dict]:
+        raw = self._client.get(self._key(job_id))
+        return json.loads(raw) if raw is not None else None
+
+    def push(self, job_id: str) -> None:
+        self._client.rpush(f"{self.namespace}:queue", job_id)
+
+    def pop(self, timeout: float) -> Optional[str]:
+        item = self._client.blpop(f"{self.namespace}:queue", timeout=max(int(timeout), 1))
+        return item[1].decode("utf-8") if item is not None else None
+
+
+class JobQueue:
+    """Soumission dédupliquée des jobs et pool de workers qui les exécutent"""
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[..., Dict]],
+        backend: Optional[Any] = None,
+        ttl: int = 3600,
+        lane: Optional[ExecutorLane] = None
+    ):
+        self.handlers = handlers
+        self.backend = backend if backend is not None else InMemoryJobBackend()
+        self.ttl = ttl
+        self.lane = lane  # Voie d'exécution des calculs (sinon dans le thread du worker)
+        self._workers: list = []
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_env(cls, handlers: Dict[str, Callable[..., Dict]], lane: Optional[ExecutorLane] = None) -> "JobQueue":
+        redis_url = os.getenv("JOB_QUEUE_REDIS_URL")
+        backend = None
+        if redis_url:
+            try:
+                backend = RedisJobBackend(redis_url)
+            except ImportError:
+                print("JOB_QUEUE_REDIS_URL défini mais le module redis n'est pas installé : file locale au processus")
+        return cls(handlers, backend=backend, ttl=int(os.getenv("JOB_RESULT_TTL", "3600")), lane=lane)
+
+    def submit(self, kind: str, config: Dict, options: Optional[Dict] = None) -> Dict:
+        """
+        Soumet un job et retourne son enregistrement. Si un job identique existe déjà
+        (en attente, en cours ou terminé), c'est lui qui est retourné.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Type de job inconnu: {kind} (attendu: {', '.join(self.handlers)})")
+        options = {name: value for name, value in (options or {}).items() if value is not None}
+        job_id = config_hash(config, job=kind, **options)
+        record = {
+            "id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "config": config,
+            "options": options,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "result": None
+        }
+        existing = self.backend.create(job_id, record, self.ttl)
+        if existing is not None:
+            if existing["status"] != "failed":
+                return existing
+            self.backend.save(job_id, record, self.ttl)
+        self.backend.push(job_id)
+        return record
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Enregistrement du job (None s'il est inconnu ou expiré)"""
+        return self.backend.load(job_id)
+
+    def run_next(self, timeout: float = 1.0) -> bool:
+        """Exécute le prochain job de la file ; False si la file est restée vide"""
+        job_id = self.backend.pop(timeout)
+        if job_id is None:
+            return False
+        record = self.backend.load(job_id)
+        if record is None or record["status"] != "queued":
+            return True  # Expiré, ou déjà pris par un autre worker
+
+        record.update(status="running", started_at=time.time())
+        self.backend.save(job_id, record, self.ttl)
+        try:
+            handler = self.handlers[record["kind"]]
+            if self.lane is not None:
+                record["result"] = self.lane.call(handler, record["config"], **record["options"])
+            else:
+                record["result"] = handler(record["config"], **record["options"])
+            record["status"] = "done"
+        except Exception as e:
+            record.update(status="failed", error=str(e))
+        record["finished_at"] = time.time()
+        self.backend.save(job_id, record, self.ttl)
+        return True
+
+    def start(self, workers: int) -> None:
+        """Démarre `workers` threads de calcul (démons)"""
+        self._stop.clear()
+        for _ in range(workers - len(self._workers)):
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self) -> None:
+        self._stop.set()
+        for worker in self._workers:
+            worker.join()
+        self._workers.clear()
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_next(timeout=1.0)
+            except Exception as e:
+                # Backend indisponible (Redis) : réessayer plus tard
+                print(f"Erreur du worker de jobs: {str(e)}")
+                time.sleep(1.0)
+
+
+def public_record(record: Dict, with_result: bool = False) -> Dict:
+    """Enregistrement exposé par l'API (sans la configuration ni, par défaut, le résultat)"""
+    view = {key: value for key, value in record.items() if key not in ("config", "result")}
+    if with_result:
+        view["result"] = record["result"]
+    return view
+
+
+job_queue = JobQueue.from_env({
+    "analyze": lambda config, **options: analyze_configuration(config, search_width=SEARCH_WIDTH, **options),
+    "optimize": lambda config, **options: calculate_equilibrium_point(config, search_width=SEARCH_WIDTH, **options),
+}, lane=analysis_lane)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+
+if __name__ == "__main__":
+    # Worker dédié : python job_queue.py (avec JOB_QUEUE_REDIS_URL)
+    print(f"Worker de jobs démarré ({max(JOB_WORKERS, 1)} threads)")
+    job_queue.start(max(JOB_WORKERS, 1))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        job_queue.stop()
@@ -1,17 +1,36 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
+from fastapi.responses import Response, StreamingResponse
+from annotated_types import Ge, Le
+from pydantic import BaseModel, Field, ValidationError
+from typing import Dict, Any, List, Optional, Tuple, Type
 from simulation_engine import (
     run_simulation_with_config, 
-    SimulationConfig, 
-    analyze_stock_trend, 
-    find_stability_solutions,
-    DailyDetail
+    SimulationConfig,
+    DetailLevel
 )
 from optimization_service import calculate_equilibrium_point
+from analysis_service import analyze_configuration as run_analysis
+from cancellation import OperationCancelled, run_cancellable
+from job_queue import job_queue, public_record, JOB_WORKERS
+from batch_engine import simulate_batch
+from monte_carlo import run_monte_carlo, DISTRIBUTIONS
+from result_cache import run_simulation_cached, simulate_config_cached, simulation_cache
+from projection import Page, Projection, project_result, PAGINATED_SECTIONS, RESULT_SECTIONS
+from compression import CompressionMiddleware
+from executors import LANES, analysis_lane, batch_lane, client_key, simulate_lane
+from http_cache import etag_matches, not_modified, result_etag
+from wire_format import JSON, available_media_types, columnar_result, encode as encode_columnar, negotiate
+from sweep import run_sweep, encode_array, ENCODINGS, SWEEP_FIELDS, SWEEP_STATISTICS
+from pareto import pareto_front, PARETO_OBJECTIVES, PARETO_VARIABLES
+from sensitivity import run_sensitivity, Bounds, DEFAULT_STATISTICS as SENSITIVITY_DEFAULT_STATISTICS, SENSITIVITY_STATISTICS
 from datetime import datetime
 from dateutil import parser as date_parser
+import numpy as np
+import asyncio
+import json
+import os
 import uvicorn
 
 app = FastAPI(
@@ -27,7 +46,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+# Compression brotli/gzip des réponses volumineuses (hors flux SSE)
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")))
 # Middleware HTTP pour retirer le préfixe /api si le reverse-proxy ne le réécrit pas
 @app.middleware("http")
 async def strip_api_prefix(request, call_next):
@@ -66,7 +88,8 @@ async def strip_api_prefix(request, call_next):
     return response
 
 
-class SimulationRequest(BaseModel):
+class StockParameters(BaseModel):
+    """Paramètres de gestion de stock d'un produit"""
     daily_consumption: float = Field(default=2.13, ge=0.1, le=100, description="Consommation quotidienne en unités")
     initial_stock: float = Field(default=45.0, ge=0, le=1000, description="Stock initial en unités")
     reorder_threshold: float = Field(default=36.0, ge=0, le=1000, description="Seuil de réapprovisionnement")
@@ -75,8 +98,11 @@ class SimulationRequest(BaseModel):
     max_order_quantity: int = Field(default=10, ge=2, le=100, description="Quantité maximum par commande")
     lot_size: int = Field(default=2, ge=1, le=10, description="Taille des lots de production")
     delivery_lead_time_days: int = Field(default=3, ge=1, le=30, description="Délai de livraison en jours ouvrés")
-    simulation_days: int = Field(default=60, ge=7, le=365, description="Nombre de jours à simuler")
     min_stock_to_start_sales: float = Field(default=36.0, ge=0, le=1000, description="Stock minimum avant de commencer les ventes")
+
+
+class SimulationRequest(StockParameters):
+    simulation_days: int = Field(default=60, ge=7, le=365, description="Nombre de jours à simuler")
     start_date: Optional[str] = Field(default=None, description="Date de début de simulation (format ISO: YYYY-MM-DD)")
 
     class Config:
@@ -97,6 +123,144 @@ class SimulationRequest(BaseModel):
         }
 
 
+class PageRequest(BaseModel):
+    offset: int = Field(default=0, ge=0, description="Index de la première ligne retournée")
+    limit: Optional[int] = Field(default=None, ge=1, le=10000, description="Nombre maximal de lignes")
+    date_from: Optional[str] = Field(default=None, description="Première date incluse (format ISO: YYYY-MM-DD)")
+    date_to: Optional[str] = Field(default=None, description="Dernière date incluse (format ISO: YYYY-MM-DD)")
+
+
+class ProjectionOptions(BaseModel):
+    fields: Optional[List[str]] = Field(
+        default=None, min_length=1,
+        description='Sections ou champs à retourner ("statistics", "daily_details.stock_end"...), tout si absent'
+    )
+    pages: Dict[str, PageRequest] = Field(default={}, description="Pagination de events et daily_details")
+
+    def has_projection(self) -> bool:
+        return self.fields is not None or bool(self.pages)
+
+
+class SimulateRequest(SimulationRequest, ProjectionOptions):
+    pass
+
+
+class BatchSimulateRequest(ProjectionOptions):
+    configs: List[Dict[str, Any]] = Field(
+        ..., min_length=1,
+        description="Configurations (mêmes champs que /simulate), validées et simulées dans l'ordre"
+    )
+
+
+class ProductParameters(StockParameters):
+    sku: str = Field(..., min_length=1, max_length=100, description="Référence du produit (parfum)")
+
+
+class MultiProductRequest(BaseModel):
+    products: List[ProductParameters] = Field(..., min_length=1, max_length=10000, description="Paramètres par produit")
+    simulation_days: int = Field(default=60, ge=7, le=365, description="Nombre de jours à simuler (commun)")
+    start_date: Optional[str] = Field(default=None, description="Date de début commune (format ISO: YYYY-MM-DD)")
+    include_daily: bool = Field(default=False, description="Inclure les séries quotidiennes par produit")
+    daily_fields: List[str] = Field(default=["stock_end"], description="Séries quotidiennes à inclure")
+
+
+class MonteCarloRequest(SimulationRequest):
+    distribution: str = Field(default="poisson", description="Loi de la demande: poisson, normal ou empirical")
+    replications: int = Field(default=1000, ge=1, le=20000, description="Nombre de réplications")
+    seed: int = Field(default=0, ge=0, description="Graine aléatoire (résultat reproductible)")
+    demand_std: Optional[float] = Field(default=None, ge=0, description="Écart-type de la demande (loi normale)")
+    demand_samples: Optional[List[float]] = Field(default=None, max_length=10000, description="Historique de demande (loi empirique)")
+
+
+class SweepAxis(BaseModel):
+    field: str = Field(..., description="Champ de la configuration à faire varier")
+    values: Optional[List[float]] = Field(default=None, min_length=1, max_length=1000, description="Valeurs explicites")
+    start: Optional[float] = Field(default=None, description="Première valeur (avec stop et num)")
+    stop: Optional[float] = Field(default=None, description="Dernière valeur (incluse)")
+    num: int = Field(default=10, ge=1, le=1000, description="Nombre de valeurs entre start et stop")
+
+    def grid_values(self) -> List[float]:
+        if self.values is not None:
+            return self.values
+        return np.linspace(self.start, self.stop, self.num).tolist()
+
+
+class SweepRequest(SimulationRequest):
+    axes: List[SweepAxis] = Field(..., min_length=1, max_length=4, description="Axes de la grille")
+    statistics: List[str] = Field(default=["stockouts_count", "final_stock", "average_stock"], description="Statistiques à retourner")
+    encoding: str = Field(default="list", description="Encodage des tableaux: list ou base64")
+
+
+class OptimizeRequest(SimulationRequest):
+    time_budget_seconds: Optional[float] = Field(default=None, gt=0, le=300, description="Durée maximale des recherches (secondes)")
+    simulation_budget: Optional[int] = Field(default=None, ge=1, le=100000, description="Nombre maximal de simulations des recherches")
+
+
+class SensitivityRequest(SimulationRequest):
+    relative_step: float = Field(default=0.05, gt=0, le=0.5, description="Perturbation relative (au moins une unité pour les entiers)")
+    fields: List[str] = Field(default=list(SWEEP_FIELDS), min_length=1, description="Champs à perturber")
+    statistics: List[str] = Field(default=list(SENSITIVITY_DEFAULT_STATISTICS), min_length=1, description="Statistiques à comparer")
+
+
+class ParetoRequest(SimulationRequest):
+    objectives: List[str] = Field(default=["average_stock", "total_orders"], min_length=1, max_length=4, description="Statistiques à minimiser")
+    bounds: Dict[str, List[float]] = Field(default={}, description="Bornes [basse, haute] par variable (seuil, stock max, quantités min/max)")
+    population: int = Field(default=256, ge=8, le=5000, description="Candidats simulés par génération")
+    generations: int = Field(default=8, ge=1, le=100, description="Nombre de générations")
+    seed: int = Field(default=0, ge=0, description="Graine aléatoire (résultat reproductible)")
+
+
+MONTE_CARLO_WORKERS = int(os.getenv("MONTE_CARLO_WORKERS", "1"))
+SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "250000"))
+BATCH_MAX_CONFIGS = int(os.getenv("BATCH_MAX_CONFIGS", "1000"))
+# Réponse par défaut de /simulate/batch : tout sauf les événements (que le moteur par lots ne construit pas)
+BATCH_DEFAULT_PROJECTION = Projection({section: None for section in RESULT_SECTIONS if section != "events"})
+# Points évalués ensemble par tour dans les recherches de /analyze et /optimize (1 = séquentiel)
+SEARCH_WIDTH = int(os.getenv("SEARCH_WIDTH", "1"))
+# Plafond de durée des recherches de /optimize (secondes, 0 = sans plafond) : borne la latence sous charge
+OPTIMIZE_MAX_SECONDS = float(os.getenv("OPTIMIZE_MAX_SECONDS", "0"))
+# Plafond de simulations de /optimize/pareto (population x générations)
+PARETO_MAX_EVALUATIONS = int(os.getenv("PARETO_MAX_EVALUATIONS", "100000"))
+# Intervalle de lecture de l'état d'un job pour /jobs/{id}/events (secondes)
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.25"))
+
+
+DAILY_SERIES_FIELDS = (
+    "stock_start", "deliveries", "consumption", "stock_end", "order_quantity",
+    "order_id", "delivery_id", "is_working_day", "has_threshold_crossed", "has_stockout"
+)
+
+
+def validate_stock_parameters(params: StockParameters) -> Optional[str]:
+    """Règles métier communes aux endpoints de simulation ; retourne le message d'erreur éventuel"""
+    if params.min_order_quantity % params.lot_size != 0:
+        return f"La quantité minimum ({params.min_order_quantity}) doit être un multiple de la taille de lot ({params.lot_size})"
+
+    if params.max_order_quantity < params.min_order_quantity:
+        return "La quantité maximum doit être supérieure ou égale à la quantité minimum"
+
+    # Validation du seuil seulement si le stock initial est supérieur à 0
+    if params.initial_stock > 0 and params.reorder_threshold >= params.initial_stock:
+        return "Le seuil de réapprovisionnement doit être inférieur au stock initial"
+
+    return None
+
+
+def model_bounds(model: Type[BaseModel]) -> Bounds:
+    """Bornes incluses (ge, le) des champs d'un modèle de requête"""
+    bounds = {}
+    for name, info in model.model_fields.items():
+        low = next((c.ge for c in info.metadata if isinstance(c, Ge)), None)
+        high = next((c.le for c in info.metadata if isinstance(c, Le)), None)
+        if low is not None or high is not None:
+            bounds[name] = (low, high)
+    return bounds
+
+
+# Perturbations de /sensitivity : mêmes bornes que le corps de /simulate
+SENSITIVITY_BOUNDS = model_bounds(SimulationRequest)
+
+
 class HealthResponse(BaseModel):
     status: str
     message: str
@@ -120,45 +284,113 @@ async def health_check():
     )
 
 
+@app.get("/cache/stats")
+async def cache_statistics() -> Dict[str, Any]:
+    """Compteurs du cache des simulations (hits L1/L2, misses, taille)"""
+    return simulation_cache.stats()
+
+
+@app.get("/executors/stats")
+async def executor_statistics() -> Dict[str, Any]:
+    """Occupation des voies de calcul (en cours, en attente, refus, durée moyenne)"""
+    return {name: lane.stats() for name, lane in LANES.items()}
+
+
+def _projection_arguments(options: ProjectionOptions) -> Tuple[Projection, Dict[str, Page]]:
+    """Projection et pagination d'une requête (ValueError si un champ ou une liste est inconnu)"""
+    projection = Projection.parse(options.fields)
+    unknown = [name for name in options.pages if name not in PAGINATED_SECTIONS]
+    if unknown:
+        raise ValueError(f"Listes non paginables: {', '.join(unknown)} (attendu: {', '.join(PAGINATED_SECTIONS)})")
+    pages = {
+        name: Page(
+            offset=page.offset,
+            limit=page.limit,
+            date_from=_page_date(page.date_from),
+            date_to=_page_date(page.date_to)
+        )
+        for name, page in options.pages.items()
+    }
+    return projection, pages
+
+
+def _page_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return date_parser.parse(value)
+    except (ValueError, OverflowError):
+        raise ValueError(f"Date invalide: {value}")
+
+
 @app.post("/simulate")
-async def run_simulation(request: SimulationRequest) -> Dict[str, Any]:
+async def run_simulation(
+    request: SimulateRequest,
+    http_request: Request,
+    response: Response,
+    accept: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None)
+) -> Any:
     """
     Exécute une simulation de gestion de stock avec les paramètres fournis.
 
+    `fields` restreint la réponse à des sections ou champs ; la simulation est alors faite
+    au niveau de détail minimal (événements construits seulement s'ils sont demandés).
+    `pages` pagine events et daily_details (plage de dates, offset / limit).
+    L'en-tête Accept choisit le format : JSON (par défaut), ou en colonnes
+    (JSON, MessagePack, Arrow IPC ; voir wire_format).
+    Avec une start_date explicite, la réponse porte un ETag et If-None-Match donne 304.
+
     Returns:
         - config: Configuration utilisée
         - events: Liste chronologique de tous les événements
         - orders: Liste des commandes passées
         - statistics: Statistiques de la simulation
+        - pagination: offset, limit et total des listes paginées
     """
     try:
         # Validation supplémentaire
-        if request.min_order_quantity % request.lot_size != 0:
-            raise HTTPException(
-                status_code=400,
-                detail=f"La quantité minimum ({request.min_order_quantity}) doit être un multiple de la taille de lot ({request.lot_size})"
-            )
-
-        if request.max_order_quantity < request.min_order_quantity:
-            raise HTTPException(
-                status_code=400,
-                detail="La quantité maximum doit être supérieure ou égale à la quantité minimum"
-            )
+        error = validate_stock_parameters(request)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
 
-        # Validation du seuil seulement si le stock initial est supérieur à 0
-        if request.initial_stock > 0 and request.reorder_threshold >= request.initial_stock:
+        media_type = negotiate(accept)
+        if media_type is None:
             raise HTTPException(
-                status_code=400,
-                detail="Le seuil de réapprovisionnement doit être inférieur au stock initial"
+                status_code=406,
+                detail=f"Format non disponible (formats servis: {', '.join(available_media_types())})"
             )
+        response.headers["Vary"] = "Accept"
 
         # Convertir la requête en dictionnaire pour la simulation
-        config_dict = request.dict()
+        config_dict = request.model_dump(exclude={"fields", "pages"})
+
+        etag = result_etag(
+            config_dict, "simulate",
+            fields=request.fields, pages=jsonable_encoder(request.pages), media_type=media_type
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        if etag:
+            response.headers["ETag"] = etag
 
-        # Exécuter la simulation
-        result = run_simulation_with_config(config_dict)
+        projection, pages = None, {}
+        if media_type != JSON or request.has_projection():
+            try:
+                projection, pages = _projection_arguments(request)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
-        return result
+        payload = await simulate_lane.run(
+            _simulation_payload, config_dict, media_type, projection, pages, client=client_key(http_request)
+        )
+        if media_type == JSON:
+            return payload
+        return Response(
+            content=payload,
+            media_type=media_type,
+            headers={"Vary": "Accept", **({"ETag": etag} if etag else {})}
+        )
 
     except HTTPException:
         raise
@@ -169,6 +401,352 @@ async def run_simulation(request: SimulationRequest) -> Dict[str, Any]:
         )
 
 
+def _simulation_payload(
+    config_dict: Dict[str, Any],
+    media_type: str,
+    projection: Optional[Projection],
+    pages: Dict[str, Page]
+) -> Any:
+    """Réponse de /simulate : dict JSON, ou octets du format en colonnes négocié"""
+    if projection is None:
+        # Réponse complète (cache partagé du JSON)
+        return run_simulation_cached(config_dict)
+    result = simulate_config_cached(config_dict, detail_level=projection.detail_level)
+    if media_type == JSON:
+        return project_result(result, config_dict, projection, pages)
+    return encode_columnar(columnar_result(result, config_dict, projection, pages), media_type)
+
+
+@app.post("/simulate/batch")
+async def run_simulation_batch(request: BatchSimulateRequest, http_request: Request) -> Dict[str, Any]:
+    """
+    Simule plusieurs configurations en une requête, avec une projection commune.
+
+    Chaque configuration est validée comme le corps de /simulate ; une configuration
+    invalide donne une erreur à sa position sans faire échouer les autres. `fields` et
+    `pages` s'appliquent à toutes les configurations ; sans `fields`, la réponse comprend
+    toutes les sections de /simulate sauf les événements. Sans événements demandés, les
+    configurations valides sont simulées ensemble par le moteur par lots ; sinon une
+    à une (avec le cache des simulations).
+
+    Returns:
+        - results: Un élément par configuration, dans l'ordre : index, status_code et
+          result (réponse de /simulate projetée) ou detail (erreur de la configuration)
+        - summary: Nombre de configurations, de succès et d'erreurs
+    """
+    if len(request.configs) > BATCH_MAX_CONFIGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Trop de configurations: {len(request.configs)} (maximum {BATCH_MAX_CONFIGS})"
+        )
+    projection, pages = BATCH_DEFAULT_PROJECTION, {}
+    if request.has_projection():
+        try:
+            projection, pages = _projection_arguments(request)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        projection = projection if request.fields is not None else BATCH_DEFAULT_PROJECTION
+
+    results: List[Dict[str, Any]] = []
+    valid: List[Dict[str, Any]] = []
+    for index, item in enumerate(request.configs):
+        config_dict, error = _batch_config(item)
+        results.append({"index": index, "status_code": 400, "detail": error})
+        if config_dict is not None:
+            valid.append(config_dict)
+
+    try:
+        computed = await batch_lane.run(_batch_payload, valid, projection, pages, client=client_key(http_request))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la simulation par lots: {str(e)}"
+        )
+
+    computed = iter(computed)
+    for index, entry in enumerate(results):
+        if entry["detail"] is None:
+            results[index] = {"index": index, **next(computed)}
+    succeeded = sum(1 for entry in results if entry["status_code"] == 200)
+    return {
+        "results": results,
+        "summary": {"configs": len(results), "succeeded": succeeded, "failed": len(results) - succeeded}
+    }
+
+
+def _batch_config(item: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Configuration validée d'un élément de /simulate/batch, ou le message d'erreur"""
+    try:
+        config = SimulationRequest(**item)
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        )
+    error = validate_stock_parameters(config)
+    if error:
+        return None, error
+    if config.start_date:
+        try:
+            date_parser.parse(config.start_date)
+        except (ValueError, OverflowError):
+            return None, f"Date invalide: {config.start_date}"
+    return config.model_dump(), None
+
+
+def _batch_payload(
+    configs: List[Dict[str, Any]],
+    projection: Projection,
+    pages: Dict[str, Page]
+) -> List[Dict[str, Any]]:
+    """Résultats de /simulate/batch pour les configurations valides (status_code et result ou detail)"""
+    if projection.detail_level == DetailLevel.FULL:
+        # Événements demandés : le moteur par lots ne les construit pas
+        return [_batch_item(_simulation_payload, config, JSON, projection, pages) for config in configs]
+    batch = simulate_batch(configs) if configs else None
+    return [
+        _batch_item(lambda: project_result(batch.result(i), config, projection, pages))
+        for i, config in enumerate(configs)
+    ]
+
+
+def _batch_item(compute, *args: Any) -> Dict[str, Any]:
+    try:
+        return {"status_code": 200, "result": compute(*args)}
+    except Exception as e:
+        return {"status_code": 500, "detail": f"Erreur lors de la simulation: {str(e)}"}
+
+
+@app.post("/simulate/products")
+async def run_multi_product_simulation(request: MultiProductRequest, http_request: Request) -> Dict[str, Any]:
+    """
+    Simule des milliers de produits en une seule passe (calendrier commun, état en tableaux).
+
+    Returns:
+        - products: Statistiques par produit (+ séries quotidiennes si include_daily)
+        - summary: Synthèse sur l'ensemble des produits
+    """
+    unknown_fields = [f for f in request.daily_fields if f not in DAILY_SERIES_FIELDS]
+    if unknown_fields:
+        raise HTTPException(status_code=400, detail=f"Séries inconnues: {', '.join(unknown_fields)}")
+
+    errors = []
+    for product in request.products:
+        error = validate_stock_parameters(product)
+        if error:
+            errors.append(f"{product.sku}: {error}")
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+
+    try:
+        return await batch_lane.run(_multi_product_payload, request, client=client_key(http_request))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la simulation multi-produits: {str(e)}"
+        )
+
+
+def _multi_product_payload(request: MultiProductRequest) -> Dict[str, Any]:
+    """Réponse de /simulate/products"""
+    start_date = date_parser.parse(request.start_date) if request.start_date else None
+    configs = [
+        SimulationConfig(simulation_days=request.simulation_days, **product.model_dump(exclude={"sku"}))
+        for product in request.products
+    ]
+    batch = simulate_batch(configs, start_date=start_date)
+
+    days = request.simulation_days
+    daily = {
+        name: getattr(batch, name)[:, :days].tolist()
+        for name in (request.daily_fields if request.include_daily else [])
+    }
+    products = []
+    for i, product in enumerate(request.products):
+        entry = {"sku": product.sku, "statistics": batch.statistics(i)}
+        if request.include_daily:
+            entry["daily"] = {name: values[i] for name, values in daily.items()}
+        products.append(entry)
+
+    return {
+        "start_date": batch.start_dates[0].isoformat(),
+        "simulation_days": days,
+        "products": products,
+        "summary": {
+            "products": len(products),
+            "products_with_stockouts": int((batch.stockouts_count > 0).sum()),
+            "total_ordered": int(batch.total_ordered.sum()),
+            "total_orders": int(batch.total_orders.sum()),
+            "average_final_stock": float(batch.final_stock.mean())
+        }
+    }
+
+
+@app.post("/simulate/monte-carlo")
+async def run_monte_carlo_simulation(request: MonteCarloRequest, http_request: Request) -> Dict[str, Any]:
+    """
+    Simulation stochastique : la demande quotidienne suit une loi aléatoire de moyenne
+    daily_consumption, sur `replications` réplications reproductibles (graine `seed`).
+
+    Returns:
+        - stockout_probability: Probabilité d'au moins une rupture sur la période
+        - stock_end_bands: Bandes de percentiles du stock fin de journée, par jour
+        - fill_rate: Part de la demande servie depuis le stock
+    """
+    error = validate_stock_parameters(request)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    if request.distribution not in DISTRIBUTIONS:
+        raise HTTPException(status_code=400, detail=f"Distribution inconnue: {request.distribution}")
+    if request.distribution == "empirical" and not request.demand_samples:
+        raise HTTPException(status_code=400, detail="La distribution empirique nécessite demand_samples")
+
+    try:
+        config_dict = request.model_dump(exclude={"distribution", "replications", "seed", "demand_std", "demand_samples"})
+        return await batch_lane.run(
+            run_monte_carlo,
+            config_dict,
+            distribution=request.distribution,
+            replications=request.replications,
+            seed=request.seed,
+            std=request.demand_std,
+            samples=request.demand_samples,
+            workers=MONTE_CARLO_WORKERS,
+            client=client_key(http_request)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la simulation Monte Carlo: {str(e)}"
+        )
+
+
+@app.post("/sweep")
+async def run_parameter_sweep(request: SweepRequest, http_request: Request) -> Dict[str, Any]:
+    """
+    Viabilité et statistiques sur la grille cartésienne des axes (heatmaps).
+
+    Chaque axe fait varier un champ de la configuration ; les autres champs gardent
+    la valeur de la requête. Les points qui ne respectent pas les règles métier
+    sont marqués invalides (valid = false) et ne sont pas simulés.
+
+    Returns:
+        - axes: Champ et valeurs de chaque dimension
+        - shape: Forme de la grille
+        - arrays: Tableaux typés (dtype, shape, data) : valid, viable et les statistiques
+        - summary: Nombre de points, de points valides et viables
+    """
+    if request.encoding not in ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"Encodage inconnu: {request.encoding}")
+    unknown_statistics = [name for name in request.statistics if name not in SWEEP_STATISTICS]
+    if unknown_statistics:
+        raise HTTPException(status_code=400, detail=f"Statistiques inconnues: {', '.join(unknown_statistics)}")
+
+    base_config = request.model_dump(exclude={"axes", "statistics", "encoding"})
+    axes = []
+    for axis in request.axes:
+        if axis.field not in SWEEP_FIELDS:
+            raise HTTPException(status_code=400, detail=f"Champ inconnu: {axis.field}")
+        if axis.field in (name for name, _ in axes):
+            raise HTTPException(status_code=400, detail=f"Axe en double: {axis.field}")
+        if axis.values is None and (axis.start is None or axis.stop is None):
+            raise HTTPException(status_code=400, detail=f"Axe {axis.field}: values ou start/stop requis")
+        # Chaque valeur doit respecter les bornes et le type du champ (mêmes contrôles que /simulate)
+        values = []
+        for value in axis.grid_values():
+            try:
+                values.append(getattr(SimulationRequest(**{**base_config, axis.field: value}), axis.field))
+            except ValidationError:
+                raise HTTPException(status_code=400, detail=f"Valeur invalide pour {axis.field}: {value}")
+        axes.append((axis.field, values))
+
+    points = int(np.prod([len(values) for _, values in axes]))
+    if points > SWEEP_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"Grille trop grande: {points} points (maximum {SWEEP_MAX_POINTS})")
+
+    try:
+        return await batch_lane.run(
+            _sweep_payload, base_config, axes, request.statistics, request.encoding, client=client_key(http_request)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors du balayage: {str(e)}"
+        )
+
+
+def _sweep_payload(
+    base_config: Dict[str, Any],
+    axes: List[Tuple[str, List[float]]],
+    statistics: List[str],
+    encoding: str
+) -> Dict[str, Any]:
+    """Réponse de /sweep (grille simulée et tableaux encodés)"""
+    arrays = run_sweep(base_config, axes, statistics)
+    return {
+        "axes": [{"field": name, "values": values} for name, values in axes],
+        "shape": list(arrays["valid"].shape),
+        "encoding": encoding,
+        "arrays": {name: encode_array(values, encoding) for name, values in arrays.items()},
+        "summary": {
+            "points": int(arrays["valid"].size),
+            "valid_points": int(arrays["valid"].sum()),
+            "viable_points": int(arrays["viable"].sum())
+        }
+    }
+
+
+@app.post("/sensitivity")
+async def run_sensitivity_analysis(request: SensitivityRequest, http_request: Request) -> Dict[str, Any]:
+    """
+    Sensibilité des statistiques à de petites variations (±relative_step) de chaque champ.
+
+    La configuration de base et toutes ses perturbations sont simulées en un seul lot.
+    Les perturbations hors des bornes de /simulate ou qui violent les règles métier
+    sont ignorées (valeurs nulles).
+
+    Returns:
+        - base: Statistiques de la configuration de base
+        - sensitivities: Par champ, valeurs perturbées et, par statistique, valeurs
+          obtenues, pente et élasticité
+    """
+    error = validate_stock_parameters(request)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    unknown_fields = [name for name in request.fields if name not in SWEEP_FIELDS]
+    if unknown_fields:
+        raise HTTPException(status_code=400, detail=f"Champs inconnus: {', '.join(unknown_fields)}")
+    unknown_statistics = [name for name in request.statistics if name not in SENSITIVITY_STATISTICS]
+    if unknown_statistics:
+        raise HTTPException(status_code=400, detail=f"Statistiques inconnues: {', '.join(unknown_statistics)}")
+
+    try:
+        base_config = request.model_dump(exclude={"relative_step", "fields", "statistics"})
+        return await batch_lane.run(
+            run_sensitivity, base_config, request.relative_step, request.fields, request.statistics,
+            SENSITIVITY_BOUNDS, client=client_key(http_request)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de l'analyse de sensibilité: {str(e)}"
+        )
+
+
 @app.get("/config/default")
 async def get_default_config() -> SimulationRequest:
     """Retourne la configuration par défaut"""
@@ -176,10 +754,21 @@ async def get_default_config() -> SimulationRequest:
 
 
 @app.post("/analyze")
-async def analyze_configuration(request: SimulationRequest) -> Dict[str, Any]:
+async def analyze_configuration(
+    request: SimulationRequest,
+    http_request: Request,
+    response: Response,
+    x_session_id: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None)
+) -> Dict[str, Any]:
     """
     Analyse une configuration et fournit des recommandations.
 
+    Le calcul s'exécute hors de la boucle d'événements ; il est abandonné si le client
+    se déconnecte ou si une nouvelle analyse arrive avec le même en-tête X-Session-Id
+    (réponse 409). Avec une start_date explicite, la réponse porte un ETag et
+    If-None-Match donne 304 sans recalcul.
+
     Returns:
         - viability: Analyse de viabilité de la configuration
         - trend_analysis: Analyse de tendance sur 30 jours
@@ -188,108 +777,25 @@ async def analyze_configuration(request: SimulationRequest) -> Dict[str, Any]:
         - risks: Risques identifiés
     """
     try:
-        # Exécuter une simulation pour analyser
         config_dict = request.dict()
-        result = run_simulation_with_config(config_dict)
-
-        stats = result["statistics"]
-        
-        # Convertir daily_details en objets DailyDetail
-        daily_details = [
-            DailyDetail(
-                date=date_parser.parse(d["date"]),
-                day_of_week=d["day_of_week"],
-                is_working_day=d["is_working_day"],
-                stock_start=d["stock_start"],
-                deliveries=d["deliveries"],
-                consumption=d["consumption"],
-                stock_end=d["stock_end"],
-                orders_placed=d["orders_placed"],
-                order_quantity=d["order_quantity"],
-                order_id=d["order_id"],
-                delivery_id=d["delivery_id"],
-                has_threshold_crossed=d["has_threshold_crossed"],
-                has_stockout=d["has_stockout"]
-            )
-            for d in result["daily_details"]
-        ]
-        
-        # Analyse de tendance sur 30 jours
-        trend_analysis = analyze_stock_trend(daily_details, 30)
-        
-        # Analyse de stabilité et solutions proposées
-        stability_solutions = find_stability_solutions(config_dict)
-
-        # Analyse de viabilité globale
-        is_viable = trend_analysis["is_viable"] and stats["stockouts_count"] == 0
-        service_level = ((config_dict["simulation_days"] - stats["stockouts_count"]) /
-                        config_dict["simulation_days"] * 100)
-
-        # Recommandations
-        recommendations = []
-        risks = []
-
-        # Analyse basée sur la tendance
-        if trend_analysis["trend"] == "descending":
-            risks.append(f"📉 {trend_analysis['description']}")
-            recommendations.append("Augmenter la quantité maximum par livraison")
-            recommendations.append("Réduire le délai de livraison si possible")
-            recommendations.append("Augmenter le stock initial")
-        elif trend_analysis["trend"] == "ascending":
-            if stats["average_stock"] > config_dict["max_stock"] * 0.8:
-                recommendations.append("Stock élevé : considérer une réduction du seuil de réapprovisionnement")
-
-        if stats["stockouts_count"] > 0:
-            risks.append(f"⚠️ {stats['stockouts_count']} jour(s) de rupture de stock détecté(s)")
-            recommendations.append("Augmenter le seuil de réapprovisionnement")
-
-        if stats["min_stock"] < 10 and stats["min_stock"] >= 0:
-            risks.append(f"Stock minimum très bas: {stats['min_stock']:.2f} unités")
-            recommendations.append("Augmenter le seuil de réapprovisionnement pour plus de sécurité")
-
-        # Analyser le taux de rotation
-        avg_days_of_stock = stats["average_stock"] / config_dict["daily_consumption"] if config_dict["daily_consumption"] > 0 else 0
-        if avg_days_of_stock > 14:
-            recommendations.append(f"Stock moyen élevé ({avg_days_of_stock:.1f} jours): envisager de réduire le seuil")
-        elif avg_days_of_stock < 5 and avg_days_of_stock > 0:
-            risks.append(f"Stock moyen faible ({avg_days_of_stock:.1f} jours): risque de rupture")
-
-        # Efficacité des commandes
-        if stats["total_orders"] > 0:
-            avg_order_size = stats["total_ordered"] / stats["total_orders"]
-            if avg_order_size < config_dict["max_order_quantity"] * 0.5:
-                recommendations.append("Les commandes sont souvent petites: optimiser la politique de commande")
-
-        # Ajouter les solutions de stabilité aux recommandations
-        if stability_solutions["solutions"]:
-            for solution in stability_solutions["solutions"]:
-                if solution["type"] not in ["consumption_ok", "max_order_ok"]:
-                    recommendations.append(solution["message"])
-
-        return {
-            "viability": {
-                "is_viable": is_viable,
-                "service_level": round(service_level, 2),
-                "status": "✅ Configuration viable" if is_viable else "❌ Configuration non viable"
-            },
-            "trend_analysis": trend_analysis,
-            "stability_solutions": {
-                "message": stability_solutions["message"],
-                "current_consumption": stability_solutions["current_consumption"],
-                "current_max_order": stability_solutions["current_max_order"],
-                "max_viable_consumption": stability_solutions["max_viable_consumption"],
-                "min_required_max_order": stability_solutions["min_required_max_order"],
-                "solutions": stability_solutions["solutions"]
-            },
-            "recommendations": recommendations if recommendations else ["✅ Configuration optimale"],
-            "risks": risks if risks else ["✅ Aucun risque identifié"],
-            "metrics": {
-                "average_days_of_stock": round(avg_days_of_stock, 2) if avg_days_of_stock > 0 else 0,
-                "average_order_size": round(stats["total_ordered"] / stats["total_orders"], 2) if stats["total_orders"] > 0 else 0,
-                "order_frequency": round(stats["total_orders"] / (config_dict["simulation_days"] / 7), 2)  # commandes par semaine
-            }
-        }
+        etag = result_etag(config_dict, "analyze")
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        analysis = await run_cancellable(
+            lambda token: run_analysis(config_dict, search_width=SEARCH_WIDTH, cancel=token),
+            request=http_request,
+            session_key=("analyze", x_session_id) if x_session_id else None,
+            lane=analysis_lane,
+            client=client_key(http_request)
+        )
+        if etag:
+            response.headers["ETag"] = etag
+        return analysis
 
+    except OperationCancelled as e:
+        raise HTTPException(status_code=409, detail=f"Analyse annulée: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_detail = f"Erreur lors de l'analyse: {str(e)}\n{traceback.format_exc()}"
@@ -301,7 +807,13 @@ async def analyze_configuration(request: SimulationRequest) -> Dict[str, Any]:
 
 
 @app.post("/optimize")
-async def optimize_configuration(request: SimulationRequest) -> Dict[str, Any]:
+async def optimize_configuration(
+    request: OptimizeRequest,
+    http_request: Request,
+    response: Response,
+    x_session_id: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None)
+) -> Dict[str, Any]:
     """
     Calcule le point d'équilibre et fournit des recommandations précises
     basées sur des simulations réelles.
@@ -317,16 +829,42 @@ async def optimize_configuration(request: SimulationRequest) -> Dict[str, Any]:
         - optimal_configuration: Configuration optimale trouvée
         - recommendations: Liste de recommandations prioritaires
         - tested_scenarios: Détails des tests effectués
+        - search_status: "converged", ou "partial" si le budget (time_budget_seconds,
+          simulation_budget, plafond OPTIMIZE_MAX_SECONDS) est épuisé, avec les
+          intervalles de recherche restants
+
+    Le calcul s'exécute hors de la boucle d'événements et s'arrête (réponse 409) si le
+    client se déconnecte ou si une nouvelle optimisation arrive avec le même en-tête
+    X-Session-Id : un curseur déplacé dans l'interface annule le calcul précédent.
+
+    Avec une start_date explicite, un résultat dont les recherches ont convergé porte un
+    ETag faible (les durées diffèrent d'un calcul à l'autre) ; If-None-Match donne alors
+    304 sans recalcul. Un résultat partiel n'en porte pas : selon la charge, le plafond de
+    durée (time_budget_seconds, OPTIMIZE_MAX_SECONDS) l'arrête à des points différents.
     """
     try:
-        # Convertir la requête en dictionnaire
-        config_dict = request.dict()
-        
+        config_dict, _ = _optimize_arguments(request)
+        etag = result_etag(config_dict, "optimize", weak=True, simulation_budget=request.simulation_budget)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
         # Lancer l'optimisation
-        optimization_result = calculate_equilibrium_point(config_dict)
-        
+        optimization_result = await run_cancellable(
+            lambda token: _run_optimization(request, cancel=token),
+            request=http_request,
+            session_key=("optimize", x_session_id) if x_session_id else None,
+            lane=analysis_lane,
+            client=client_key(http_request)
+        )
+        if etag and optimization_result["search_status"]["converged"]:
+            response.headers["ETag"] = etag
+
         return optimization_result
         
+    except OperationCancelled as e:
+        raise HTTPException(status_code=409, detail=f"Optimisation annulée: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_detail = f"Erreur lors de l'optimisation: {str(e)}\n{traceback.format_exc()}"
@@ -337,6 +875,232 @@ async def optimize_configuration(request: SimulationRequest) -> Dict[str, Any]:
         )
 
 
+@app.post("/optimize/stream")
+async def optimize_configuration_stream(
+    request: OptimizeRequest,
+    http_request: Request,
+    x_session_id: Optional[str] = Header(default=None)
+) -> StreamingResponse:
+    """
+    Variante de /optimize en Server-Sent Events : la progression arrive au fil du calcul.
+
+    Événements :
+        - phase : début/fin de chaque phase (current_status, max_viable_consumption,
+          min_required_max_order, recommendations), avec le résultat de la recherche à la fin
+        - step : point testé, viabilité et intervalle courant de la recherche
+        - result : réponse complète, identique à celle de /optimize
+        - cancelled / error : fin anticipée
+
+    Le calcul est annulé si le client ferme la connexion ou si une nouvelle optimisation
+    arrive avec le même en-tête X-Session-Id. Si la voie des analyses est saturée, la
+    requête est refusée (503/429) avant l'ouverture du flux.
+    """
+    client = client_key(http_request)
+    analysis_lane.check(client)
+
+    async def stream():
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+
+        def progress(event: Dict[str, Any]) -> None:
+            # Appelé depuis le thread de calcul
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        task = asyncio.ensure_future(run_cancellable(
+            lambda token: _run_optimization(request, cancel=token, progress=progress),
+            session_key=("optimize", x_session_id) if x_session_id else None,
+            lane=analysis_lane,
+            client=client
+        ))
+        try:
+            while True:
+                next_event = asyncio.ensure_future(events.get())
+                await asyncio.wait({next_event, task}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_event.done():
+                    next_event.cancel()
+                    break
+                yield _sse_message(next_event.result())
+            while not events.empty():
+                yield _sse_message(events.get_nowait())
+
+            try:
+                yield _sse_message(task.result(), event="result")
+            except OperationCancelled as e:
+                yield _sse_message({"event": "cancelled", "detail": f"Optimisation annulée: {str(e)}"})
+            except Exception as e:
+                import traceback
+                print(f"Erreur lors de l'optimisation: {str(e)}\n{traceback.format_exc()}")
+                yield _sse_message({"event": "error", "detail": f"Erreur lors de l'optimisation: {str(e)}"})
+        finally:
+            # Client déconnecté (générateur fermé) : annuler le calcul
+            task.cancel()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _optimize_arguments(request: OptimizeRequest) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Configuration et budget d'une requête /optimize (durée plafonnée par OPTIMIZE_MAX_SECONDS)"""
+    config_dict = request.model_dump(exclude={"time_budget_seconds", "simulation_budget"})
+    time_budget = request.time_budget_seconds
+    if OPTIMIZE_MAX_SECONDS > 0:
+        time_budget = min(time_budget or OPTIMIZE_MAX_SECONDS, OPTIMIZE_MAX_SECONDS)
+    return config_dict, {"time_budget": time_budget, "simulation_budget": request.simulation_budget}
+
+
+def _run_optimization(request: OptimizeRequest, **options: Any) -> Dict[str, Any]:
+    """calculate_equilibrium_point pour une requête /optimize"""
+    config_dict, budget = _optimize_arguments(request)
+    return calculate_equilibrium_point(config_dict, search_width=SEARCH_WIDTH, **budget, **options)
+
+
+def _sse_message(payload: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Message Server-Sent Events (type d'événement, données JSON sur une ligne)"""
+    data = json.dumps(jsonable_encoder(payload), separators=(",", ":"))
+    return f"event: {event or payload['event']}\ndata: {data}\n\n"
+
+
+@app.post("/optimize/pareto")
+async def optimize_pareto(
+    request: ParetoRequest,
+    http_request: Request,
+    x_session_id: Optional[str] = Header(default=None)
+) -> Dict[str, Any]:
+    """
+    Front de Pareto des réglages (seuil, stock max, quantités min/max par commande) viables
+    pour les objectifs demandés, à minimiser (stock moyen et nombre de commandes par défaut).
+
+    Chaque génération de candidats est simulée en un seul lot ; la viabilité suit les
+    règles de /optimize (pas de rupture, stock non décroissant sur au moins 60 jours).
+    """
+    unknown = [name for name in request.objectives if name not in PARETO_OBJECTIVES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Objectifs invalides: {', '.join(unknown)} (attendu: {', '.join(PARETO_OBJECTIVES)})")
+    for name, bound in request.bounds.items():
+        if name not in PARETO_VARIABLES:
+            raise HTTPException(status_code=400, detail=f"Variable inconnue: {name} (attendu: {', '.join(PARETO_VARIABLES)})")
+        if len(bound) != 2:
+            raise HTTPException(status_code=400, detail=f"Bornes de {name}: deux valeurs attendues [basse, haute]")
+    if request.population * request.generations > PARETO_MAX_EVALUATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Recherche trop grande: {request.population * request.generations} candidats (maximum {PARETO_MAX_EVALUATIONS})"
+        )
+
+    try:
+        config_dict = request.model_dump(exclude={"objectives", "bounds", "population", "generations", "seed"})
+        return await run_cancellable(
+            lambda token: pareto_front(
+                config_dict,
+                objectives=request.objectives,
+                bounds={name: tuple(bound) for name, bound in request.bounds.items()},
+                population=request.population,
+                generations=request.generations,
+                seed=request.seed,
+                cancel=token
+            ),
+            request=http_request,
+            session_key=("pareto", x_session_id) if x_session_id else None,
+            lane=analysis_lane,
+            client=client_key(http_request)
+        )
+    except OperationCancelled as e:
+        raise HTTPException(status_code=409, detail=f"Optimisation annulée: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        print(f"Erreur lors de l'optimisation multi-objectif: {str(e)}\n{traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors de l'optimisation multi-objectif: {str(e)}")
+
+
+@app.on_event("startup")
+async def start_job_workers() -> None:
+    job_queue.start(JOB_WORKERS)
+
+
+@app.on_event("shutdown")
+async def stop_executor_lanes() -> None:
+    for lane in LANES.values():
+        lane.shutdown()
+
+
+@app.post("/jobs/analyze", status_code=202)
+async def submit_analysis_job(request: SimulationRequest) -> Dict[str, Any]:
+    """
+    Soumet une analyse (/analyze) à la file de jobs.
+
+    Returns:
+        Enregistrement du job (id, status, dates) ; une analyse identique déjà soumise
+        retourne le même job
+    """
+    return public_record(job_queue.submit("analyze", request.model_dump()))
+
+
+@app.post("/jobs/optimize", status_code=202)
+async def submit_optimization_job(request: OptimizeRequest) -> Dict[str, Any]:
+    """Soumet une optimisation (/optimize, budget compris) à la file de jobs"""
+    config_dict, budget = _optimize_arguments(request)
+    return public_record(job_queue.submit("optimize", config_dict, budget))
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    """État d'un job : queued, running, done ou failed"""
+    return public_record(_job_or_404(job_id))
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str) -> Dict[str, Any]:
+    """Résultat d'un job terminé (même contenu que la réponse de /analyze ou /optimize)"""
+    record = _job_or_404(job_id)
+    if record["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Erreur lors du job: {record['error']}")
+    if record["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job pas encore terminé (statut: {record['status']})")
+    return record["result"]
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_status(job_id: str) -> StreamingResponse:
+    """
+    Suivi d'un job en Server-Sent Events : un événement "status" à chaque changement,
+    puis "result" (enregistrement avec le résultat) quand le job est terminé ou en échec.
+    """
+    _job_or_404(job_id)
+
+    async def stream():
+        status = None
+        while True:
+            record = await asyncio.to_thread(job_queue.get, job_id)
+            if record is None:
+                yield _sse_message({"event": "error", "detail": "Job inconnu ou expiré"})
+                return
+            if record["status"] != status:
+                status = record["status"]
+                yield _sse_message({"event": "status", **public_record(record)})
+            if status in ("done", "failed"):
+                yield _sse_message(public_record(record, with_result=True), event="result")
+                return
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _job_or_404(job_id: str) -> Dict[str, Any]:
+    record = job_queue.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job inconnu ou expiré")
+    return record
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
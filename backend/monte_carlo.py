@@ -0,0 +1,139 @@
+"""
+Mode stochastique : simulations de Monte Carlo avec une demande quotidienne aléatoire.
+
+La demande est tirée une seule fois (générateur initialisé par `seed`) pour toutes les
+réplications, puis les réplications sont simulées par lots vectorisés (axe "réplication"
+du moteur par lots), éventuellement répartis sur un pool de processus. Le résultat ne
+dépend donc que de la graine, pas du découpage ni du nombre de processus.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from batch_engine import simulate_batch
+from simulation_engine import config_from_dict
+
+
+DISTRIBUTIONS = ("poisson", "normal", "empirical")
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+CHUNK_SIZE = 2000  # Réplications par lot vectorisé (borne la mémoire des tableaux jour x réplication)
+
+
+def generate_demand(
+    mean: float,
+    distribution: str,
+    replications: int,
+    days: int,
+    seed: int,
+    std: Optional[float] = None,
+    samples: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """
+    Tire la demande quotidienne (réplication x jour).
+
+    - poisson : loi de Poisson de moyenne `mean`
+    - normal : loi normale (moyenne `mean`, écart-type `std`, 25% de la moyenne par défaut), tronquée à 0
+    - empirical : tirage avec remise dans `samples` (historique de ventes)
+    """
+    rng = np.random.default_rng(seed)
+    size = (replications, days)
+    if distribution == "poisson":
+        return rng.poisson(mean, size).astype(np.float64)
+    if distribution == "normal":
+        sigma = std if std is not None else mean * 0.25
+        return np.maximum(rng.normal(mean, sigma, size), 0.0)
+    if distribution == "empirical":
+        if not samples:
+            raise ValueError("La distribution empirique nécessite des échantillons de demande")
+        return rng.choice(np.asarray(samples, dtype=np.float64), size=size, replace=True)
+    raise ValueError(f"Distribution inconnue: {distribution} (attendu: {', '.join(DISTRIBUTIONS)})")
+
+
+def _simulate_chunk(config_dict: Dict, start_date: datetime, demand: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Simule un lot de réplications ; retourne seulement ce qui sert à l'agrégation"""
+    days = demand.shape[1]
+    batch = simulate_batch([config_dict] * len(demand), start_date=start_date, demand=demand)
+    served = np.clip(batch.stock_start[:, :days], 0.0, batch.consumption[:, :days])
+    return (
+        batch.stock_end[:, :days],
+        batch.has_stockout[:, :days],
+        batch.stockouts_count,
+        served.sum(axis=1),
+        batch.consumption[:, :days].sum(axis=1)
+    )
+
+
+def run_monte_carlo(
+    config_dict: Dict,
+    distribution: str = "poisson",
+    replications: int = 1000,
+    seed: int = 0,
+    std: Optional[float] = None,
+    samples: Optional[Sequence[float]] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    workers: int = 1
+) -> Dict:
+    """
+    Exécute `replications` simulations avec une demande aléatoire de moyenne daily_consumption.
+
+    Args:
+        config_dict: Configuration (mêmes clés que run_simulation_with_config)
+        distribution: "poisson", "normal" ou "empirical"
+        replications: Nombre de réplications
+        seed: Graine du générateur (résultat reproductible pour une graine donnée)
+        std: Écart-type de la loi normale
+        samples: Échantillons de demande pour la loi empirique
+        percentiles: Percentiles des bandes de stock fin de journée
+        workers: Nombre de processus (1 = tout dans le processus courant)
+
+    Returns:
+        Dict avec la probabilité de rupture, les bandes de percentiles du stock
+        fin de journée par jour et le taux de service (fill rate)
+    """
+    config, start_date = config_from_dict(config_dict)
+    start_date = start_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    days = config.simulation_days
+    demand = generate_demand(config.daily_consumption, distribution, replications, days, seed, std, samples)
+
+    chunks = [demand[i:i + CHUNK_SIZE] for i in range(0, replications, CHUNK_SIZE)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            parts = list(pool.map(_simulate_chunk, [config_dict] * len(chunks), [start_date] * len(chunks), chunks))
+    else:
+        parts = [_simulate_chunk(config_dict, start_date, chunk) for chunk in chunks]
+
+    stock_end = np.concatenate([p[0] for p in parts])
+    has_stockout = np.concatenate([p[1] for p in parts])
+    stockouts_count = np.concatenate([p[2] for p in parts])
+    served = np.concatenate([p[3] for p in parts])
+    demanded = np.concatenate([p[4] for p in parts])
+
+    fill_rates = np.divide(served, demanded, out=np.ones_like(served), where=demanded > 0)
+    bands = np.percentile(stock_end, percentiles, axis=0)
+    final_stock = stock_end[:, -1] if days else np.zeros(replications)
+
+    return {
+        "distribution": distribution,
+        "replications": replications,
+        "seed": seed,
+        "simulation_days": days,
+        "start_date": start_date.isoformat(),
+        "stockout_probability": float((stockouts_count > 0).mean()),
+        "expected_stockout_days": float(stockouts_count.mean()),
+        "stockout_probability_by_day": has_stockout.mean(axis=0).tolist(),
+        "fill_rate": float(served.sum() / demanded.sum()) if demanded.sum() > 0 else 1.0,
+        "fill_rate_percentiles": _percentile_dict(fill_rates, percentiles),
+        "final_stock_percentiles": _percentile_dict(final_stock, percentiles),
+        "stock_end_bands": {_percentile_key(p): band.tolist() for p, band in zip(percentiles, bands)},
+        "stock_end_mean": stock_end.mean(axis=0).tolist()
+    }
+
+
+def _percentile_key(p: float) -> str:
+    return f"p{p:g}"
+
+
+def _percentile_dict(values: np.ndarray, percentiles: Sequence[float]) -> Dict[str, float]:
+    return {_percentile_key(p): float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))}
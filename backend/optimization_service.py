@@ -2,12 +2,28 @@
 Service d'optimisation pour calculer précisément le point d'équilibre
 et fournir des suggestions fiables basées sur des simulations réelles.
 """
-from typing import Dict, List, Optional, Tuple
-from simulation_engine import run_simulation_with_config, analyze_stock_trend, DailyDetail
-from dateutil import parser as date_parser
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from batch_engine import BatchResult, simulate_batch
+from simulation_engine import analyze_stock_trend, DetailLevel, SimulationResult
+from result_cache import cached_verdict, simulate_config_cached
+from cancellation import CancellationToken
+from search import SearchBudget, SearchResult, StepCallback, ViabilityOracle, bisect_max, scan_first_viable
 
 
-def calculate_equilibrium_point(config: Dict) -> Dict:
+# Reçoit les événements de progression de calculate_equilibrium_point (dict avec une clé "event")
+ProgressCallback = Callable[[Dict], None]
+
+
+def calculate_equilibrium_point(
+    config: Dict,
+    search_width: int = 1,
+    time_budget: Optional[float] = None,
+    simulation_budget: Optional[int] = None,
+    cancel: Optional[CancellationToken] = None,
+    progress: Optional[ProgressCallback] = None
+) -> Dict:
     """
     Calcule le point d'équilibre exact pour la configuration donnée.
     
@@ -16,8 +32,22 @@ def calculate_equilibrium_point(config: Dict) -> Dict:
     - Pas de ruptures de stock
     - Stock reste stable ou croissant
     
+    Args:
+        config: Configuration de base
+        search_width: Points évalués ensemble à chaque tour des recherches (mode k-aire,
+            simulations par lots). Au-delà de 1, les phases 2 et 3 s'exécutent aussi en
+            parallèle. Les résultats sont identiques à la recherche séquentielle.
+        time_budget: Durée maximale des recherches (secondes), sans limite si None
+        simulation_budget: Nombre maximal de simulations des recherches, sans limite si None
+        cancel: Jeton d'annulation, vérifié avant chaque simulation (OperationCancelled)
+        progress: Appelé à chaque début/fin de phase ("phase") et après chaque point testé
+            ("step" : valeur, viabilité, intervalle courant). Peut être appelé depuis
+            plusieurs threads quand search_width > 1.
+    
     Returns:
-        Dict avec les métriques d'équilibre et recommandations précises
+        Dict avec les métriques d'équilibre et recommandations précises. Si un budget
+        est épuisé, les résultats sont les meilleurs trouvés jusque-là et "search_status"
+        indique "partial" avec les intervalles de recherche restants.
     """
     
     # Configuration de base pour tests
@@ -29,23 +59,42 @@ def calculate_equilibrium_point(config: Dict) -> Dict:
     lot_size = base_config['lot_size']
     lead_time = base_config['delivery_lead_time_days']
     
+    # Viabilité mémorisée, partagée par toutes les recherches de l'analyse (et leur budget)
+    budget = SearchBudget(time_budget, simulation_budget)
+    oracle = _viability_oracle(batched=search_width > 1, budget=budget, cancel=cancel)
+    
     # ========== PHASE 1: Tester la configuration actuelle ==========
-    current_result = run_simulation_with_config(base_config)
-    current_stats = current_result['statistics']
+    # Toujours exécutée, hors budget : c'est le point de départ des recherches
+    _emit(progress, "phase", phase="current_status", status="start")
+    current_result = simulate_config_cached(base_config, detail_level=DetailLevel.STATS)
     
     # Analyser la tendance
-    daily_details = _convert_daily_details(current_result['daily_details'])
-    current_trend = analyze_stock_trend(daily_details, 30)
+    current_trend = analyze_stock_trend(current_result.daily_details, 30)
     
     is_current_viable = _check_viability(current_result, base_config['reorder_threshold'])
+    oracle.remember(base_config, is_current_viable)
+    stock_end = current_result.series.stock_end
+    days_above_threshold = sum(1 for value in stock_end if value >= base_config['reorder_threshold'])
+    _emit(progress, "phase", phase="current_status", status="finish", is_viable=is_current_viable)
     
     # ========== PHASE 2: Calculer la consommation maximale viable ==========
-    max_viable_consumption = _find_max_viable_consumption(base_config)
-    
     # ========== PHASE 3: Calculer la quantité minimale de livraison requise ==========
-    min_required_max_order = _find_min_required_max_order(base_config)
+    if search_width > 1:
+        # Phases indépendantes : exécutées en parallèle, la mémoire de l'oracle est partagée
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            consumption_future = pool.submit(_find_max_viable_consumption, base_config, oracle, search_width, progress)
+            order_future = pool.submit(_find_min_required_max_order, base_config, oracle, search_width, progress)
+            consumption_search = consumption_future.result()
+            order_search = order_future.result()
+    else:
+        consumption_search = _find_max_viable_consumption(base_config, oracle, progress=progress)
+        order_search = _find_min_required_max_order(base_config, oracle, progress=progress)
+    max_viable_consumption = consumption_search.value
+    min_required_max_order = order_search.value
+    converged = consumption_search.converged and order_search.converged
     
     # ========== PHASE 4: Trouver la configuration optimale ==========
+    _emit(progress, "phase", phase="recommendations", status="start")
     optimal_config = _find_optimal_configuration(base_config, max_viable_consumption, min_required_max_order)
     
     # ========== PHASE 5: Générer les recommandations ==========
@@ -56,21 +105,22 @@ def calculate_equilibrium_point(config: Dict) -> Dict:
         min_required_max_order,
         optimal_config
     )
+    _emit(progress, "phase", phase="recommendations", status="finish")
     
     return {
         "current_status": {
             "is_viable": is_current_viable,
             "daily_consumption": current_consumption,
             "max_order_quantity": current_max_order,
-            "final_stock": current_stats['final_stock'],
-            "average_stock": current_stats['average_stock'],
-            "min_stock": current_stats['min_stock'],
-            "stockouts": current_stats['stockouts_count'],
+            "final_stock": current_result.final_stock,
+            "average_stock": current_result.average_stock,
+            "min_stock": current_result.min_stock,
+            "stockouts": current_result.stockouts_count,
             "trend": current_trend['trend'],
             "trend_description": current_trend['description'],
             "reorder_threshold": base_config['reorder_threshold'],
-            "days_above_threshold": sum(1 for day in daily_details if day.stock_end >= base_config['reorder_threshold']),
-            "days_above_threshold_percent": (sum(1 for day in daily_details if day.stock_end >= base_config['reorder_threshold']) / len(daily_details) * 100) if daily_details else 0
+            "days_above_threshold": days_above_threshold,
+            "days_above_threshold_percent": (days_above_threshold / len(stock_end) * 100) if stock_end else 0
         },
         "equilibrium_analysis": {
             "max_viable_consumption": max_viable_consumption,
@@ -83,33 +133,65 @@ def calculate_equilibrium_point(config: Dict) -> Dict:
         "tested_scenarios": {
             "consumption_tests": _describe_consumption_tests(base_config, max_viable_consumption),
             "order_quantity_tests": _describe_order_tests(base_config, min_required_max_order)
+        },
+        "search_statistics": {
+            "max_viable_consumption": consumption_search.to_dict(),
+            "min_required_max_order": order_search.to_dict(),
+            "total_simulations": oracle.simulations,
+            "memo_hits": oracle.memo_hits
+        },
+        "search_status": {
+            "status": "converged" if converged else "partial",
+            "converged": converged,
+            "intervals": {
+                "max_viable_consumption": [consumption_search.low, consumption_search.high],
+                "min_required_max_order": [order_search.low, order_search.high]
+            },
+            "simulations": oracle.simulations,
+            "elapsed_seconds": round(budget.elapsed(), 4),
+            "budget": budget.to_dict()
         }
     }
 
 
-def _convert_daily_details(daily_details_dict: List[Dict]) -> List[DailyDetail]:
-    """Convertit les détails quotidiens du JSON en objets DailyDetail"""
-    return [
-        DailyDetail(
-            date=date_parser.parse(d['date']),
-            day_of_week=d['day_of_week'],
-            is_working_day=d['is_working_day'],
-            stock_start=d['stock_start'],
-            deliveries=d['deliveries'],
-            consumption=d['consumption'],
-            stock_end=d['stock_end'],
-            orders_placed=d['orders_placed'],
-            order_quantity=d['order_quantity'],
-            order_id=d['order_id'],
-            delivery_id=d['delivery_id'],
-            has_threshold_crossed=d['has_threshold_crossed'],
-            has_stockout=d['has_stockout']
-        )
-        for d in daily_details_dict
-    ]
+def _emit(progress: Optional[ProgressCallback], event: str, **data) -> None:
+    if progress is not None:
+        progress({"event": event, **data})
+
+
+def _search_steps(progress: Optional[ProgressCallback], search: str) -> Optional[StepCallback]:
+    """Événements "step" d'une recherche : point testé, viabilité et intervalle courant"""
+    if progress is None:
+        return None
+    return lambda value, viable, low, high: progress(
+        {"event": "step", "search": search, "value": value, "viable": viable, "bracket": [low, high]}
+    )
 
 
-def _check_viability(result: Dict, reorder_threshold: float) -> bool:
+def _viability_oracle(
+    batched: bool = False,
+    budget: Optional[SearchBudget] = None,
+    cancel: Optional[CancellationToken] = None
+) -> ViabilityOracle:
+    """
+    Oracle de viabilité (_check_viability) : statistiques suivies pendant la simulation,
+    arrêtée dès la première rupture. Avec `batched`, les points évalués ensemble sont
+    simulés en un seul lot.
+    """
+    return ViabilityOracle(
+        lambda config: cached_verdict(config, "viability"),
+        _batch_viability if batched else None,
+        budget,
+        cancel
+    )
+
+
+def _batch_viability(configs: List[Dict]) -> List[bool]:
+    """_check_viability de chaque configuration, simulées ensemble par le moteur par lots"""
+    return check_viability_batch(simulate_batch(configs)).tolist()
+
+
+def _check_viability(result: SimulationResult, reorder_threshold: float) -> bool:
     """
     Vérifie si une configuration est viable en analysant l'évolution des moyennes sur 3 jours.
     
@@ -121,17 +203,17 @@ def _check_viability(result: Dict, reorder_threshold: float) -> bool:
     Returns:
         bool: True si la configuration est viable (tendance stable ou croissante)
     """
-    daily_details = result['daily_details']
+    stock_end = result.series.stock_end
     
     # Besoin d'au moins 12 jours pour avoir plusieurs moyennes sur 3 jours
-    if len(daily_details) < 60:
+    if len(stock_end) < 60:
         return False
     
     # Calculer les moyennes sur 3 jours glissantes (non-chevauchantes)
     three_day_averages = []
     
-    for i in range(0, len(daily_details) - 2, 3):
-        avg = sum(daily_details[j]['stock_end'] for j in range(i, min(i + 3, len(daily_details)))) / 3
+    for i in range(0, len(stock_end) - 2, 3):
+        avg = sum(stock_end[j] for j in range(i, min(i + 3, len(stock_end)))) / 3
         three_day_averages.append(avg)
     
     # Besoin d'au moins 4 moyennes pour faire une analyse de tendance fiable
@@ -154,15 +236,40 @@ def _check_viability(result: Dict, reorder_threshold: float) -> bool:
         return False
     
     # Vérifier qu'il n'y a pas de ruptures de stock
-    stats = result['statistics']
-    if stats['stockouts_count'] > 0:
+    if result.stockouts_count > 0:
         return False
     
     # Si la tendance est stable ou croissante, c'est viable
     return True
 
 
-def _find_max_viable_consumption(base_config: Dict) -> Optional[float]:
+def check_viability_batch(batch: BatchResult) -> np.ndarray:
+    """
+    _check_viability sur toutes les configurations d'un lot (tableau de booléens).
+    Mêmes sommes dans le même ordre (sommes cumulées séquentielles) : résultats identiques.
+    """
+    viable = np.zeros(len(batch), dtype=bool)
+    for days in np.unique(batch.simulation_days):
+        rows = np.flatnonzero(batch.simulation_days == days)
+        count = len(range(0, days - 2, 3))  # Nombre de moyennes sur 3 jours
+        if days < 60 or count < 10:
+            continue
+        stock_end = batch.stock_end[rows, :3 * count]
+        averages = ((stock_end[:, 0::3] + stock_end[:, 1::3]) + stock_end[:, 2::3]) / 3
+        mid_point = count // 2
+        avg_first_half = np.cumsum(averages[:, :mid_point], axis=1)[:, -1] / mid_point
+        avg_second_half = np.cumsum(averages[:, mid_point:], axis=1)[:, -1] / (count - mid_point)
+        tolerance = avg_first_half * 0.05
+        viable[rows] = ~(avg_second_half < avg_first_half - tolerance) & (batch.stockouts_count[rows] == 0)
+    return viable
+
+
+def _find_max_viable_consumption(
+    base_config: Dict,
+    oracle: ViabilityOracle,
+    search_width: int = 1,
+    progress: Optional[ProgressCallback] = None
+) -> SearchResult:
     """
     Trouve la consommation quotidienne maximale viable en testant
     différents niveaux par dichotomie.
@@ -171,50 +278,39 @@ def _find_max_viable_consumption(base_config: Dict) -> Optional[float]:
     - Moyennes sur 3 jours ne baissent pas dans le temps
     - Pas de ruptures de stock
     """
-    config = base_config.copy()
-    lot_size = config['lot_size']
-    reorder_threshold = config['reorder_threshold']
+    _emit(progress, "phase", phase="max_viable_consumption", status="start")
     
     # Commencer avec la consommation actuelle
-    current = config['daily_consumption']
+    current = base_config['daily_consumption']
     
     # Bornes de recherche
     min_consumption = 0.1
-    max_consumption = config['max_order_quantity'] * 2  # Limite haute réaliste
+    max_consumption = base_config['max_order_quantity'] * 2  # Limite haute réaliste
     
     # Tester d'abord la consommation actuelle
-    result = run_simulation_with_config(config)
-    is_current_viable = _check_viability(result, reorder_threshold)
-    
-    if is_current_viable:
+    if oracle(base_config):
         # La configuration actuelle fonctionne, chercher plus haut
         min_consumption = current
     else:
         # La configuration actuelle ne fonctionne pas, chercher plus bas
         max_consumption = current
     
-    # Dichotomie pour trouver le maximum viable
-    max_viable = None
-    precision = 0.1  # Précision de 0.1 boule/jour
-    
-    while max_consumption - min_consumption > precision:
-        test_consumption = (min_consumption + max_consumption) / 2
-        
-        config['daily_consumption'] = test_consumption
-        result = run_simulation_with_config(config)
-        
-        is_viable = _check_viability(result, reorder_threshold)
-        
-        if is_viable:
-            max_viable = test_consumption
-            min_consumption = test_consumption
-        else:
-            max_consumption = test_consumption
-    
-    return round(max_viable, 2) if max_viable else None
+    # Dichotomie pour trouver le maximum viable, précision de 0.1 boule/jour
+    search = bisect_max(
+        oracle, base_config, 'daily_consumption', min_consumption, max_consumption, 0.1,
+        width=search_width, on_step=_search_steps(progress, "max_viable_consumption")
+    )
+    search.value = round(search.value, 2) if search.value else None
+    _emit(progress, "phase", phase="max_viable_consumption", status="finish", **search.to_dict())
+    return search
 
 
-def _find_min_required_max_order(base_config: Dict) -> Optional[int]:
+def _find_min_required_max_order(
+    base_config: Dict,
+    oracle: ViabilityOracle,
+    search_width: int = 1,
+    progress: Optional[ProgressCallback] = None
+) -> SearchResult:
     """
     Trouve la quantité minimale de livraison requise pour maintenir
     le stock stable avec la consommation actuelle.
@@ -223,40 +319,31 @@ def _find_min_required_max_order(base_config: Dict) -> Optional[int]:
     - Moyennes sur 3 jours ne baissent pas dans le temps
     - Pas de ruptures de stock
     """
-    config = base_config.copy()
-    lot_size = config['lot_size']
-    current_max_order = config['max_order_quantity']
-    reorder_threshold = config['reorder_threshold']
+    _emit(progress, "phase", phase="min_required_max_order", status="start")
+    lot_size = base_config['lot_size']
+    current_max_order = base_config['max_order_quantity']
     
     # Commencer avec la quantité actuelle
     min_order = lot_size
     max_order = current_max_order * 3  # Limite haute
     
     # Tester d'abord la configuration actuelle
-    result = run_simulation_with_config(config)
-    is_current_viable = _check_viability(result, reorder_threshold)
-    
-    if is_current_viable:
+    if oracle(base_config):
         # La configuration actuelle fonctionne, peut-être qu'on peut réduire
         max_order = current_max_order
     else:
         # La configuration actuelle ne fonctionne pas, il faut augmenter
         min_order = current_max_order
     
-    # Recherche par incréments de lot_size
-    min_required = None
-    
-    for test_order in range(min_order, max_order + lot_size, lot_size):
-        config['max_order_quantity'] = test_order
-        
-        result = run_simulation_with_config(config)
-        is_viable = _check_viability(result, reorder_threshold)
-        
-        if is_viable:
-            min_required = test_order
-            break
-    
-    return min_required
+    # Multiples de lot_size parcourus dans l'ordre : la viabilité n'est pas monotone
+    # en max_order_quantity (une dichotomie peut retourner un multiple plus grand)
+    points = range(min_order, max_order + lot_size, lot_size)
+    search = scan_first_viable(
+        oracle, base_config, 'max_order_quantity', points,
+        width=search_width, on_step=_search_steps(progress, "min_required_max_order")
+    )
+    _emit(progress, "phase", phase="min_required_max_order", status="finish", **search.to_dict())
+    return search
 
 
 def _find_optimal_configuration(
@@ -275,15 +362,14 @@ def _find_optimal_configuration(
         config['daily_consumption'] = max_viable_consumption
         config['max_order_quantity'] = min_required_max_order
         
-        result = run_simulation_with_config(config)
-        daily_details = _convert_daily_details(result['daily_details'])
-        trend = analyze_stock_trend(daily_details, 30)
+        result = simulate_config_cached(config, detail_level=DetailLevel.STATS)
+        trend = analyze_stock_trend(result.daily_details, 30)
         
         return {
             "daily_consumption": max_viable_consumption,
             "max_order_quantity": min_required_max_order,
-            "final_stock": result['statistics']['final_stock'],
-            "stockouts": result['statistics']['stockouts_count'],
+            "final_stock": result.final_stock,
+            "stockouts": result.stockouts_count,
             "trend": trend['trend'],
             "is_optimal": True,
             "improvement_vs_current": {
@@ -0,0 +1,206 @@
+"""
+Optimisation multi-objectif des paramètres de réapprovisionnement.
+
+Règle le seuil de réapprovisionnement, le stock maximum et les quantités min/max par
+commande (multiples du lot) ensemble, et retourne le front de Pareto des configurations
+viables (critère de _check_viability : pas de rupture, stock non décroissant) pour des
+objectifs à minimiser (stock moyen, nombre de commandes...).
+
+Recherche évolutive : chaque génération est une population de candidats simulée en un
+seul lot par le moteur vectorisé ; la génération suivante mute les points du front
+(pas décroissant) et garde une part de candidats aléatoires. Résultat reproductible
+pour une graine donnée.
+"""
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from batch_engine import simulate_batch
+from cancellation import CancellationToken
+from optimization_service import check_viability_batch
+from simulation_engine import SimulationConfig, config_from_dict
+from sweep import CHUNK_SIZE, SWEEP_FIELDS, SWEEP_STATISTICS, grid_valid_mask
+
+
+PARETO_VARIABLES = ("reorder_threshold", "max_stock", "min_order_quantity", "max_order_quantity")
+PARETO_OBJECTIVES = SWEEP_STATISTICS
+STOCK_STEP = 0.5  # Pas des niveaux de stock proposés
+RANDOM_SHARE = 0.25  # Part de candidats aléatoires à chaque génération
+MIN_SIMULATION_DAYS = 60  # Le critère de viabilité demande au moins 60 jours
+
+_QUANTITY_VARIABLES = {"min_order_quantity", "max_order_quantity"}
+
+
+def default_bounds(config: SimulationConfig) -> Dict[str, Tuple[float, float]]:
+    """Bornes de recherche par défaut autour de la configuration (limites de l'API comprises)"""
+    lot_size = config.lot_size
+    lowest_quantity = -(-max(2, lot_size) // lot_size) * lot_size
+    highest_quantity = (100 // lot_size) * lot_size
+    max_stock_high = min(1000.0, config.max_stock * 2)
+    # Le seuil doit rester sous le stock initial (validate_stock_parameters)
+    threshold_high = config.initial_stock - STOCK_STEP if config.initial_stock > 0 else max_stock_high
+    return {
+        "reorder_threshold": (0.0, threshold_high),
+        "max_stock": (max(10.0, config.max_stock / 2), max_stock_high),
+        "min_order_quantity": (lowest_quantity, highest_quantity),
+        "max_order_quantity": (lowest_quantity, highest_quantity),
+    }
+
+
+def non_dominated(objectives: np.ndarray) -> np.ndarray:
+    """Masque des points non dominés (minimisation) parmi les lignes de `objectives`"""
+    if len(objectives) == 0:
+        return np.zeros(0, dtype=bool)
+    lower_or_equal = (objectives[:, None, :] <= objectives[None, :, :]).all(axis=2)
+    strictly_lower = (objectives[:, None, :] < objectives[None, :, :]).any(axis=2)
+    dominates = lower_or_equal & strictly_lower  # dominates[j, i] : j domine i
+    return ~dominates.any(axis=0)
+
+
+def pareto_front(
+    base_config: Dict,
+    objectives: Sequence[str] = ("average_stock", "total_orders"),
+    bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+    population: int = 256,
+    generations: int = 8,
+    seed: int = 0,
+    cancel: Optional[CancellationToken] = None
+) -> Dict:
+    """
+    Front de Pareto des configurations viables pour les objectifs donnés (à minimiser).
+
+    Args:
+        base_config: Configuration de base ; les champs hors PARETO_VARIABLES restent fixes
+        objectives: Statistiques du moteur par lots à minimiser (au moins une)
+        bounds: Bornes (basse, haute) par variable, complétées par default_bounds
+        population: Candidats simulés par génération
+        generations: Nombre de générations
+        seed: Graine du générateur aléatoire
+        cancel: Jeton d'annulation, vérifié avant chaque lot simulé (OperationCancelled)
+
+    Returns:
+        Dict avec le front (configurations et objectifs, triés sur le premier objectif),
+        le nombre de candidats évalués et viables, et la durée du calcul
+    """
+    unknown = [name for name in objectives if name not in PARETO_OBJECTIVES]
+    if not objectives or unknown:
+        raise ValueError(f"Objectifs invalides: {', '.join(unknown) or 'aucun'} (attendu: {', '.join(PARETO_OBJECTIVES)})")
+    unknown = [name for name in (bounds or {}) if name not in PARETO_VARIABLES]
+    if unknown:
+        raise ValueError(f"Variables inconnues: {', '.join(unknown)} (attendu: {', '.join(PARETO_VARIABLES)})")
+
+    started = time.monotonic()
+    config, start_date = config_from_dict(base_config)
+    start_date = start_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    config.simulation_days = max(config.simulation_days, MIN_SIMULATION_DAYS)
+    lot_size = config.lot_size
+
+    limits = default_bounds(config)
+    limits.update(bounds or {})
+    low = np.array([min(limits[name]) for name in PARETO_VARIABLES], dtype=np.float64)
+    high = np.array([max(limits[name]) for name in PARETO_VARIABLES], dtype=np.float64)
+    rng = np.random.default_rng(seed)
+
+    def snap(candidates: np.ndarray) -> np.ndarray:
+        """Ramène les candidats sur la grille : pas de stock, multiples du lot, min <= max"""
+        candidates = np.clip(candidates, low, high)
+        for column, name in enumerate(PARETO_VARIABLES):
+            step = lot_size if name in _QUANTITY_VARIABLES else STOCK_STEP
+            snapped = np.round(candidates[:, column] / step) * step
+            if name in _QUANTITY_VARIABLES:
+                # Rester dans les bornes après arrondi au lot
+                snapped = np.clip(snapped, np.ceil(low[column] / step) * step, np.floor(high[column] / step) * step)
+            candidates[:, column] = snapped
+        quantities = [PARETO_VARIABLES.index(name) for name in ("min_order_quantity", "max_order_quantity")]
+        candidates[:, quantities] = np.sort(candidates[:, quantities], axis=1)
+        return candidates
+
+    def random_candidates(count: int) -> np.ndarray:
+        return snap(rng.uniform(low, high, size=(count, len(PARETO_VARIABLES))))
+
+    evaluated: Dict[Tuple[float, ...], Optional[np.ndarray]] = {}  # Candidat -> objectifs (None si non viable)
+
+    def evaluate(candidates: np.ndarray) -> None:
+        fresh = sorted({tuple(row) for row in candidates.tolist()} - evaluated.keys())
+        if not fresh:
+            return
+        values = np.array(fresh)
+        grid = {name: np.full(len(values), getattr(config, name)) for name in SWEEP_FIELDS}
+        for column, name in enumerate(PARETO_VARIABLES):
+            grid[name] = values[:, column]
+        valid = grid_valid_mask(grid)
+        for i in np.flatnonzero(~valid):
+            evaluated[fresh[i]] = None
+        points = np.flatnonzero(valid)
+        for chunk_start in range(0, len(points), CHUNK_SIZE):
+            chunk = points[chunk_start:chunk_start + CHUNK_SIZE]
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            configs = [_candidate_config(config, values[i]) for i in chunk]
+            batch = simulate_batch(configs, start_date=start_date)
+            viable = check_viability_batch(batch)
+            scores = np.column_stack([getattr(batch, name) for name in objectives]).astype(np.float64)
+            for row, i in enumerate(chunk):
+                evaluated[fresh[i]] = scores[row] if viable[row] else None
+
+    def current_front() -> Tuple[List[Tuple[float, ...]], np.ndarray]:
+        # Un seul candidat (le plus petit) par vecteur d'objectifs
+        representatives: Dict[Tuple[float, ...], Tuple[float, ...]] = {}
+        for key, score in sorted(evaluated.items(), key=lambda item: item[0]):
+            if score is not None:
+                representatives.setdefault(tuple(score.tolist()), key)
+        if not representatives:
+            return [], np.zeros((0, len(objectives)))
+        scores = np.array(list(representatives))
+        front = non_dominated(scores)
+        return [key for key, keep in zip(representatives.values(), front) if keep], scores[front]
+
+    evaluate(random_candidates(population))
+    for generation in range(1, generations):
+        front_keys, _ = current_front()
+        randoms = population if not front_keys else int(population * RANDOM_SHARE)
+        candidates = [random_candidates(randoms)]
+        if front_keys:
+            # Mutations autour du front, d'amplitude décroissante au fil des générations
+            parents = np.array(front_keys)[rng.integers(0, len(front_keys), population - randoms)]
+            scale = (high - low) * 0.25 / (2 ** (generation - 1))
+            candidates.append(snap(parents + rng.normal(0.0, 1.0, parents.shape) * scale))
+        evaluate(np.concatenate(candidates))
+
+    front_keys, front_scores = current_front()
+    order = np.lexsort(front_scores.T[::-1]) if len(front_keys) else []
+    front = [
+        {
+            "configuration": _candidate_values(front_keys[i]),
+            "objectives": {name: float(front_scores[i, k]) for k, name in enumerate(objectives)}
+        }
+        for i in order
+    ]
+    return {
+        "objectives": list(objectives),
+        "variables": list(PARETO_VARIABLES),
+        "bounds": {name: [float(low[k]), float(high[k])] for k, name in enumerate(PARETO_VARIABLES)},
+        "simulation_days": config.simulation_days,
+        "front": front,
+        "evaluated": len(evaluated),
+        "viable": sum(score is not None for score in evaluated.values()),
+        "generations": generations,
+        "population": population,
+        "seed": seed,
+        "elapsed_seconds": round(time.monotonic() - started, 4)
+    }
+
+
+def _candidate_values(candidate: Sequence[float]) -> Dict:
+    return {
+        name: int(value) if name in _QUANTITY_VARIABLES else float(value)
+        for name, value in zip(PARETO_VARIABLES, candidate)
+    }
+
+
+def _candidate_config(config: SimulationConfig, candidate: Sequence[float]) -> SimulationConfig:
+    values = {name: getattr(config, name) for name in SWEEP_FIELDS}
+    values.update(_candidate_values(candidate))
+    return SimulationConfig(**values)
@@ -0,0 +1,229 @@
+"""
+Projection et pagination des réponses de /simulate.
+
+Une projection liste les sections de la réponse à inclure ("statistics", "events"...) ou
+des champs de ces sections ("daily_details.stock_end", "statistics.final_stock").
+Elle détermine le niveau de détail minimal de la simulation : les événements (et leurs
+descriptions) ne sont construits que s'ils sont demandés, les colonnes quotidiennes
+complètes seulement si un champ hors du niveau STATS est demandé.
+
+Les listes events et daily_details peuvent être paginées (offset / limit) et filtrées
+par plage de dates ; les lignes ne sont construites que pour la page retournée, avec
+les seuls champs demandés.
+"""
+from bisect import bisect_left
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from simulation_engine import (
+    DAY_NAMES,
+    DailySeries,
+    DetailLevel,
+    SimulationConfig,
+    SimulationEvent,
+    SimulationResult,
+    result_statistics,
+)
+
+
+EVENT_FIELDS: Dict[str, Callable[[SimulationEvent], object]] = {
+    "date": lambda e: e.date.isoformat(),
+    "event_type": lambda e: e.event_type.value,
+    "description": lambda e: e.description,
+    "stock_before": lambda e: e.stock_before,
+    "stock_after": lambda e: e.stock_after,
+    "quantity": lambda e: e.quantity,
+    "is_working_day": lambda e: e.is_working_day,
+    "order_id": lambda e: e.order_id,
+}
+
+ORDER_FIELDS = ("order_id", "order_date", "delivery_date", "quantity", "delivered")
+
+# Colonne de DailySeries -> valeur JSON du jour (mêmes conversions que _series_to_dicts)
+DAILY_FIELDS: Dict[str, Callable[[DailySeries, range], List]] = {
+    "date": lambda s, days: [(s.start_date + timedelta(days=d)).isoformat() for d in days],
+    "day_of_week": lambda s, days: [DAY_NAMES[(s.start_date + timedelta(days=d)).weekday()] for d in days],
+    "is_working_day": lambda s, days: [bool(s.is_working_day[d]) for d in days],
+    "stock_start": lambda s, days: s.stock_start[days.start:days.stop].tolist(),
+    "deliveries": lambda s, days: s.deliveries[days.start:days.stop].tolist(),
+    "consumption": lambda s, days: s.consumption[days.start:days.stop].tolist(),
+    "stock_end": lambda s, days: s.stock_end[days.start:days.stop].tolist(),
+    "orders_placed": lambda s, days: [1 if s.order_id[d] else 0 for d in days],
+    "order_quantity": lambda s, days: s.order_quantity[days.start:days.stop].tolist(),
+    "order_id": lambda s, days: [s.order_id[d] or None for d in days],
+    "delivery_id": lambda s, days: [s.delivery_id[d] or None for d in days],
+    "has_threshold_crossed": lambda s, days: [bool(s.has_threshold_crossed[d]) for d in days],
+    "has_stockout": lambda s, days: [bool(s.has_stockout[d]) for d in days],
+}
+# Champs quotidiens disponibles au niveau STATS (les autres colonnes n'y sont pas remplies)
+STATS_DAILY_FIELDS = ("date", "day_of_week", "stock_start", "stock_end", "has_stockout")
+
+STATISTICS_FIELDS = ("final_stock", "stockouts_count", "total_ordered", "average_stock",
+                     "min_stock", "max_stock", "total_events", "total_orders")
+CONFIG_FIELDS = tuple(f.name for f in fields(SimulationConfig)) + ("start_date",)
+
+# Section -> champs sélectionnables
+RESULT_SECTIONS: Dict[str, Sequence[str]] = {
+    "config": CONFIG_FIELDS,
+    "events": tuple(EVENT_FIELDS),
+    "orders": ORDER_FIELDS,
+    "daily_details": tuple(DAILY_FIELDS),
+    "statistics": STATISTICS_FIELDS,
+}
+PAGINATED_SECTIONS = ("events", "daily_details")
+
+
+@dataclass
+class Page:
+    """Pagination d'une liste : plage de dates (incluses) puis offset / limit"""
+    offset: int = 0
+    limit: Optional[int] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+
+
+class Projection:
+    """Sections de la réponse à inclure, avec pour chacune ses champs (tous si None)"""
+
+    def __init__(self, sections: Dict[str, Optional[Tuple[str, ...]]]):
+        self.sections = sections
+
+    @classmethod
+    def parse(cls, selectors: Optional[Sequence[str]]) -> "Projection":
+        """
+        Projection à partir de sélecteurs "section" ou "section.champ" (toute la réponse si None).
+        Lève ValueError pour une section ou un champ inconnu.
+        """
+        if selectors is None:
+            return cls({name: None for name in RESULT_SECTIONS})
+        sections: Dict[str, Optional[Tuple[str, ...]]] = {}
+        unknown = []
+        for selector in selectors:
+            section, _, name = selector.partition(".")
+            if section not in RESULT_SECTIONS or (name and name not in RESULT_SECTIONS[section]):
+                unknown.append(selector)
+            elif not name:
+                sections[section] = None
+            elif section not in sections or sections[section] is not None:
+                sections[section] = sections.get(section, ()) + (name,)
+        if unknown:
+            raise ValueError(f"Champs inconnus: {', '.join(unknown)}")
+        if not sections:
+            raise ValueError("Projection vide : au moins un champ attendu")
+        return cls({section: _unique(names) if names else None for section, names in sections.items()})
+
+    def fields_of(self, section: str) -> Tuple[str, ...]:
+        names = self.sections[section]
+        return tuple(RESULT_SECTIONS[section]) if names is None else names
+
+    @property
+    def detail_level(self) -> DetailLevel:
+        """Niveau de détail minimal de la simulation pour construire cette projection"""
+        if "events" in self.sections:
+            return DetailLevel.FULL
+        if "orders" in self.sections:
+            return DetailLevel.DAILY
+        if "daily_details" in self.sections and any(
+                name not in STATS_DAILY_FIELDS for name in self.fields_of("daily_details")):
+            return DetailLevel.DAILY
+        return DetailLevel.STATS
+
+
+def project_result(
+    result: SimulationResult,
+    config_dict: Dict,
+    projection: Projection,
+    pages: Optional[Dict[str, Page]] = None
+) -> Dict:
+    """
+    Réponse de /simulate réduite à la projection. La simulation doit avoir été faite au
+    niveau projection.detail_level (ou plus détaillé).
+
+    Args:
+        result: Résultat natif de la simulation
+        config_dict: Configuration de la requête (section "config")
+        projection: Sections et champs à inclure
+        pages: Pagination par liste ("events", "daily_details")
+
+    Returns:
+        Dict avec les sections demandées, et "pagination" (offset, limit, total) pour les
+        listes paginées
+    """
+    pages = pages or {}
+    response: Dict = {}
+    pagination: Dict = {}
+    for section in projection.sections:
+        names = projection.fields_of(section)
+        if section == "config":
+            response["config"] = {name: config_dict[name] for name in names if name in config_dict}
+        elif section == "statistics":
+            statistics = result_statistics(result)
+            response["statistics"] = {name: statistics[name] for name in names}
+        elif section == "orders":
+            response["orders"] = [
+                {name: value for name, value in _order_values(order).items() if name in names}
+                for order in result.orders
+            ]
+        elif section == "events":
+            events, pagination["events"] = _events_page(result.events, pages.get("events"))
+            getters = [(name, EVENT_FIELDS[name]) for name in names]
+            response["events"] = [{name: get(e) for name, get in getters} for e in events]
+        else:
+            days, pagination["daily_details"] = _days_page(result.series, pages.get("daily_details"))
+            columns = [DAILY_FIELDS[name](result.series, days) for name in names]
+            response["daily_details"] = [dict(zip(names, values)) for values in zip(*columns)]
+    pagination = {section: page for section, page in pagination.items() if page is not None}
+    if pagination:
+        response["pagination"] = pagination
+    return response
+
+
+def _unique(names: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(names))
+
+
+def _order_values(order) -> Dict:
+    return {
+        "order_id": order.order_id,
+        "order_date": order.order_date.isoformat(),
+        "delivery_date": order.delivery_date.isoformat(),
+        "quantity": order.quantity,
+        "delivered": order.delivered
+    }
+
+
+def _events_page(events: List[SimulationEvent], page: Optional[Page]) -> Tuple[List[SimulationEvent], Optional[Dict]]:
+    """Événements de la page (chronologiques : plage de dates par dichotomie)"""
+    if page is None:
+        return events, None
+    first = 0 if page.date_from is None else bisect_left(events, _midnight(page.date_from), key=lambda e: e.date)
+    last = len(events) if page.date_to is None else bisect_left(
+        events, _midnight(page.date_to) + timedelta(days=1), key=lambda e: e.date)
+    return _slice(range(first, max(first, last)), page, lambda selected: [events[i] for i in selected])
+
+
+def _days_page(series: DailySeries, page: Optional[Page]) -> Tuple[range, Optional[Dict]]:
+    """Jours de la page (indices dans les colonnes)"""
+    days = range(len(series))
+    if page is None:
+        return days, None
+    if page.date_from is not None:
+        days = days[max(0, _day_index(series, page.date_from)):]
+    if page.date_to is not None:
+        days = days[:max(0, _day_index(series, page.date_to) + 1 - days.start)]
+    return _slice(days, page, lambda selected: selected)
+
+
+def _day_index(series: DailySeries, date: datetime) -> int:
+    return (_midnight(date) - series.start_date).days
+
+
+def _midnight(date: datetime) -> datetime:
+    return date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _slice(selected: range, page: Page, build: Callable) -> Tuple:
+    total = len(selected)
+    end = total if page.limit is None else page.offset + page.limit
+    return build(selected[page.offset:end]), {"offset": page.offset, "limit": page.limit, "total": total}
@@ -0,0 +1,297 @@
+"""
+Politiques de réapprovisionnement.
+
+Une politique décide, chaque jour ouvré, s'il faut commander et combien. Elle s'écrit
+deux fois : une étape scalaire (`order`, utilisée par InventorySimulator) et une étape
+vectorisée (`order_batch`, utilisée par le moteur par lots sur un tableau de configurations).
+Les deux étapes ne lisent que les paramètres résolus par `parameters(config)` : des
+politiques de même type mais de paramètres différents partagent la même étape vectorisée,
+et on peut comparer des politiques sur de grandes grilles de paramètres en une seule passe.
+
+Grandeurs communes aux deux étapes :
+- stock : stock après les livraisons du jour
+- on_order : quantité commandée non encore livrée
+- pending : nombre de commandes en attente
+- working_day : numéro du jour ouvré (0 pour le premier jour ouvré de la simulation)
+- lead_days : nombre de jours calendaires jusqu'à la livraison d'une commande passée aujourd'hui
+"""
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from simulation_engine import SimulationConfig
+
+
+class ReplenishmentPolicy(ABC):
+    """Interface commune ; les sous-classes définissent `name`, `order` et `order_batch`"""
+
+    name = ""
+
+    def parameters(self, config: "SimulationConfig") -> Dict[str, float]:
+        """Paramètres résolus pour une configuration (les valeurs absentes viennent de la config)"""
+        return {
+            "daily_consumption": config.daily_consumption,
+            "reorder_threshold": config.reorder_threshold,
+            "max_stock": config.max_stock,
+            "min_order_quantity": config.min_order_quantity,
+            "max_order_quantity": config.max_order_quantity,
+            "lot_size": config.lot_size,
+        }
+
+    @abstractmethod
+    def order(
+        self,
+        params: Dict[str, float],
+        stock: float,
+        on_order: float,
+        pending: int,
+        working_day: int,
+        lead_days: int
+    ) -> Optional[int]:
+        """Quantité à commander aujourd'hui, None pour ne pas commander"""
+
+    @abstractmethod
+    def order_batch(
+        self,
+        params: Dict[str, np.ndarray],
+        stock: np.ndarray,
+        on_order: np.ndarray,
+        pending: np.ndarray,
+        working_day: int,
+        lead_days: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Version vectorisée de `order` : (masque des configurations qui commandent, quantités)"""
+
+
+def capped_quantity(params: Dict[str, float], projected_stock: float) -> int:
+    """
+    Quantité maximale sans dépasser max_stock à la livraison : plafonnée à
+    max_order_quantity, arrondie au lot inférieur, au moins min_order_quantity.
+    """
+    lot_size = params["lot_size"]
+    min_order = params["min_order_quantity"]
+
+    # Calculer le maximum qu'on peut commander sans dépasser max_stock
+    max_quantity_allowed = params["max_stock"] - projected_stock
+
+    # Arrondir au lot inférieur
+    max_quantity_allowed = (int(max_quantity_allowed) // lot_size) * lot_size
+
+    # Prendre le minimum entre max_order_quantity et ce qui ne dépasse pas max_stock
+    quantity = min(params["max_order_quantity"], max_quantity_allowed)
+
+    # S'assurer que c'est au moins le minimum (sauf si ça dépasse max_stock)
+    if quantity < min_order:
+        quantity = min_order
+
+    # Assurer que c'est un multiple du lot
+    quantity = (quantity // lot_size) * lot_size
+
+    return max(quantity, min_order)
+
+
+def capped_quantity_batch(params: Dict[str, np.ndarray], projected_stock: np.ndarray) -> np.ndarray:
+    """Version vectorisée de capped_quantity"""
+    lot_size = params["lot_size"]
+    min_order = params["min_order_quantity"]
+    allowed = np.trunc(params["max_stock"] - projected_stock).astype(np.int64)
+    allowed = (allowed // lot_size) * lot_size
+    quantity = np.minimum(params["max_order_quantity"], allowed)
+    quantity = np.where(quantity < min_order, min_order, quantity)
+    quantity = (quantity // lot_size) * lot_size
+    return np.maximum(quantity, min_order)
+
+
+def _up_to_quantity(params: Dict[str, float], missing: float) -> Optional[int]:
+    """
+    Quantité pour compléter `missing` : arrondie au lot inférieur, bornée par min/max commande.
+    None s'il manque moins d'un lot.
+    """
+    lot_size = params["lot_size"]
+    quantity = (int(missing) // lot_size) * lot_size
+    if quantity <= 0:
+        return None
+    return max(min(quantity, params["max_order_quantity"]), params["min_order_quantity"])
+
+
+def _up_to_quantity_batch(params: Dict[str, np.ndarray], missing: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Version vectorisée de _up_to_quantity : (masque des quantités valides, quantités)"""
+    lot_size = params["lot_size"]
+    quantity = (np.trunc(missing).astype(np.int64) // lot_size) * lot_size
+    ordering = quantity > 0
+    quantity = np.maximum(np.minimum(quantity, params["max_order_quantity"]), params["min_order_quantity"])
+    return ordering, quantity
+
+
+class SingleOrderMaxPolicy(ReplenishmentPolicy):
+    """
+    Règle historique : une seule commande en attente à la fois, passée quand le stock
+    projeté au jour de livraison est <= reorder_threshold, toujours pour le maximum possible.
+    """
+
+    name = "single_order_max"
+
+    def order(self, params, stock, on_order, pending, working_day, lead_days):
+        # RÈGLE 1 : On ne commande que si aucune livraison n'est en attente
+        if pending > 0:
+            return None
+
+        # Stock projeté AU MOMENT de la livraison (avant réception)
+        projected_stock_at_delivery = stock - (lead_days * params["daily_consumption"])
+
+        # RÈGLE 2 : Commander si le stock projeté sera <= seuil le jour de livraison
+        if not projected_stock_at_delivery <= params["reorder_threshold"]:
+            return None
+        return capped_quantity(params, projected_stock_at_delivery)
+
+    def order_batch(self, params, stock, on_order, pending, working_day, lead_days):
+        projected = stock - lead_days * params["daily_consumption"]
+        ordering = (pending == 0) & (projected <= params["reorder_threshold"])
+        return ordering, capped_quantity_batch(params, projected)
+
+
+class MinMaxPolicy(ReplenishmentPolicy):
+    """
+    Politique (s, S) : quand la position de stock (stock + en commande) est <= s,
+    commander pour remonter la position à S.
+    Par défaut s = reorder_threshold et S = max_stock.
+    """
+
+    name = "min_max"
+
+    def __init__(self, reorder_point: Optional[float] = None, order_up_to: Optional[float] = None):
+        self.reorder_point = reorder_point
+        self.order_up_to = order_up_to
+
+    def parameters(self, config):
+        params = super().parameters(config)
+        params["reorder_point"] = config.reorder_threshold if self.reorder_point is None else self.reorder_point
+        params["order_up_to"] = config.max_stock if self.order_up_to is None else self.order_up_to
+        return params
+
+    def order(self, params, stock, on_order, pending, working_day, lead_days):
+        position = stock + on_order
+        if position > params["reorder_point"]:
+            return None
+        return _up_to_quantity(params, params["order_up_to"] - position)
+
+    def order_batch(self, params, stock, on_order, pending, working_day, lead_days):
+        position = stock + on_order
+        ordering, quantity = _up_to_quantity_batch(params, params["order_up_to"] - position)
+        return ordering & (position <= params["reorder_point"]), quantity
+
+
+class FixedQuantityPolicy(ReplenishmentPolicy):
+    """
+    Politique (R, Q) : quand la position de stock est <= R, commander une quantité fixe Q
+    (arrondie au lot, au moins min_order_quantity).
+    Par défaut R = reorder_threshold et Q = max_order_quantity.
+    """
+
+    name = "fixed_quantity"
+
+    def __init__(self, reorder_point: Optional[float] = None, quantity: Optional[int] = None):
+        self.reorder_point = reorder_point
+        self.quantity = quantity
+
+    def parameters(self, config):
+        params = super().parameters(config)
+        params["reorder_point"] = config.reorder_threshold if self.reorder_point is None else self.reorder_point
+        quantity = config.max_order_quantity if self.quantity is None else self.quantity
+        params["quantity"] = max((int(quantity) // config.lot_size) * config.lot_size, config.min_order_quantity)
+        return params
+
+    def order(self, params, stock, on_order, pending, working_day, lead_days):
+        if stock + on_order > params["reorder_point"] or params["quantity"] <= 0:
+            return None
+        return params["quantity"]
+
+    def order_batch(self, params, stock, on_order, pending, working_day, lead_days):
+        quantity = params["quantity"]
+        ordering = (stock + on_order <= params["reorder_point"]) & (quantity > 0)
+        return ordering, np.broadcast_to(quantity, stock.shape)
+
+
+class PeriodicReviewPolicy(ReplenishmentPolicy):
+    """
+    Révision périodique (R, S) : tous les `review_period` jours ouvrés, commander pour
+    remonter la position de stock à S. Par défaut S = max_stock.
+    """
+
+    name = "periodic_review"
+
+    def __init__(self, review_period: int = 6, order_up_to: Optional[float] = None):
+        if review_period < 1:
+            raise ValueError("La période de révision doit être d'au moins 1 jour ouvré")
+        self.review_period = review_period
+        self.order_up_to = order_up_to
+
+    def parameters(self, config):
+        params = super().parameters(config)
+        params["review_period"] = self.review_period
+        params["order_up_to"] = config.max_stock if self.order_up_to is None else self.order_up_to
+        return params
+
+    def order(self, params, stock, on_order, pending, working_day, lead_days):
+        if working_day % params["review_period"] != 0:
+            return None
+        return _up_to_quantity(params, params["order_up_to"] - (stock + on_order))
+
+    def order_batch(self, params, stock, on_order, pending, working_day, lead_days):
+        ordering, quantity = _up_to_quantity_batch(params, params["order_up_to"] - (stock + on_order))
+        return ordering & (working_day % params["review_period"] == 0), quantity
+
+
+class BaseStockPolicy(ReplenishmentPolicy):
+    """
+    Stock de base : chaque jour ouvré, recommander ce qui manque pour que la position
+    de stock revienne au niveau `base_stock` (max_stock par défaut).
+    """
+
+    name = "base_stock"
+
+    def __init__(self, base_stock: Optional[float] = None):
+        self.base_stock = base_stock
+
+    def parameters(self, config):
+        params = super().parameters(config)
+        params["base_stock"] = config.max_stock if self.base_stock is None else self.base_stock
+        return params
+
+    def order(self, params, stock, on_order, pending, working_day, lead_days):
+        return _up_to_quantity(params, params["base_stock"] - (stock + on_order))
+
+    def order_batch(self, params, stock, on_order, pending, working_day, lead_days):
+        return _up_to_quantity_batch(params, params["base_stock"] - (stock + on_order))
+
+
+POLICIES: Dict[str, Type[ReplenishmentPolicy]] = {
+    policy.name: policy
+    for policy in (SingleOrderMaxPolicy, MinMaxPolicy, FixedQuantityPolicy, PeriodicReviewPolicy, BaseStockPolicy)
+}
+
+
+def policy_from_dict(spec: Optional[Dict]) -> ReplenishmentPolicy:
+    """Construit une politique depuis {"type": ..., <paramètres>} (règle historique si None)"""
+    if not spec:
+        return SingleOrderMaxPolicy()
+    options = dict(spec)
+    policy_type = options.pop("type", SingleOrderMaxPolicy.name)
+    if policy_type not in POLICIES:
+        raise ValueError(f"Politique inconnue: {policy_type} (attendu: {', '.join(POLICIES)})")
+    return POLICIES[policy_type](**{k: v for k, v in options.items() if v is not None})
+
+
+_INTEGER_PARAMETERS = {"min_order_quantity", "max_order_quantity", "lot_size", "quantity", "review_period"}
+
+
+def stack_parameters(params: List[Dict[str, float]]) -> Dict[str, np.ndarray]:
+    """Empile les paramètres résolus de plusieurs configurations (une colonne par paramètre)"""
+    if not params:
+        return {}
+    return {
+        name: np.array([p[name] for p in params], dtype=np.int64 if name in _INTEGER_PARAMETERS else np.float64)
+        for name in params[0]
+    }
@@ -0,0 +1,264 @@
+"""
+Cache des résultats de simulation, indexé par un hash canonique de la configuration.
+
+- L1 : LRU en mémoire du processus, borné en nombre d'entrées et en taille
+- L2 (optionnel) : cache partagé entre workers, dans le Redis du docker-compose
+  (SIMULATION_CACHE_REDIS_URL). InMemoryBackend le remplace en local et dans les tests.
+
+La simulation étant déterministe pour une configuration et une date de début données,
+la clé inclut la date de début résolue (aujourd'hui si absente) et la version du moteur.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import fields
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from simulation_engine import (
+    SimulationConfig,
+    SimulationResult,
+    DetailLevel,
+    run_simulation_with_config,
+    simulate_config,
+    simulate_tracked,
+    config_from_dict,
+)
+
+
+# À incrémenter à chaque changement de comportement du moteur (invalide le cache L2 partagé)
+ENGINE_VERSION = "2.0"
+
+_CONFIG_TYPES = {f.name: f.type for f in fields(SimulationConfig)}
+
+
+def canonical_config(config_dict: Dict) -> Dict:
+    """
+    Configuration normalisée : valeurs par défaut complétées, types numériques uniformisés,
+    start_date résolue en date ISO (aujourd'hui à minuit si absente).
+    """
+    config, start_date = config_from_dict(config_dict)
+    canonical: Dict[str, Any] = {}
+    for name, field_type in _CONFIG_TYPES.items():
+        value = getattr(config, name)
+        canonical[name] = float(value) if field_type in (float, "float") else int(value)
+    start_date = start_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    canonical["start_date"] = start_date.isoformat()
+    return canonical
+
+
+def config_hash(config_dict: Dict, **extra: Any) -> str:
+    """Hash stable (sha256) de la configuration canonique, de la version du moteur et des options"""
+    payload = {"engine": ENGINE_VERSION, "config": canonical_config(config_dict), **extra}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class InMemoryBackend:
+    """Remplaçant local de Redis (mêmes appels get/set avec expiration)"""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+
+class RedisBackend:
+    """Cache L2 dans Redis ; les erreurs réseau sont ignorées (le cache ne doit jamais faire échouer une requête)"""
+
+    def __init__(self, url: str):
+        import redis  # Dépendance optionnelle, seulement si un Redis est configuré
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._client.get(key)
+        except Exception:
+            return None
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None:
+        try:
+            self._client.set(key, value, ex=ex)
+        except Exception:
+            pass
+
+
+class SimulationCache:
+    """LRU en mémoire (L1) devant un cache partagé optionnel (L2), avec compteurs de hits/misses"""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        max_bytes: int = 64 * 1024 * 1024,
+        l2: Optional[Any] = None,
+        l2_ttl: int = 3600,
+        namespace: str = "simulation"
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.l2 = l2
+        self.l2_ttl = l2_ttl
+        self.namespace = namespace
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits_l1 = 0
+        self.hits_l2 = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "SimulationCache":
+        redis_url = os.getenv("SIMULATION_CACHE_REDIS_URL")
+        l2 = None
+        if redis_url:
+            try:
+                l2 = RedisBackend(redis_url)
+            except ImportError:
+                print("SIMULATION_CACHE_REDIS_URL défini mais le module redis n'est pas installé : cache L2 désactivé")
+        return cls(
+            max_entries=int(os.getenv("SIMULATION_CACHE_MAX_ENTRIES", "512")),
+            max_bytes=int(float(os.getenv("SIMULATION_CACHE_MAX_MB", "64")) * 1024 * 1024),
+            l2=l2,
+            l2_ttl=int(os.getenv("SIMULATION_CACHE_TTL", "3600"))
+        )
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        size_of: Optional[Callable[[Any], int]] = None
+    ) -> Any:
+        """
+        Retourne la valeur en cache (L1 puis L2) ou la calcule et la stocke.
+
+        Sans `size_of`, la valeur doit être sérialisable en JSON (elle peut aller en L2).
+        Avec `size_of` (objets natifs), la valeur reste en L1 et sa taille est estimée.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits_l1 += 1
+                return entry[0]
+
+        if size_of is not None:
+            with self._lock:
+                self.misses += 1
+            value = compute()
+            self._store(key, value, size_of(value))
+            return value
+
+        l2_key = f"{self.namespace}:{key}"
+        if self.l2 is not None:
+            raw = self.l2.get(l2_key)
+            if raw is not None:
+                value = json.loads(raw)
+                self._store(key, value, len(raw))
+                with self._lock:
+                    self.hits_l2 += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        self._store(key, value, len(raw))
+        if self.l2 is not None:
+            self.l2.set(l2_key, raw, ex=self.l2_ttl)
+        return value
+
+    def _store(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits_l1 + self.hits_l2 + self.misses
+            return {
+                "hits_l1": self.hits_l1,
+                "hits_l2": self.hits_l2,
+                "misses": self.misses,
+                "hit_rate": round((self.hits_l1 + self.hits_l2) / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "l2_enabled": self.l2 is not None
+            }
+
+
+simulation_cache = SimulationCache.from_env()
+
+
+def run_simulation_cached(config_dict: Dict, detail_level: DetailLevel = DetailLevel.FULL) -> Dict:
+    """
+    run_simulation_with_config avec cache. Le résultat partagé ne doit pas être modifié ;
+    seule la clé "config" reflète le dictionnaire passé par l'appelant.
+    """
+    detail_level = DetailLevel(detail_level)
+    key = config_hash(config_dict, detail_level=detail_level.value)
+    result = simulation_cache.get_or_compute(key, lambda: run_simulation_with_config(config_dict, detail_level))
+    return {**result, "config": config_dict}
+
+
+def _result_size(result: SimulationResult) -> int:
+    """Estimation de l'empreinte mémoire d'un résultat natif (colonnes + objets)"""
+    days = len(result.series) if result.series is not None else 0
+    return 64 * days + 400 * len(result.events) + 250 * len(result.orders) + 500
+
+
+def simulate_config_cached(config_dict: Dict, detail_level: DetailLevel = DetailLevel.FULL) -> SimulationResult:
+    """
+    simulate_config avec cache (L1 uniquement : résultat natif, sans sérialisation).
+    Le résultat partagé ne doit pas être modifié.
+    """
+    detail_level = DetailLevel(detail_level)
+    key = config_hash(config_dict, detail_level=detail_level.value, native=True)
+    return simulation_cache.get_or_compute(key, lambda: simulate_config(config_dict, detail_level), size_of=_result_size)
+
+
+VERDICTS = {
+    "viability": lambda tracker: tracker.viable(),
+    "stability": lambda tracker: tracker.stable(),
+}
+
+
+def cached_verdict(config_dict: Dict, criterion: str) -> bool:
+    """
+    Verdict de viabilité ("viability", critère de _check_viability) ou de stabilité
+    ("stability", critère de find_stability_solutions) avec cache (L1 et L2 : un booléen).
+    La simulation s'arrête à la première rupture, qui décide du verdict.
+    """
+    key = config_hash(config_dict, verdict=criterion)
+    return simulation_cache.get_or_compute(key, lambda: VERDICTS[criterion](simulate_tracked(config_dict)))
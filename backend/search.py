@@ -0,0 +1,387 @@
+"""
+Recherches monotones sur un paramètre de configuration (consommation, quantité max, ...).
+
+Un oracle de viabilité évalue un prédicat sur des configurations complètes ; il garde
+en mémoire les points déjà évalués (partagés entre les recherches d'une même analyse)
+et compte les simulations réellement exécutées.
+
+Deux recherches, en supposant la viabilité monotone le long du paramètre :
+- bisect_max : dichotomie sur un intervalle réel, plus grande valeur viable
+- first_viable : premier point viable d'un réseau de points (multiples du lot, pas de 0.5...),
+  par dichotomie, avec une phase de galop optionnelle quand la réponse est
+  probablement proche du début du réseau
+
+Pour un prédicat non monotone (critère de stabilité : la tendance peut redevenir
+descendante plus loin dans le réseau), scan_first_viable parcourt le réseau dans l'ordre
+et retourne le premier point viable, comme un parcours linéaire simple.
+
+Mode k-aire (`width` > 1) : à chaque tour, tous les points que la recherche séquentielle
+pourrait visiter dans les j prochaines étapes (k = 2^j - 1 points) sont évalués ensemble
+par le prédicat par lots de l'oracle, puis les j étapes sont rejouées depuis la mémoire.
+Les points visités, et donc les résultats, sont exactement ceux de la recherche séquentielle.
+
+Budget (SearchBudget) : quand le temps ou le nombre de simulations de l'oracle est épuisé,
+les recherches s'arrêtent et retournent le meilleur résultat connu et l'intervalle courant
+(converged = False).
+
+Annulation (CancellationToken) : l'oracle vérifie le jeton avant chaque simulation et lève
+OperationCancelled ; contrairement au budget, la recherche est abandonnée sans résultat.
+
+Progression : `on_step(value, viable, low, high)` est appelé après chaque point testé
+(galop compris), avec l'intervalle courant exprimé en valeurs du paramètre.
+"""
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cancellation import CancellationToken
+
+StepCallback = Callable[[Any, bool, Any, Any], None]
+
+
+class BudgetExhausted(Exception):
+    """Le budget de la recherche ne permet plus de simulation"""
+
+
+class SearchBudget:
+    """Limite de temps (secondes, depuis la création) et/ou de nombre de simulations"""
+
+    def __init__(self, seconds: Optional[float] = None, simulations: Optional[int] = None):
+        self.started = time.monotonic()
+        self.deadline = self.started + seconds if seconds is not None else None
+        self.seconds = seconds
+        self.simulations = simulations
+
+    def allows(self, simulations: int) -> bool:
+        """Vrai si `simulations` simulations au total restent dans le budget"""
+        if self.simulations is not None and simulations > self.simulations:
+            return False
+        return self.deadline is None or time.monotonic() < self.deadline
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def to_dict(self) -> Dict:
+        return {"seconds": self.seconds, "simulations": self.simulations}
+
+
+class ViabilityOracle:
+    """
+    Prédicat de viabilité mémorisé, avec compteurs de simulations et de réutilisations.
+    Utilisable depuis plusieurs threads (les évaluations se font hors verrou).
+    """
+
+    def __init__(
+        self,
+        predicate: Callable[[Dict], bool],
+        batch_predicate: Optional[Callable[[List[Dict]], List[bool]]] = None,
+        budget: Optional[SearchBudget] = None,
+        cancel: Optional[CancellationToken] = None
+    ):
+        self.predicate = predicate
+        self.batch_predicate = batch_predicate
+        self.budget = budget
+        self.cancel = cancel
+        self._memo: Dict[Tuple, bool] = {}
+        self._lock = threading.Lock()
+        self.simulations = 0
+        self.memo_hits = 0
+
+    def __call__(self, config: Dict) -> bool:
+        return self.evaluate([config])[0][0]
+
+    def evaluate(self, configs: List[Dict]) -> Tuple[List[bool], int]:
+        """
+        Viabilité de chaque configuration et nombre de simulations exécutées pour l'obtenir.
+        Les configurations absentes de la mémoire sont évaluées ensemble (prédicat par lots).
+        Lève BudgetExhausted si le budget ne permet pas de les simuler toutes,
+        OperationCancelled si le calcul a été annulé.
+        """
+        keys = [tuple(sorted(config.items())) for config in configs]
+        with self._lock:
+            missing = {}
+            for key, config in zip(keys, configs):
+                if key in self._memo:
+                    self.memo_hits += 1
+                else:
+                    missing.setdefault(key, config)
+            if missing and self.budget is not None and not self.budget.allows(self.simulations + len(missing)):
+                raise BudgetExhausted()
+
+        if missing:
+            if self.cancel is not None:
+                self.cancel.raise_if_cancelled()
+            values = self._compute(list(missing.values()))
+            with self._lock:
+                self._memo.update(zip(missing, values))
+                self.simulations += len(missing)
+
+        with self._lock:
+            return [self._memo[key] for key in keys], len(missing)
+
+    def remember(self, config: Dict, viable: bool) -> None:
+        """Ajoute une viabilité déjà connue à la mémoire (sans la compter comme simulation)"""
+        with self._lock:
+            self._memo[tuple(sorted(config.items()))] = viable
+
+    def _compute(self, configs: List[Dict]) -> List[bool]:
+        if self.batch_predicate is not None and len(configs) > 1:
+            try:
+                return list(self.batch_predicate(configs))
+            except Exception:
+                pass  # Une configuration invalide fait échouer le lot : évaluation une par une
+        values = []
+        for config in configs:
+            if self.cancel is not None:
+                self.cancel.raise_if_cancelled()
+            values.append(self.predicate(config))
+        return values
+
+
+class _Probe:
+    """Prédicat sur une seule valeur d'un paramètre, qui compte les simulations qu'il a coûté"""
+
+    def __init__(self, oracle: ViabilityOracle, base_config: Dict, name: str):
+        self.oracle = oracle
+        self.base_config = base_config
+        self.name = name
+        self.simulations = 0
+
+    def __call__(self, value: Any) -> bool:
+        return self.prefetch([value])[0]
+
+    def prefetch(self, values: List[Any]) -> List[bool]:
+        viable, simulations = self.oracle.evaluate([{**self.base_config, self.name: v} for v in values])
+        self.simulations += simulations
+        return viable
+
+    def speculate(self, values: List[Any]) -> None:
+        """Évaluation anticipée ; ignorée si le budget ne la permet pas (l'étape suivante décidera)"""
+        try:
+            self.prefetch(values)
+        except BudgetExhausted:
+            pass
+
+
+@dataclass
+class SearchResult:
+    """
+    Résultat d'une recherche : valeur trouvée (None si aucune) et intervalle final.
+    Si converged est faux (budget épuisé), la valeur est la meilleure connue à l'arrêt.
+    """
+    value: Optional[Any]
+    low: Any  # Dernière borne non viable connue (ou borne de départ)
+    high: Any
+    simulations: int  # Simulations exécutées par cette recherche (hors mémoire)
+    converged: bool = True
+
+    def to_dict(self) -> Dict:
+        return {
+            "value": self.value,
+            "low": self.low,
+            "high": self.high,
+            "simulations": self.simulations,
+            "converged": self.converged
+        }
+
+
+class Lattice(Sequence):
+    """Réseau de points start + k * step, k = 0..count-1 (pas négatif pour descendre)"""
+
+    def __init__(self, start: Any, step: Any, count: int):
+        self.start = start
+        self.step = step
+        self.count = max(count, 0)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, k: int):
+        if not 0 <= k < self.count:
+            raise IndexError(k)
+        return self.start + self.step * k
+
+
+def speculation_depth(width: int) -> int:
+    """Nombre d'étapes j évaluées par tour avec au plus `width` points (k = 2^j - 1)"""
+    depth = 1
+    while 2 ** (depth + 1) - 1 <= width:
+        depth += 1
+    return depth
+
+
+def bisect_max(
+    oracle: ViabilityOracle,
+    base_config: Dict,
+    name: str,
+    low: float,
+    high: float,
+    precision: float,
+    width: int = 1,
+    on_step: Optional[StepCallback] = None
+) -> SearchResult:
+    """
+    Plus grande valeur viable de `name` dans ]low, high[, à `precision` près
+    (viable en dessous, non viable au-dessus). Seuls les milieux sont testés :
+    None si aucun milieu n'est viable.
+    """
+    viable = _Probe(oracle, base_config, name)
+    depth = speculation_depth(width)
+    best = None
+    step = 0
+    try:
+        while high - low > precision:
+            if depth > 1 and step % depth == 0:
+                viable.speculate(_real_tree(low, high, precision, depth))
+            step += 1
+            middle = (low + high) / 2
+            is_viable = viable(middle)
+            if is_viable:
+                best = middle
+                low = middle
+            else:
+                high = middle
+            if on_step is not None:
+                on_step(middle, is_viable, low, high)
+    except BudgetExhausted:
+        return SearchResult(best, low, high, viable.simulations, converged=False)
+    return SearchResult(best, low, high, viable.simulations)
+
+
+def first_viable(
+    oracle: ViabilityOracle,
+    base_config: Dict,
+    name: str,
+    points: Sequence,
+    gallop: bool = False,
+    width: int = 1,
+    on_step: Optional[StepCallback] = None
+) -> SearchResult:
+    """
+    Premier point viable de `points` (non viable avant, viable après).
+
+    Avec `gallop`, teste les indices 0, 1, 3, 7, ... jusqu'au premier point viable,
+    puis termine par dichotomie : coût en log2 de la position de la réponse
+    plutôt que de la taille du réseau.
+    """
+    viable = _Probe(oracle, base_config, name)
+    depth = speculation_depth(width)
+    count = len(points)
+    low, high = -1, count  # Indices : low non viable, high viable (count = aucun)
+    converged = True
+
+    def point(index: int) -> Optional[Any]:
+        return points[index] if 0 <= index < count else None
+
+    def step_done(index: int, is_viable: bool) -> None:
+        if on_step is not None:
+            on_step(points[index], is_viable, point(low), point(high))
+
+    try:
+        if gallop:
+            k, step = 0, 1
+            gallop_steps = 0
+            while k < count:
+                if depth > 1 and gallop_steps % width == 0:
+                    viable.speculate([points[i] for i in _gallop_indices(k, step, count, width)])
+                gallop_steps += 1
+                if viable(points[k]):
+                    high = k
+                    step_done(k, True)
+                    break
+                low = k
+                step_done(k, False)
+                k += step
+                step *= 2
+
+        step = 0
+        while high - low > 1:
+            if depth > 1 and step % depth == 0:
+                viable.speculate([points[i] for i in _index_tree(low, high, depth)])
+            step += 1
+            middle = (low + high) // 2
+            is_viable = viable(points[middle])
+            if is_viable:
+                high = middle
+            else:
+                low = middle
+            step_done(middle, is_viable)
+    except BudgetExhausted:
+        # Le meilleur connu est le plus petit point viable déjà trouvé (borne haute)
+        converged = False
+
+    return SearchResult(point(high), point(low), point(high), viable.simulations, converged)
+
+
+def scan_first_viable(
+    oracle: ViabilityOracle,
+    base_config: Dict,
+    name: str,
+    points: Sequence,
+    width: int = 1,
+    on_step: Optional[StepCallback] = None
+) -> SearchResult:
+    """
+    Premier point viable de `points`, testés dans l'ordre (aucune hypothèse de monotonie).
+
+    En mode k-aire, les `width` points suivants sont évalués ensemble ; le résultat est
+    celui du parcours séquentiel (les points au-delà du premier viable sont perdus).
+    """
+    viable = _Probe(oracle, base_config, name)
+    count = len(points)
+    low = None  # Dernier point non viable testé
+    try:
+        for k in range(count):
+            if width > 1 and k % width == 0:
+                viable.speculate([points[i] for i in range(k, min(k + width, count))])
+            is_viable = viable(points[k])
+            if on_step is not None:
+                on_step(points[k], is_viable, low, points[k] if is_viable else None)
+            if is_viable:
+                return SearchResult(points[k], low, points[k], viable.simulations)
+            low = points[k]
+    except BudgetExhausted:
+        return SearchResult(None, low, None, viable.simulations, converged=False)
+    return SearchResult(None, low, None, viable.simulations)
+
+
+def _real_tree(low: float, high: float, precision: float, depth: int) -> List[float]:
+    """Milieux que bisect_max peut visiter dans les `depth` prochaines étapes"""
+    points = []
+    frontier = [(low, high)]
+    for _ in range(depth):
+        following = []
+        for a, b in frontier:
+            if b - a > precision:
+                middle = (a + b) / 2
+                points.append(middle)
+                following += [(middle, b), (a, middle)]
+        frontier = following
+    return points
+
+
+def _index_tree(low: int, high: int, depth: int) -> List[int]:
+    """Indices que la dichotomie de first_viable peut visiter dans les `depth` prochaines étapes"""
+    points = []
+    frontier = [(low, high)]
+    for _ in range(depth):
+        following = []
+        for a, b in frontier:
+            if b - a > 1:
+                middle = (a + b) // 2
+                points.append(middle)
+                following += [(a, middle), (middle, b)]
+        frontier = following
+    return points
+
+
+def _gallop_indices(k: int, step: int, count: int, width: int) -> List[int]:
+    """Les `width` prochains indices de la phase de galop (k, k + step, ...)"""
+    indices = []
+    while k < count and len(indices) < width:
+        indices.append(k)
+        k += step
+        step *= 2
+    return indices
@@ -0,0 +1,157 @@
+"""
+Analyse de sensibilité : effet de petites variations de chaque paramètre sur les résultats.
+
+Pour chaque champ de SimulationConfig, la configuration est perturbée vers le haut et
+vers le bas ; la configuration de base et toutes les perturbations valides sont simulées
+en un seul lot par le moteur vectorisé. Chaque ligne du tableau donne, par statistique,
+les valeurs perturbées, la pente (différence centrée, ou unilatérale si une seule
+perturbation est valide) et l'élasticité (variation relative du résultat pour une
+variation relative du paramètre).
+
+Une perturbation hors des bornes des champs (celles du modèle de requête de l'API, passées
+par l'appelant) est ignorée, comme une perturbation qui viole les règles métier.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from batch_engine import simulate_batch
+from simulation_engine import SimulationConfig, config_from_dict
+from sweep import SWEEP_FIELDS, SWEEP_STATISTICS, INTEGER_FIELDS, INTEGER_STATISTICS, grid_valid_mask
+
+
+SENSITIVITY_STATISTICS = SWEEP_STATISTICS
+DEFAULT_STATISTICS = ("final_stock", "min_stock", "stockouts_count", "average_stock")
+
+# Bornes incluses (basse, haute) d'un champ ; None : pas de borne de ce côté
+Bounds = Dict[str, Tuple[Optional[float], Optional[float]]]
+# Quantités perturbées d'un lot, pour rester multiples de lot_size
+_LOT_FIELDS = {"min_order_quantity", "max_order_quantity"}
+
+
+def perturbation_step(config: SimulationConfig, name: str, relative_step: float) -> float:
+    """Pas de perturbation d'un champ : relatif, au moins une unité (un lot) pour les entiers"""
+    value = getattr(config, name)
+    if name in _LOT_FIELDS:
+        return config.lot_size * max(1, round(abs(value) * relative_step / config.lot_size))
+    if name in INTEGER_FIELDS:
+        return max(1, round(abs(value) * relative_step))
+    return abs(value) * relative_step if value != 0 else relative_step
+
+
+def run_sensitivity(
+    base_config: Dict,
+    relative_step: float = 0.05,
+    fields: Sequence[str] = SWEEP_FIELDS,
+    statistics: Sequence[str] = DEFAULT_STATISTICS,
+    bounds: Optional[Bounds] = None
+) -> Dict:
+    """
+    Tableau de sensibilité des `statistics` à chaque champ de `fields`.
+
+    Args:
+        base_config: Configuration de base (mêmes clés que run_simulation_with_config)
+        relative_step: Perturbation relative (5% par défaut ; au moins une unité pour les entiers)
+        fields: Champs de SimulationConfig à perturber
+        statistics: Statistiques du moteur par lots à comparer
+        bounds: Bornes admises par champ ; une perturbation hors bornes est ignorée
+
+    Returns:
+        Dict avec les statistiques de base et une ligne par champ : valeurs perturbées
+        (None si la perturbation viole les règles métier), pentes et élasticités
+    """
+    config, start_date = config_from_dict(base_config)
+    start_date = start_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # Ligne 0 : configuration de base, puis (champ, sens) pour chaque perturbation
+    candidates: List[SimulationConfig] = [config]
+    labels: List[Tuple[str, int]] = [("", 0)]
+    for name in fields:
+        step = perturbation_step(config, name, relative_step)
+        for direction in (-1, 1):
+            value = getattr(config, name) + direction * step
+            if not _within(value, (bounds or {}).get(name, (None, None))):
+                continue
+            candidates.append(SimulationConfig(**{
+                **{field: getattr(config, field) for field in SWEEP_FIELDS},
+                name: int(value) if name in INTEGER_FIELDS else float(value)
+            }))
+            labels.append((name, direction))
+
+    grid = {name: np.array([getattr(c, name) for c in candidates]) for name in SWEEP_FIELDS}
+    valid = grid_valid_mask(grid)
+    rows = np.flatnonzero(valid)
+    batch = simulate_batch([candidates[i] for i in rows], start_date=start_date)
+    values = {name: np.full(len(candidates), np.nan) for name in statistics}
+    for name in statistics:
+        values[name][rows] = getattr(batch, name)
+
+    base = {name: values[name][0] for name in statistics}
+    perturbed: Dict[Tuple[str, int], int] = {label: i for i, label in enumerate(labels) if i > 0 and valid[i]}
+    table = []
+    for name in fields:
+        x0 = getattr(config, name)
+        minus = perturbed.get((name, -1))
+        plus = perturbed.get((name, 1))
+        row = {
+            "field": name,
+            "base_value": x0,
+            "minus_value": getattr(candidates[minus], name) if minus is not None else None,
+            "plus_value": getattr(candidates[plus], name) if plus is not None else None,
+            "statistics": {}
+        }
+        for statistic in statistics:
+            row["statistics"][statistic] = _sensitivity(
+                candidates, values[statistic], statistic, name, x0, base[statistic], minus, plus
+            )
+        table.append(row)
+
+    return {
+        "relative_step": relative_step,
+        "base": {name: _number(base[name], name) for name in statistics},
+        "is_base_valid": bool(valid[0]),
+        "simulations": len(rows),
+        "sensitivities": table
+    }
+
+
+def _within(value: float, bounds: Tuple[Optional[float], Optional[float]]) -> bool:
+    low, high = bounds
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def _sensitivity(
+    candidates: List[SimulationConfig],
+    values: np.ndarray,
+    statistic: str,
+    name: str,
+    x0: float,
+    y0: float,
+    minus: Optional[int],
+    plus: Optional[int]
+) -> Dict:
+    """Valeurs perturbées, pente dy/dx et élasticité (dy/y0) / (dx/x0) d'une statistique"""
+    low = (getattr(candidates[minus], name), values[minus]) if minus is not None else (x0, y0)
+    high = (getattr(candidates[plus], name), values[plus]) if plus is not None else (x0, y0)
+    slope = None
+    elasticity = None
+    if high[0] != low[0] and not np.isnan(y0):
+        slope = (high[1] - low[1]) / (high[0] - low[0])
+        if y0 != 0 and x0 != 0:
+            elasticity = slope * x0 / y0
+    return {
+        "minus": _number(values[minus], statistic) if minus is not None else None,
+        "plus": _number(values[plus], statistic) if plus is not None else None,
+        "slope": _number(slope),
+        "elasticity": _number(elasticity)
+    }
+
+
+def _number(value: Optional[float], statistic: Optional[str] = None) -> Optional[float]:
+    """Nombre JSON (None pour NaN ou absent, entier pour les statistiques de comptage)"""
+    if value is None or np.isnan(value):
+        return None
+    if statistic in INTEGER_STATISTICS:
+        return int(value)
+    return float(value) + 0.0  # Pas de -0.0
@@ -1,9 +1,17 @@
-from datetime import datetime, timedelta
+from array import array
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
 from dateutil import parser as date_parser
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, Iterable, List, Dict, Tuple, Optional, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
+from cancellation import CancellationToken
+from replenishment import ReplenishmentPolicy, SingleOrderMaxPolicy, capped_quantity
+
+
+DAY_NAMES = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
+
 
 class EventType(str, Enum):
     CONSUMPTION = "consumption"
@@ -13,6 +21,18 @@ class EventType(str, Enum):
     LOW_STOCK_WARNING = "low_stock_warning"
 
 
+class DetailLevel(str, Enum):
+    """
+    Niveau de détail produit par une simulation :
+    - STATS : statistiques + colonnes stock_start / stock_end / has_stockout, sans événements
+    - DAILY : toutes les colonnes quotidiennes et les commandes, sans événements
+    - FULL : tout, y compris les événements et leurs descriptions
+    """
+    STATS = "stats"
+    DAILY = "daily"
+    FULL = "full"
+
+
 @dataclass
 class SimulationEvent:
     date: datetime
@@ -66,30 +86,283 @@ class DailyDetail:
     has_stockout: bool = False  # Rupture de stock
 
 
+class DailySeries:
+    """
+    Détails quotidiens stockés en colonnes : un tableau typé préalloué par champ,
+    indexé par le numéro du jour. Les objets DailyDetail ne sont créés qu'à la demande.
+
+    Les identifiants de commande/livraison valent 0 quand il n'y en a pas (None côté vue).
+    """
+
+    def __init__(self, start_date: datetime, days: int):
+        self.start_date = start_date
+        self.days = days
+        zeros_f = bytes(8 * days)
+        self.stock_start = array('d', zeros_f)
+        self.deliveries = array('d', zeros_f)
+        self.consumption = array('d', zeros_f)
+        self.stock_end = array('d', zeros_f)
+        self.order_quantity = array('q', zeros_f)
+        self.order_id = array('q', zeros_f)
+        self.delivery_id = array('q', zeros_f)
+        zeros_b = bytes(days)
+        self.is_working_day = array('b', zeros_b)
+        self.has_threshold_crossed = array('b', zeros_b)
+        self.has_stockout = array('b', zeros_b)
+
+    def __len__(self) -> int:
+        return self.days
+
+    def date(self, day: int) -> datetime:
+        return self.start_date + timedelta(days=day)
+
+    def row(self, day: int) -> DailyDetail:
+        """Construit la vue DailyDetail d'une journée"""
+        date = self.date(day)
+        order_id = self.order_id[day]
+        delivery_id = self.delivery_id[day]
+        return DailyDetail(
+            date=date,
+            day_of_week=DAY_NAMES[date.weekday()],
+            is_working_day=bool(self.is_working_day[day]),
+            stock_start=self.stock_start[day],
+            deliveries=self.deliveries[day],
+            consumption=self.consumption[day],
+            stock_end=self.stock_end[day],
+            orders_placed=1 if order_id else 0,
+            order_quantity=self.order_quantity[day],
+            order_id=order_id or None,
+            delivery_id=delivery_id or None,
+            has_threshold_crossed=bool(self.has_threshold_crossed[day]),
+            has_stockout=bool(self.has_stockout[day])
+        )
+
+    def rows(self) -> "DailyDetailView":
+        return DailyDetailView(self)
+
+
+class DailyDetailView(Sequence):
+    """Vue séquence (lecture seule) de DailyDetail au-dessus d'une DailySeries"""
+
+    def __init__(self, series: DailySeries, days: Optional[range] = None):
+        self.series = series
+        self.days = days if days is not None else range(len(series))  # Index des jours couverts
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return DailyDetailView(self.series, self.days[index])
+        return self.series.row(self.days[index])
+
+
 @dataclass
 class SimulationResult:
     events: List[SimulationEvent] = field(default_factory=list)
     orders: List[Order] = field(default_factory=list)
-    daily_details: List[DailyDetail] = field(default_factory=list)
+    daily_details: Sequence = field(default_factory=list)  # Séquence de DailyDetail (vue sur series)
     final_stock: float = 0.0
     stockouts_count: int = 0
     total_ordered: int = 0
     average_stock: float = 0.0
     min_stock: float = 0.0
     max_stock: float = 0.0
+    series: Optional[DailySeries] = None
+    total_events: int = 0  # Compté même quand les événements ne sont pas construits
+    stopped_at_day: Optional[int] = None  # Renseigné si la simulation a été arrêtée avant la fin (stop_when)
+
+
+class RunTracker:
+    """
+    Statistiques de viabilité tenues à jour pendant la simulation, sans relire les séries :
+    moyennes par blocs de 3 jours et sommes des deux moitiés (_check_viability), ruptures,
+    et accumulateurs de tendance sur les derniers jours (analyze_stock_trend).
+    Les sommes sont faites dans le même ordre que ces fonctions : verdicts identiques.
+    """
+
+    def __init__(self, simulation_days: int, trend_period_days: int = 30):
+        self.simulation_days = simulation_days
+        self.block_count = len(range(0, simulation_days - 2, 3))  # Moyennes sur 3 jours
+        self.mid_point = self.block_count // 2
+        self.first_half_sum = 0.0
+        self.second_half_sum = 0.0
+        self._block_sum = 0.0
+        self.stockouts = 0
+        self.days_tracked = 0
+        # Tendance : derniers trend_period_days jours de la simulation
+        self.trend_days = min(trend_period_days, simulation_days)
+        self.trend_start = simulation_days - self.trend_days
+        self.trend_initial_stock = 0.0
+        self.trend_stockouts = 0
+        self.last_stock = 0.0
+
+    def update(self, day: int, stock_start: float, stock_end: float) -> None:
+        """Prend en compte la journée `day` (jours consécutifs depuis 0)"""
+        self.days_tracked = day + 1
+        self.last_stock = stock_end
+        if day == self.trend_start:
+            self.trend_initial_stock = stock_start
+        if stock_end < 0:
+            self.stockouts += 1
+            if day >= self.trend_start:
+                self.trend_stockouts += 1
+
+        block, offset = divmod(day, 3)
+        if block < self.block_count:
+            self._block_sum = stock_end if offset == 0 else self._block_sum + stock_end
+            if offset == 2:
+                average = self._block_sum / 3
+                if block < self.mid_point:
+                    self.first_half_sum += average
+                else:
+                    self.second_half_sum += average
+
+    @property
+    def has_failed(self) -> bool:
+        """Verdict acquis : une rupture rend la configuration non viable et non stable"""
+        return self.stockouts > 0
+
+    @property
+    def complete(self) -> bool:
+        return self.days_tracked == self.simulation_days
+
+    def viable(self) -> bool:
+        """Critère de _check_viability (moyennes sur 3 jours non décroissantes, pas de rupture)"""
+        if self.has_failed or self.simulation_days < 60 or self.block_count < 10:
+            return False
+        avg_first_half = self.first_half_sum / self.mid_point
+        avg_second_half = self.second_half_sum / (self.block_count - self.mid_point)
+        return not avg_second_half < avg_first_half - avg_first_half * 0.05
+
+    def trend(self) -> Dict:
+        """analyze_stock_trend(daily_details, trend_period_days) de la simulation complète"""
+        return _trend_summary(
+            self.trend_initial_stock, self.last_stock, self.last_stock - self.trend_initial_stock,
+            self.trend_days, self.trend_stockouts
+        )
+
+    def stable(self) -> bool:
+        """Critère de find_stability_solutions : pas de rupture et tendance stable ou ascendante"""
+        return not self.has_failed and self.trend()["trend"] in ["stable", "ascending"]
+
+
+class WorkingCalendar:
+    """
+    Index des jours ouvrés, construit une fois par simulation (jour 0 = start_date).
+
+    Chaque jour est repéré par son index entier ; "N jours ouvrés après le jour d"
+    est une simple lecture de tableau. Les jours fermés sont les jours de la semaine
+    `closed_weekdays` (dimanche par défaut) et les jours fériés `holidays`.
+    L'index s'étend automatiquement au-delà de l'horizon demandé si nécessaire.
+    """
+
+    def __init__(
+        self,
+        start_date: datetime,
+        days: int = 0,
+        closed_weekdays: Iterable[int] = (6,),
+        holidays: Iterable[Union[date, datetime]] = ()
+    ):
+        self.start_date = start_date
+        self.closed_weekdays = frozenset(closed_weekdays)
+        if len(self.closed_weekdays) >= 7:
+            raise ValueError("Au moins un jour de la semaine doit être ouvré")
+        self.holidays = frozenset(h.date() if isinstance(h, datetime) else h for h in holidays)
+        self.working = array('b')  # working[d] = 1 si le jour d est ouvré
+        self.ordinal = array('q')  # ordinal[d] = nombre de jours ouvrés dans [0, d]
+        self.working_days = array('q')  # working_days[k] = index du (k+1)-ième jour ouvré
+        self.extend(days)
+
+    def __len__(self) -> int:
+        return len(self.working)
+
+    def is_working_date(self, value: Union[date, datetime]) -> bool:
+        """Vérifie si une date est ouvrée (jour de la semaine ouvert et non férié)"""
+        if isinstance(value, datetime):
+            value = value.date()
+        return value.weekday() not in self.closed_weekdays and value not in self.holidays
+
+    def extend(self, days: int) -> None:
+        """Étend l'index pour couvrir au moins `days` jours"""
+        day = len(self.working)
+        if day >= days:
+            return
+        count = self.ordinal[-1] if day else 0
+        current = self.start_date.date() + timedelta(days=day)
+        one_day = timedelta(days=1)
+        while day < days:
+            working = self.is_working_date(current)
+            if working:
+                count += 1
+                self.working_days.append(day)
+            self.working.append(working)
+            self.ordinal.append(count)
+            current += one_day
+            day += 1
+
+    def is_working(self, day: int) -> bool:
+        if day >= len(self.working):
+            self.extend(day + 1)
+        return bool(self.working[day])
+
+    def add_working_days(self, day: int, days: int) -> int:
+        """Index du jour situé `days` jours ouvrés après le jour `day`"""
+        if days <= 0:
+            return day
+        if day >= len(self.working):
+            self.extend(day + 1)
+        target = self.ordinal[day] + days
+        while len(self.working_days) < target:
+            self.extend(2 * len(self.working) + 7)
+        return self.working_days[target - 1]
+
+    def date(self, day: int) -> datetime:
+        return self.start_date + timedelta(days=day)
+
+    def day_index(self, value: datetime) -> int:
+        return (value.date() - self.start_date.date()).days
 
 
 class InventorySimulator:
-    def __init__(self, config: SimulationConfig, start_date: Optional[datetime] = None):
+    def __init__(
+        self,
+        config: SimulationConfig,
+        start_date: Optional[datetime] = None,
+        calendar: Optional[WorkingCalendar] = None,
+        detail_level: DetailLevel = DetailLevel.FULL,
+        policy: Optional[ReplenishmentPolicy] = None,
+        tracker: Optional[RunTracker] = None
+    ):
+        """
+        Args:
+            policy: Politique de réapprovisionnement (par défaut la règle historique :
+                une commande en attente à la fois, toujours pour le maximum)
+            tracker: Statistiques de viabilité mises à jour chaque jour
+        """
         self.config = config
-        self.start_date = start_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.policy = policy if policy is not None else SingleOrderMaxPolicy()
+        self.policy_parameters = self.policy.parameters(config)
+        self.detail_level = DetailLevel(detail_level)
+        self.tracker = tracker
+        # Les événements (et leurs descriptions) ne sont construits qu'au niveau FULL
+        self.keep_events = self.detail_level == DetailLevel.FULL
+        self.events_count = 0
+        if calendar is not None and start_date is not None and calendar.start_date != start_date:
+            raise ValueError("La date de début du calendrier ne correspond pas à start_date")
+        if start_date is None:
+            start_date = (calendar.start_date if calendar is not None
+                          else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0))
+        self.start_date = start_date
+        self.calendar = calendar if calendar is not None else WorkingCalendar(start_date)
+        # Horizon + marge pour les dates de livraison au-delà de la fin de simulation
+        self.calendar.extend(config.simulation_days + config.delivery_lead_time_days + 7)
         self.current_stock = config.initial_stock
         self.events: List[SimulationEvent] = []
         self.orders: List[Order] = []
-        self.pending_deliveries: List[Order] = []
+        self.pending_deliveries: List[Tuple[int, Order]] = []  # (jour de livraison, commande)
         self.stockouts_count = 0
-        self.stock_history: List[float] = []
-        self.daily_details: List[DailyDetail] = []
+        self.series = DailySeries(self.start_date, config.simulation_days)
         self.next_order_id = 1  # Compteur pour les IDs de commande
         
         # Le seuil de vente n'est actif QUE si le stock initial est 0
@@ -97,89 +370,68 @@ class InventorySimulator:
         self.sales_started = config.initial_stock > 0
 
     def is_working_day(self, date: datetime) -> bool:
-        """Vérifie si le jour est ouvré (lundi=0 à samedi=5, dimanche=6)"""
-        return date.weekday() != 6
+        """Vérifie si le jour est ouvré (par défaut lundi=0 à samedi=5, dimanche=6 fermé)"""
+        return self.calendar.is_working_date(date)
 
     def add_working_days(self, start_date: datetime, days: int) -> datetime:
         """Ajoute un nombre de jours ouvrés à une date"""
-        current = start_date
-        added = 0
-        while added < days:
-            current += timedelta(days=1)
-            if self.is_working_day(current):
-                added += 1
-        return current
-
-    def calculate_order_quantity(self, current_stock: float, delivery_date: datetime) -> int:
+        day = self.calendar.day_index(start_date)
+        if day < 0:
+            current = start_date
+            added = 0
+            while added < days:
+                current += timedelta(days=1)
+                if self.is_working_day(current):
+                    added += 1
+            return current
+        return start_date + timedelta(days=self.calendar.add_working_days(day, days) - day)
+
+    def calculate_order_quantity(self, current_stock: float, days_until_delivery: int) -> int:
         """
         Calcule la quantité à commander = TOUJOURS LE MAXIMUM
         Sans dépasser le stock maximum le jour de livraison
         """
-        # Calculer le stock au moment de la livraison
-        days_until_delivery = (delivery_date - datetime.now()).days
-        if hasattr(self, 'current_date_simulation'):
-            days_until_delivery = (delivery_date - self.current_date_simulation).days
-
         # Stock projeté au moment de la livraison (avant la livraison)
         projected_stock_at_delivery = current_stock - (days_until_delivery * self.config.daily_consumption)
+        return capped_quantity(self.policy_parameters, projected_stock_at_delivery)
+
+    def should_order(self, day: int) -> bool:
+        """Détermine s'il faut passer commande aujourd'hui (jour d'index `day`) selon la politique"""
+        delivery_day = self.calendar.add_working_days(day, self.config.delivery_lead_time_days)
+        return self.order_decision(day, delivery_day) is not None
+
+    def order_decision(self, day: int, delivery_day: int) -> Optional[int]:
+        """Quantité à commander le jour `day` selon la politique (None = pas de commande)"""
+        pending = self.pending_deliveries
+        on_order = sum(order.quantity for _, order in pending) if pending else 0
+        return self.policy.order(
+            self.policy_parameters,
+            self.current_stock,
+            on_order,
+            len(pending),
+            self.calendar.ordinal[day] - 1,
+            delivery_day - day
+        )
 
-        # Calculer le maximum qu'on peut commander sans dépasser max_stock
-        max_quantity_allowed = self.config.max_stock - projected_stock_at_delivery
-
-        # Arrondir au lot inférieur
-        max_quantity_allowed = (int(max_quantity_allowed) // self.config.lot_size) * self.config.lot_size
-
-        # Prendre le minimum entre max_order_quantity et ce qui ne dépasse pas max_stock
-        quantity = min(self.config.max_order_quantity, max_quantity_allowed)
-
-        # S'assurer que c'est au moins le minimum (sauf si ça dépasse max_stock)
-        if quantity < self.config.min_order_quantity:
-            quantity = self.config.min_order_quantity
-
-        # Assurer que c'est un multiple du lot
-        quantity = (quantity // self.config.lot_size) * self.config.lot_size
-
-        return max(quantity, self.config.min_order_quantity)
-
-    def should_order(self, current_date: datetime) -> bool:
-        """
-        Détermine s'il faut passer commande aujourd'hui.
-        RÈGLE : Une seule commande en attente à la fois
-        OBJECTIF : Le stock ne doit PAS passer sous le seuil le jour de livraison
-        """
-        # RÈGLE 1 : On ne commande que si aucune livraison n'est en attente
-        if len(self.pending_deliveries) > 0:
-            return False
-
-        # Calculer la date de livraison (3 jours ouvrés)
-        delivery_date = self.add_working_days(current_date, self.config.delivery_lead_time_days)
-        days_until_delivery = (delivery_date - current_date).days
-
-        # Stock projeté AU MOMENT de la livraison (avant réception)
-        projected_stock_at_delivery = self.current_stock - (days_until_delivery * self.config.daily_consumption)
-
-        # RÈGLE 2 : Commander si le stock projeté sera <= seuil le jour de livraison
-        # On anticipe pour que le jour de livraison, on soit encore au-dessus du seuil
-        return projected_stock_at_delivery <= self.config.reorder_threshold
-
-    def place_order(self, order_date: datetime) -> Optional[Order]:
+    def place_order(self, day: int) -> Optional[Order]:
         """Passe une commande si nécessaire"""
-        if not self.is_working_day(order_date):
-            return None
-
-        if not self.should_order(order_date):
+        if not self.calendar.working[day]:
             return None
 
         # Calculer la date de livraison (3 jours ouvrés)
-        delivery_date = self.add_working_days(order_date, self.config.delivery_lead_time_days)
+        delivery_day = self.calendar.add_working_days(day, self.config.delivery_lead_time_days)
 
-        # Calculer la quantité = MAXIMUM possible
-        quantity = self.calculate_order_quantity(self.current_stock, delivery_date)
+        # La politique décide de la commande et de sa quantité
+        quantity = self.order_decision(day, delivery_day)
+        if quantity is None:
+            return None
 
         # Créer la commande avec un ID unique
         order_id = self.next_order_id
         self.next_order_id += 1
 
+        order_date = self.calendar.date(day)
+        delivery_date = self.calendar.date(delivery_day)
         order = Order(
             order_id=order_id,
             order_date=order_date,
@@ -188,89 +440,99 @@ class InventorySimulator:
         )
 
         self.orders.append(order)
-        self.pending_deliveries.append(order)
-
-        self.events.append(SimulationEvent(
-            date=order_date,
-            event_type=EventType.ORDER,
-            description=f"Commande #{order_id} de {quantity} unités (livraison prévue le {delivery_date.strftime('%Y-%m-%d')})",
-            stock_before=self.current_stock,
-            stock_after=self.current_stock,
-            quantity=quantity,
-            is_working_day=True,
-            order_id=order_id
-        ))
+        self.pending_deliveries.append((delivery_day, order))
+
+        self.events_count += 1
+        if self.keep_events:
+            self.events.append(SimulationEvent(
+                date=order_date,
+                event_type=EventType.ORDER,
+                description=f"Commande #{order_id} de {quantity} unités (livraison prévue le {delivery_date.strftime('%Y-%m-%d')})",
+                stock_before=self.current_stock,
+                stock_after=self.current_stock,
+                quantity=quantity,
+                is_working_day=True,
+                order_id=order_id
+            ))
 
         return order
 
-    def process_deliveries(self, current_date: datetime) -> Tuple[float, Optional[int]]:
+    def process_deliveries(self, day: int) -> Tuple[float, Optional[int]]:
         """Traite les livraisons prévues pour aujourd'hui
         Retourne: (quantité totale livrée, ID de la commande livrée)
         """
         total_delivered = 0.0
         delivery_id = None
 
-        if not self.is_working_day(current_date):
+        if not self.calendar.working[day]:
             return total_delivered, delivery_id
 
-        deliveries_today = [o for o in self.pending_deliveries if o.delivery_date.date() == current_date.date()]
+        deliveries_today = [p for p in self.pending_deliveries if p[0] == day]
 
-        for order in deliveries_today:
+        for pending in deliveries_today:
+            order = pending[1]
             stock_before = self.current_stock
             self.current_stock += order.quantity
             total_delivered += order.quantity
             order.delivered = True
             delivery_id = order.order_id
 
-            self.events.append(SimulationEvent(
-                date=current_date,
-                event_type=EventType.DELIVERY,
-                description=f"Livraison #{order.order_id} de {order.quantity} unités (commandée le {order.order_date.strftime('%Y-%m-%d')})",
-                stock_before=stock_before,
-                stock_after=self.current_stock,
-                quantity=order.quantity,
-                is_working_day=True,
-                order_id=order.order_id
-            ))
+            self.events_count += 1
+            if self.keep_events:
+                self.events.append(SimulationEvent(
+                    date=self.calendar.date(day),
+                    event_type=EventType.DELIVERY,
+                    description=f"Livraison #{order.order_id} de {order.quantity} unités (commandée le {order.order_date.strftime('%Y-%m-%d')})",
+                    stock_before=stock_before,
+                    stock_after=self.current_stock,
+                    quantity=order.quantity,
+                    is_working_day=True,
+                    order_id=order.order_id
+                ))
 
-            self.pending_deliveries.remove(order)
+            self.pending_deliveries.remove(pending)
 
         return total_delivered, delivery_id
 
-    def apply_consumption(self, current_date: datetime) -> float:
+    def apply_consumption(self, day: int) -> float:
         """Applique la consommation quotidienne seulement si les ventes ont démarré
         
         Returns:
             float: La consommation réelle appliquée ce jour (0.0 si les ventes n'ont pas encore démarré)
         """
         stock_before = self.current_stock
+        current_date = self.calendar.date(day)
+        is_working_day = bool(self.calendar.working[day])
         
         # Vérifier si les ventes peuvent démarrer (une seule fois)
         if not self.sales_started:
             if stock_before >= self.config.min_stock_to_start_sales:
                 self.sales_started = True
                 if self.config.min_stock_to_start_sales > 0:
+                    self.events_count += 1
+                    if self.keep_events:
+                        self.events.append(SimulationEvent(
+                            date=current_date,
+                            event_type=EventType.THRESHOLD_CROSSED,
+                            description=f"▶️ DÉBUT DES VENTES - Stock ({stock_before:.2f}) a atteint le seuil ({self.config.min_stock_to_start_sales:.2f})",
+                            stock_before=stock_before,
+                            stock_after=stock_before,
+                            quantity=0.0,
+                            is_working_day=is_working_day
+                        ))
+            else:
+                # Pas encore de ventes - phase d'approvisionnement initial
+                self.events_count += 1
+                if self.keep_events:
                     self.events.append(SimulationEvent(
                         date=current_date,
-                        event_type=EventType.THRESHOLD_CROSSED,
-                        description=f"▶️ DÉBUT DES VENTES - Stock ({stock_before:.2f}) a atteint le seuil ({self.config.min_stock_to_start_sales:.2f})",
+                        event_type=EventType.LOW_STOCK_WARNING,
+                        description=f"📦 Approvisionnement initial - Stock ({stock_before:.2f}) < seuil de vente ({self.config.min_stock_to_start_sales:.2f})",
                         stock_before=stock_before,
                         stock_after=stock_before,
                         quantity=0.0,
-                        is_working_day=self.is_working_day(current_date)
+                        is_working_day=is_working_day
                     ))
-            else:
-                # Pas encore de ventes - phase d'approvisionnement initial
-                self.events.append(SimulationEvent(
-                    date=current_date,
-                    event_type=EventType.LOW_STOCK_WARNING,
-                    description=f"📦 Approvisionnement initial - Stock ({stock_before:.2f}) < seuil de vente ({self.config.min_stock_to_start_sales:.2f})",
-                    stock_before=stock_before,
-                    stock_after=stock_before,
-                    quantity=0.0,
-                    is_working_day=self.is_working_day(current_date)
-                ))
-                self.stock_history.append(self.current_stock)
                 return 0.0  # Retourner 0 car pas de consommation
         
         # Les ventes ont démarré, appliquer la consommation
@@ -279,127 +541,199 @@ class InventorySimulator:
         # Vérifier la rupture de stock
         if self.current_stock < 0:
             self.stockouts_count += 1
-            self.events.append(SimulationEvent(
-                date=current_date,
-                event_type=EventType.LOW_STOCK_WARNING,
-                description=f"⚠️ RUPTURE DE STOCK ! Stock négatif: {self.current_stock:.2f}",
-                stock_before=stock_before,
-                stock_after=self.current_stock,
-                quantity=self.config.daily_consumption,
-                is_working_day=self.is_working_day(current_date)
-            ))
+            self.events_count += 1
+            if self.keep_events:
+                self.events.append(SimulationEvent(
+                    date=current_date,
+                    event_type=EventType.LOW_STOCK_WARNING,
+                    description=f"⚠️ RUPTURE DE STOCK ! Stock négatif: {self.current_stock:.2f}",
+                    stock_before=stock_before,
+                    stock_after=self.current_stock,
+                    quantity=self.config.daily_consumption,
+                    is_working_day=is_working_day
+                ))
 
         # Vérifier le passage sous le seuil
         if stock_before >= self.config.reorder_threshold and self.current_stock < self.config.reorder_threshold:
+            self.events_count += 1
+            if self.keep_events:
+                self.events.append(SimulationEvent(
+                    date=current_date,
+                    event_type=EventType.THRESHOLD_CROSSED,
+                    description=f"Passage sous le seuil de {self.config.reorder_threshold} unités",
+                    stock_before=stock_before,
+                    stock_after=self.current_stock,
+                    quantity=self.config.daily_consumption,
+                    is_working_day=is_working_day
+                ))
+
+        self.events_count += 1
+        if self.keep_events:
             self.events.append(SimulationEvent(
                 date=current_date,
-                event_type=EventType.THRESHOLD_CROSSED,
-                description=f"Passage sous le seuil de {self.config.reorder_threshold} unités",
+                event_type=EventType.CONSUMPTION,
+                description=f"Consommation quotidienne de {self.config.daily_consumption} unités",
                 stock_before=stock_before,
                 stock_after=self.current_stock,
                 quantity=self.config.daily_consumption,
-                is_working_day=self.is_working_day(current_date)
+                is_working_day=is_working_day
             ))
 
-        self.events.append(SimulationEvent(
-            date=current_date,
-            event_type=EventType.CONSUMPTION,
-            description=f"Consommation quotidienne de {self.config.daily_consumption} unités",
-            stock_before=stock_before,
-            stock_after=self.current_stock,
-            quantity=self.config.daily_consumption,
-            is_working_day=self.is_working_day(current_date)
-        ))
-
-        self.stock_history.append(self.current_stock)
         return self.config.daily_consumption  # Retourner la consommation réelle
 
-    def run_simulation(self) -> SimulationResult:
-        """Exécute la simulation complète"""
-        current_date = self.start_date
-
-        for day in range(self.config.simulation_days):
-            # Stocker la date courante pour calculate_order_quantity
-            self.current_date_simulation = current_date
-
-            # Capturer l'état de début de journée
-            stock_before_deliveries = self.current_stock
+    def run_simulation(self, stop_when: Optional[Callable[[RunTracker], bool]] = None) -> SimulationResult:
+        """
+        Exécute la simulation complète.
 
+        Args:
+            stop_when: Prédicat sur le tracker, évalué chaque soir : s'il est vrai, la
+                simulation s'arrête (issue déjà décidée). Les statistiques ne portent alors
+                que sur les jours simulés (stopped_at_day).
+        """
+        series = self.series
+        tracker = self.tracker
+        if stop_when is not None and tracker is None:
+            raise ValueError("stop_when nécessite un tracker")
+        stopped_at_day = None
+        working = self.calendar.working
+        reorder_threshold = self.config.reorder_threshold
+        record_daily = self.detail_level != DetailLevel.STATS
+        simulation_days = self.config.simulation_days
+
+        for day in range(simulation_days):
             # 1. Traiter les livraisons du jour (si jour ouvré) - MAJ stock début de journée
-            deliveries, delivery_id = self.process_deliveries(current_date)
+            deliveries, delivery_id = self.process_deliveries(day)
             stock_after_deliveries = self.current_stock
 
             # 2. Vérifier si une commande doit être passée (si jour ouvré)
-            order = self.place_order(current_date)
+            order = self.place_order(day)
 
             # 3. Appliquer la consommation (tous les jours, y compris dimanche)
             stock_before_consumption = self.current_stock
-            actual_consumption = self.apply_consumption(current_date)
+            actual_consumption = self.apply_consumption(day)
             stock_after_consumption = self.current_stock
 
-            # Enregistrer les détails de la journée
-            day_names = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
-
-            # Vérifier si seuil franchi ou rupture
-            threshold_crossed = (stock_before_consumption >= self.config.reorder_threshold and
-                               stock_after_consumption < self.config.reorder_threshold)
-            has_stockout = stock_after_consumption < 0
-
-            daily_detail = DailyDetail(
-                date=current_date,
-                day_of_week=day_names[current_date.weekday()],
-                is_working_day=self.is_working_day(current_date),
-                stock_start=stock_after_deliveries,  # Stock après livraisons = stock début de journée
-                deliveries=deliveries,
-                consumption=actual_consumption,  # Utiliser la consommation réelle (0 si ventes pas démarrées)
-                stock_end=stock_after_consumption,
-                orders_placed=1 if order else 0,
-                order_quantity=order.quantity if order else 0,
-                order_id=order.order_id if order else None,
-                delivery_id=delivery_id,
-                has_threshold_crossed=threshold_crossed,
-                has_stockout=has_stockout
-            )
-
-            self.daily_details.append(daily_detail)
-
-            # Passer au jour suivant
-            current_date += timedelta(days=1)
+            # Enregistrer les détails de la journée dans les colonnes
+            series.stock_start[day] = stock_after_deliveries  # Stock après livraisons = stock début de journée
+            series.stock_end[day] = stock_after_consumption
+            series.has_stockout[day] = stock_after_consumption < 0
+            if record_daily:
+                series.is_working_day[day] = working[day]
+                series.deliveries[day] = deliveries
+                series.consumption[day] = actual_consumption  # Consommation réelle (0 si ventes pas démarrées)
+                if order:
+                    series.order_quantity[day] = order.quantity
+                    series.order_id[day] = order.order_id
+                if delivery_id:
+                    series.delivery_id[day] = delivery_id
+                # Vérifier si seuil franchi
+                series.has_threshold_crossed[day] = (stock_before_consumption >= reorder_threshold and
+                                                     stock_after_consumption < reorder_threshold)
+
+            if tracker is not None:
+                tracker.update(day, stock_after_deliveries, stock_after_consumption)
+                if stop_when is not None and stop_when(tracker) and day + 1 < simulation_days:
+                    stopped_at_day = day + 1
+                    break
 
         # Calculer les statistiques
-        avg_stock = sum(self.stock_history) / len(self.stock_history) if self.stock_history else 0
-        min_stock = min(self.stock_history) if self.stock_history else 0
-        max_stock = max(self.stock_history) if self.stock_history else 0
+        stock_history = series.stock_end if stopped_at_day is None else series.stock_end[:stopped_at_day]
+        avg_stock = sum(stock_history) / len(stock_history) if stock_history else 0
+        min_stock = min(stock_history) if stock_history else 0
+        max_stock = max(stock_history) if stock_history else 0
         total_ordered = sum(o.quantity for o in self.orders)
 
         return SimulationResult(
             events=self.events,
             orders=self.orders,
-            daily_details=self.daily_details,
+            daily_details=series.rows() if stopped_at_day is None else DailyDetailView(series, range(stopped_at_day)),
             final_stock=self.current_stock,
             stockouts_count=self.stockouts_count,
             total_ordered=total_ordered,
             average_stock=avg_stock,
             min_stock=min_stock,
-            max_stock=max_stock
+            max_stock=max_stock,
+            series=series,
+            total_events=self.events_count,
+            stopped_at_day=stopped_at_day
         )
 
 
-def run_simulation_with_config(config_dict: Dict) -> Dict:
-    """Fonction helper pour exécuter une simulation à partir d'un dictionnaire de config"""
+def config_from_dict(config_dict: Dict) -> Tuple[SimulationConfig, Optional[datetime]]:
+    """Sépare un dictionnaire de config en SimulationConfig et date de début (None si absente)"""
     # Extraire start_date avant de créer SimulationConfig
     start_date = None
     if 'start_date' in config_dict and config_dict['start_date']:
-        from dateutil import parser
-        start_date = parser.parse(config_dict['start_date'])
+        start_date = date_parser.parse(config_dict['start_date'])
 
     # Créer config sans start_date
     config_for_simulation = {k: v for k, v in config_dict.items() if k != 'start_date'}
-    config = SimulationConfig(**config_for_simulation)
+    return SimulationConfig(**config_for_simulation), start_date
 
-    simulator = InventorySimulator(config, start_date=start_date)
-    result = simulator.run_simulation()
 
+def simulate_config(
+    config_dict: Dict,
+    detail_level: DetailLevel = DetailLevel.FULL,
+    policy: Optional[ReplenishmentPolicy] = None
+) -> SimulationResult:
+    """
+    Exécute une simulation à partir d'un dictionnaire de config et retourne le résultat natif.
+
+    À utiliser par le code d'analyse et d'optimisation : pas de conversion en dict/JSON,
+    donc pas de dates à re-parser. La conversion ne se fait qu'en bordure HTTP (result_to_dict).
+    """
+    config, start_date = config_from_dict(config_dict)
+    simulator = InventorySimulator(config, start_date=start_date, detail_level=detail_level, policy=policy)
+    return simulator.run_simulation()
+
+
+def simulate_tracked(config_dict: Dict, stop_on_failure: bool = True) -> RunTracker:
+    """
+    Simulation au niveau STATS qui ne retourne que son RunTracker (verdicts de viabilité
+    et de stabilité). Avec `stop_on_failure`, s'arrête à la première rupture : le verdict
+    est alors acquis et les jours suivants ne sont pas simulés.
+    """
+    config, start_date = config_from_dict(config_dict)
+    tracker = RunTracker(config.simulation_days)
+    simulator = InventorySimulator(config, start_date=start_date, detail_level=DetailLevel.STATS, tracker=tracker)
+    simulator.run_simulation(stop_when=(lambda t: t.has_failed) if stop_on_failure else None)
+    return tracker
+
+
+def result_statistics(result: SimulationResult) -> Dict:
+    """Statistiques d'un résultat, au format de la réponse de /simulate"""
+    return {
+        "final_stock": result.final_stock,
+        "stockouts_count": result.stockouts_count,
+        "total_ordered": result.total_ordered,
+        "average_stock": result.average_stock,
+        "min_stock": result.min_stock,
+        "max_stock": result.max_stock,
+        "total_events": result.total_events,
+        "total_orders": len(result.orders)
+    }
+
+
+def run_simulation_with_config(config_dict: Dict, detail_level: DetailLevel = DetailLevel.FULL) -> Dict:
+    """
+    Fonction helper pour exécuter une simulation à partir d'un dictionnaire de config.
+
+    Les statistiques sont identiques quel que soit `detail_level` ; seuls les détails changent :
+    - "full" : events, orders et daily_details complets
+    - "daily" : orders et daily_details complets, events vide
+    - "stats" : events et orders vides, daily_details réduit à stock_start / stock_end / has_stockout
+    """
+    detail_level = DetailLevel(detail_level)
+    return result_to_dict(simulate_config(config_dict, detail_level), config_dict, detail_level)
+
+
+def result_to_dict(
+    result: SimulationResult,
+    config_dict: Dict,
+    detail_level: DetailLevel = DetailLevel.FULL
+) -> Dict:
+    """Convertit un SimulationResult en dict JSON (réponse de /simulate)"""
+    detail_level = DetailLevel(detail_level)
     return {
         "config": config_dict,
         "events": [
@@ -415,7 +749,7 @@ def run_simulation_with_config(config_dict: Dict) -> Dict:
             }
             for e in result.events
         ],
-        "orders": [
+        "orders": [] if detail_level == DetailLevel.STATS else [
             {
                 "order_id": o.order_id,
                 "order_date": o.order_date.isoformat(),
@@ -425,38 +759,59 @@ def run_simulation_with_config(config_dict: Dict) -> Dict:
             }
             for o in result.orders
         ],
-        "daily_details": [
-            {
-                "date": d.date.isoformat(),
-                "day_of_week": d.day_of_week,
-                "is_working_day": d.is_working_day,
-                "stock_start": d.stock_start,
-                "deliveries": d.deliveries,
-                "consumption": d.consumption,
-                "stock_end": d.stock_end,
-                "orders_placed": d.orders_placed,
-                "order_quantity": d.order_quantity,
-                "order_id": d.order_id,
-                "delivery_id": d.delivery_id,
-                "has_threshold_crossed": d.has_threshold_crossed,
-                "has_stockout": d.has_stockout
-            }
-            for d in result.daily_details
-        ],
-        "statistics": {
-            "final_stock": result.final_stock,
-            "stockouts_count": result.stockouts_count,
-            "total_ordered": result.total_ordered,
-            "average_stock": result.average_stock,
-            "min_stock": result.min_stock,
-            "max_stock": result.max_stock,
-            "total_events": len(result.events),
-            "total_orders": len(result.orders)
-        }
+        "daily_details": (_series_to_stats_dicts(result.series) if detail_level == DetailLevel.STATS
+                          else _series_to_dicts(result.series)),
+        "statistics": result_statistics(result)
     }
 
 
-def analyze_stock_trend(daily_details: List[DailyDetail], analysis_period_days: int = 30) -> Dict:
+def _series_to_dicts(series: DailySeries) -> List[Dict]:
+    """Construit les lignes JSON des détails quotidiens directement depuis les colonnes"""
+    rows = []
+    start_date = series.start_date
+    for day, (is_working_day, stock_start, deliveries, consumption, stock_end, order_quantity,
+              order_id, delivery_id, threshold_crossed, stockout) in enumerate(zip(
+            series.is_working_day, series.stock_start, series.deliveries, series.consumption,
+            series.stock_end, series.order_quantity, series.order_id, series.delivery_id,
+            series.has_threshold_crossed, series.has_stockout)):
+        date = start_date + timedelta(days=day)
+        rows.append({
+            "date": date.isoformat(),
+            "day_of_week": DAY_NAMES[date.weekday()],
+            "is_working_day": bool(is_working_day),
+            "stock_start": stock_start,
+            "deliveries": deliveries,
+            "consumption": consumption,
+            "stock_end": stock_end,
+            "orders_placed": 1 if order_id else 0,
+            "order_quantity": order_quantity,
+            "order_id": order_id or None,
+            "delivery_id": delivery_id or None,
+            "has_threshold_crossed": bool(threshold_crossed),
+            "has_stockout": bool(stockout)
+        })
+    return rows
+
+
+def _series_to_stats_dicts(series: DailySeries) -> List[Dict]:
+    """Lignes réduites (niveau STATS) : seules les colonnes renseignées à ce niveau"""
+    return [
+        {"stock_start": stock_start, "stock_end": stock_end, "has_stockout": bool(stockout)}
+        for stock_start, stock_end, stockout in zip(series.stock_start, series.stock_end, series.has_stockout)
+    ]
+
+
+def _period_value(period: Sequence, name: str, index: int) -> float:
+    """Valeur d'une colonne pour un jour de la période, sans construire de DailyDetail si possible"""
+    if isinstance(period, DailyDetailView):
+        return getattr(period.series, name)[period.days[index]]
+    return getattr(period[index], name)
+
+
+def analyze_stock_trend(
+    daily_details: List[DailyDetail],
+    analysis_period_days: int = 30
+) -> Dict:
     """
     Analyse la tendance du stock sur une période donnée.
     
@@ -485,11 +840,37 @@ def analyze_stock_trend(daily_details: List[DailyDetail], analysis_period_days:
     
     # Prendre les derniers jours
     period = daily_details[-analysis_period_days:]
-    
+
     # Calculer la tendance globale
-    initial_stock = period[0].stock_start
-    final_stock = period[-1].stock_end
+    initial_stock = _period_value(period, "stock_start", 0)
+    final_stock = _period_value(period, "stock_end", -1)
     total_change = final_stock - initial_stock
+
+    # Vérifier s'il y a eu des ruptures
+    if isinstance(period, DailyDetailView):
+        has_stockout = period.series.has_stockout
+        stockouts_in_period = sum(has_stockout[d] for d in period.days)
+    else:
+        stockouts_in_period = sum(1 for d in period if d.has_stockout)
+    return _trend_summary(initial_stock, final_stock, total_change, analysis_period_days, stockouts_in_period)
+
+
+def _trend_summary(
+    initial_stock: float,
+    final_stock: float,
+    total_change: float,
+    analysis_period_days: int,
+    stockouts_in_period: int
+) -> Dict:
+    """Verdict de tendance à partir des valeurs de la période (analyze_stock_trend, RunTracker)"""
+    if analysis_period_days == 0:
+        return {
+            "trend": "unknown",
+            "is_viable": False,
+            "avg_change_per_day": 0,
+            "final_vs_initial": 0,
+            "description": "Pas assez de données"
+        }
     avg_change_per_day = total_change / analysis_period_days
     
     # AMÉLIORATION : Vérifier si la tendance descendante continue même sans rupture
@@ -517,8 +898,6 @@ def analyze_stock_trend(daily_details: List[DailyDetail], analysis_period_days:
         is_viable = True
         description = f"Stock stable (variation: {avg_change_per_day:+.2f} unités/jour). Configuration équilibrée."
     
-    # Vérifier s'il y a eu des ruptures
-    stockouts_in_period = sum(1 for d in period if d.has_stockout)
     if stockouts_in_period > 0:
         is_viable = False
         description += f" ⚠️ {stockouts_in_period} rupture(s) de stock détectée(s)."
@@ -535,116 +914,70 @@ def analyze_stock_trend(daily_details: List[DailyDetail], analysis_period_days:
     }
 
 
-def find_stability_solutions(config_dict: Dict) -> Dict:
+def find_stability_solutions(
+    config_dict: Dict,
+    search_width: int = 1,
+    cancel: Optional[CancellationToken] = None
+) -> Dict:
     """
     Analyse la configuration et propose des solutions pour atteindre la stabilité.
     Teste soit la réduction de consommation, soit l'augmentation de max_order_quantity.
     
     Args:
         config_dict: Configuration de base
+        search_width: Points évalués ensemble à chaque tour des recherches (simulations par lots)
+        cancel: Jeton d'annulation, vérifié avant chaque simulation (OperationCancelled)
     
     Returns:
         Dict contenant les solutions proposées
     """
+    # Imports locaux : ces modules dépendent de celui-ci
+    from batch_engine import simulate_batch
+    from result_cache import cached_verdict
+    from search import Lattice, ViabilityOracle, scan_first_viable
+
     current_consumption = config_dict["daily_consumption"]
     current_max_order = config_dict["max_order_quantity"]
     lot_size = config_dict["lot_size"]
-    
-    # Solution 1: Trouver la consommation maximale viable
-    max_viable_consumption = None
-    test_consumption = current_consumption
-    
-    # Tester en réduisant la consommation par pas de 0.5
-    while test_consumption >= 0.5:
-        test_config = config_dict.copy()
-        test_config["daily_consumption"] = test_consumption
-        test_config["simulation_days"] = 60
-        
+    base_config = {**config_dict, "simulation_days": 60}
+
+    def is_stable_result(result: SimulationResult) -> bool:
+        # Configuration viable si pas de rupture et tendance stable/ascendante
+        trend = analyze_stock_trend(result.daily_details, 30)
+        return result.stockouts_count == 0 and trend["trend"] in ["stable", "ascending"]
+
+    def is_stable(test_config: Dict) -> bool:
         try:
-            result = run_simulation_with_config(test_config)
-            stats = result["statistics"]
-            
-            # Convertir daily_details
-            daily_details_objs = [
-                DailyDetail(
-                    date=date_parser.parse(d["date"]),
-                    day_of_week=d["day_of_week"],
-                    is_working_day=d["is_working_day"],
-                    stock_start=d["stock_start"],
-                    deliveries=d["deliveries"],
-                    consumption=d["consumption"],
-                    stock_end=d["stock_end"],
-                    orders_placed=d["orders_placed"],
-                    order_quantity=d["order_quantity"],
-                    order_id=d["order_id"],
-                    delivery_id=d["delivery_id"],
-                    has_threshold_crossed=d["has_threshold_crossed"],
-                    has_stockout=d["has_stockout"]
-                )
-                for d in result["daily_details"]
-            ]
-            
-            trend = analyze_stock_trend(daily_details_objs, 30)
-            
-            # Configuration viable si pas de rupture et tendance stable/ascendante
-            if stats["stockouts_count"] == 0 and trend["trend"] in ["stable", "ascending"]:
-                max_viable_consumption = test_consumption
-                break
-        except:
-            pass
-        
-        test_consumption -= 0.5
-        if test_consumption < 0.5:
-            break
-    
+            return cached_verdict(test_config, "stability")
+        except Exception:
+            return False
+
+    def are_stable(test_configs: List[Dict]) -> List[bool]:
+        batch = simulate_batch(test_configs)
+        return [is_stable_result(batch.result(i)) for i in range(len(test_configs))]
+
+    oracle = ViabilityOracle(is_stable, are_stable if search_width > 1 else None, cancel=cancel)
+
+    # Le critère de stabilité n'est pas monotone le long de ces réseaux (une dichotomie
+    # peut écarter des points viables) : parcours dans l'ordre, premier point viable
+
+    # Solution 1: Trouver la consommation maximale viable
+    # Réseau descendant par pas de 0.5 depuis la consommation actuelle (au moins 0.5)
+    consumption_steps = int((current_consumption - 0.5) // 0.5) + 1 if current_consumption >= 0.5 else 0
+    consumption_search = scan_first_viable(
+        oracle, base_config, "daily_consumption",
+        Lattice(current_consumption, -0.5, consumption_steps), width=search_width
+    )
+    max_viable_consumption = consumption_search.value
+
     # Solution 2: Trouver le max_order_quantity nécessaire
-    min_required_max_order = None
-    test_max_order = current_max_order
-    
-    # Tester en augmentant max_order_quantity
-    while test_max_order <= 50:  # Maximum raisonnable
-        # S'assurer que c'est un multiple du lot_size
-        if test_max_order % lot_size != 0:
-            test_max_order += 1
-            continue
-            
-        test_config = config_dict.copy()
-        test_config["max_order_quantity"] = test_max_order
-        test_config["simulation_days"] = 60
-        
-        try:
-            result = run_simulation_with_config(test_config)
-            stats = result["statistics"]
-            
-            # Convertir daily_details
-            daily_details_objs = [
-                DailyDetail(
-                    date=date_parser.parse(d["date"]),
-                    day_of_week=d["day_of_week"],
-                    is_working_day=d["is_working_day"],
-                    stock_start=d["stock_start"],
-                    deliveries=d["deliveries"],
-                    consumption=d["consumption"],
-                    stock_end=d["stock_end"],
-                    orders_placed=d["orders_placed"],
-                    order_quantity=d["order_quantity"],
-                    order_id=d["order_id"],
-                    delivery_id=d["delivery_id"],
-                    has_threshold_crossed=d["has_threshold_crossed"],
-                    has_stockout=d["has_stockout"]
-                )
-                for d in result["daily_details"]
-            ]
-            
-            trend = analyze_stock_trend(daily_details_objs, 30)
-            
-            if stats["stockouts_count"] == 0 and trend["trend"] in ["stable", "ascending"]:
-                min_required_max_order = test_max_order
-                break
-        except:
-            pass
-        
-        test_max_order += lot_size
+    # Multiples de lot_size à partir de la quantité actuelle, jusqu'à 50 (maximum raisonnable)
+    first_multiple = -(-current_max_order // lot_size) * lot_size
+    order_search = scan_first_viable(
+        oracle, base_config, "max_order_quantity",
+        range(first_multiple, 51, lot_size), width=search_width
+    )
+    min_required_max_order = order_search.value
     
     # Construire les recommandations
     solutions = []
@@ -693,6 +1026,11 @@ def find_stability_solutions(config_dict: Dict) -> Dict:
         "max_viable_consumption": max_viable_consumption,
         "min_required_max_order": min_required_max_order,
         "solutions": solutions,
-        "message": overall_message
+        "message": overall_message,
+        "search_statistics": {
+            "max_viable_consumption": consumption_search.to_dict(),
+            "min_required_max_order": order_search.to_dict(),
+            "total_simulations": oracle.simulations
+        }
     }
 
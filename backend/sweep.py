@@ -0,0 +1,112 @@
+"""
+Balayage de paramètres : viabilité et statistiques sur une grille cartésienne de configurations.
+
+Chaque axe fait varier un champ de SimulationConfig ; la grille complète est simulée par
+le moteur par lots (par paquets de CHUNK_SIZE points pour borner la mémoire) et la
+viabilité suit exactement les règles de _check_viability. Les résultats sont des tableaux
+NumPy de la forme de la grille, prêts pour une heatmap.
+"""
+import base64
+from dataclasses import fields
+from datetime import datetime
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from batch_engine import simulate_batch
+from optimization_service import check_viability_batch
+from simulation_engine import SimulationConfig, config_from_dict
+
+
+SWEEP_FIELDS = tuple(f.name for f in fields(SimulationConfig))
+SWEEP_STATISTICS = (
+    "final_stock", "stockouts_count", "total_ordered", "average_stock",
+    "min_stock", "max_stock", "total_events", "total_orders"
+)
+ENCODINGS = ("list", "base64")
+CHUNK_SIZE = 1000  # Points simulés par lot (borne la mémoire des tableaux point x jour)
+
+INTEGER_FIELDS = {f.name for f in fields(SimulationConfig) if f.type in (int, "int")}
+INTEGER_STATISTICS = {"stockouts_count", "total_ordered", "total_events", "total_orders"}
+
+
+def grid_valid_mask(grid: Dict[str, np.ndarray]) -> np.ndarray:
+    """Règles métier de validate_stock_parameters, appliquées à chaque point de la grille"""
+    valid = grid["min_order_quantity"] % grid["lot_size"] == 0
+    valid &= grid["max_order_quantity"] >= grid["min_order_quantity"]
+    valid &= ~((grid["initial_stock"] > 0) & (grid["reorder_threshold"] >= grid["initial_stock"]))
+    return valid
+
+
+def run_sweep(
+    base_config: Dict,
+    axes: Sequence[Tuple[str, Sequence[float]]],
+    statistics: Sequence[str] = ("stockouts_count", "final_stock", "average_stock")
+) -> Dict[str, np.ndarray]:
+    """
+    Simule la grille cartésienne des `axes` autour de `base_config`.
+
+    Args:
+        base_config: Configuration de base (mêmes clés que run_simulation_with_config)
+        axes: (champ de SimulationConfig, valeurs) par axe, dans l'ordre des dimensions
+        statistics: Statistiques du moteur par lots à retourner
+
+    Returns:
+        Tableaux de la forme de la grille : "valid" (règles métier respectées),
+        "viable" (critère de _check_viability, False hors des points valides)
+        et une entrée par statistique (NaN ou 0 hors des points valides)
+    """
+    config, start_date = config_from_dict(base_config)
+    start_date = start_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    shape = tuple(len(values) for _, values in axes)
+
+    # Valeurs de chaque champ en chaque point (champs hors axes : valeur de base)
+    grid = {name: np.full(shape, getattr(config, name)) for name in SWEEP_FIELDS}
+    mesh = np.meshgrid(*[np.asarray(values) for _, values in axes], indexing="ij")
+    for (name, _), values in zip(axes, mesh):
+        grid[name] = values
+    grid = {
+        name: values.astype(np.int64 if name in INTEGER_FIELDS else np.float64).ravel()
+        for name, values in grid.items()
+    }
+
+    valid = grid_valid_mask(grid)
+    viable = np.zeros(valid.size, dtype=bool)
+    results = {
+        name: np.zeros(valid.size, dtype=np.int64) if name in INTEGER_STATISTICS else np.full(valid.size, np.nan)
+        for name in statistics
+    }
+
+    points = np.flatnonzero(valid)
+    for chunk_start in range(0, len(points), CHUNK_SIZE):
+        chunk = points[chunk_start:chunk_start + CHUNK_SIZE]
+        configs = [
+            SimulationConfig(**{name: grid[name][i].item() for name in SWEEP_FIELDS})
+            for i in chunk
+        ]
+        batch = simulate_batch(configs, start_date=start_date)
+        viable[chunk] = check_viability_batch(batch)
+        for name in statistics:
+            results[name][chunk] = getattr(batch, name)
+
+    arrays = {"valid": valid.reshape(shape), "viable": viable.reshape(shape)}
+    arrays.update({name: values.reshape(shape) for name, values in results.items()})
+    return arrays
+
+
+def encode_array(values: np.ndarray, encoding: str = "list") -> Dict:
+    """
+    Tableau typé pour la réponse JSON :
+    - "list" : listes imbriquées (null pour NaN)
+    - "base64" : octets little-endian, ordre C, avec le dtype NumPy ("<f8", "<i8", "|b1")
+    """
+    values = np.ascontiguousarray(values)
+    if encoding == "base64":
+        values = values.astype(values.dtype.newbyteorder("<"), copy=False)
+        data = base64.b64encode(values.tobytes()).decode("ascii")
+    elif values.dtype.kind == "f" and np.isnan(values).any():
+        # NaN n'existe pas en JSON : null à la place
+        data = np.where(np.isnan(values), None, values).tolist()
+    else:
+        data = values.tolist()
+    return {"dtype": values.dtype.str, "shape": list(values.shape), "data": data}
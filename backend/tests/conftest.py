@@ -0,0 +1,27 @@
+"""Les modules du backend s'importent à plat (comme uvicorn les lance depuis backend/)"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def random_config(rng, **overrides):
+    """Configuration aléatoire qui respecte les règles métier de l'API"""
+    lot_size = rng.choice([1, 2, 3, 4])
+    min_order = lot_size * rng.randint(1, 3)
+    initial_stock = rng.uniform(10, 120)
+    config = {
+        "daily_consumption": round(rng.uniform(0.5, 12), 2),
+        "initial_stock": initial_stock,
+        "reorder_threshold": rng.uniform(0, initial_stock * 0.9),
+        "max_stock": rng.uniform(max(10, initial_stock), 150),
+        "min_order_quantity": min_order,
+        "max_order_quantity": min_order + lot_size * rng.randint(0, 5),
+        "lot_size": lot_size,
+        "delivery_lead_time_days": rng.randint(1, 7),
+        "simulation_days": 60,
+        "min_stock_to_start_sales": rng.uniform(0, initial_stock),
+        "start_date": "2024-01-01",
+    }
+    config.update(overrides)
+    return config
@@ -0,0 +1,63 @@
+"""Moteur par lots contre le moteur scalaire : mêmes séries, commandes et statistiques"""
+import random
+
+import pytest
+
+from batch_engine import simulate_batch
+from conftest import random_config
+from replenishment import (
+    BaseStockPolicy, FixedQuantityPolicy, MinMaxPolicy, PeriodicReviewPolicy, ReplenishmentPolicy
+)
+from simulation_engine import DetailLevel, result_statistics, simulate_config
+
+SERIES_COLUMNS = ("stock_start", "deliveries", "consumption", "stock_end", "order_quantity",
+                  "order_id", "delivery_id", "is_working_day", "has_threshold_crossed", "has_stockout")
+START_DATES = ("2024-01-01", "2024-02-29", "2024-12-28", "2025-06-15")
+
+
+def assert_same_result(batch, index, expected):
+    assert batch.statistics(index) == result_statistics(expected)
+    series = batch.daily_series(index)
+    for name in SERIES_COLUMNS:
+        assert list(getattr(series, name)) == list(getattr(expected.series, name)), name
+    assert batch.orders(index) == expected.orders
+
+
+def test_matches_scalar_engine():
+    rng = random.Random(2)
+    configs = [
+        random_config(rng, simulation_days=rng.randint(7, 365), start_date=rng.choice(START_DATES))
+        for _ in range(150)
+    ]
+    batch = simulate_batch(configs)
+    assert len(batch) == len(configs)
+    for i, config in enumerate(configs):
+        assert_same_result(batch, i, simulate_config(config, DetailLevel.FULL))
+
+
+def test_result_view_matches_scalar_statistics():
+    rng = random.Random(3)
+    configs = [random_config(rng) for _ in range(20)]
+    batch = simulate_batch(configs)
+    for i, config in enumerate(configs):
+        assert result_statistics(batch.result(i)) == result_statistics(simulate_config(config, DetailLevel.DAILY))
+
+
+@pytest.mark.parametrize("policy", [MinMaxPolicy(), FixedQuantityPolicy(), PeriodicReviewPolicy(), BaseStockPolicy()])
+def test_policies_match_scalar_engine(policy):
+    rng = random.Random(4)
+    configs = [random_config(rng, simulation_days=90) for _ in range(30)]
+    batch = simulate_batch(configs, policies=policy)
+    for i, config in enumerate(configs):
+        assert_same_result(batch, i, simulate_config(config, DetailLevel.FULL, policy=policy))
+
+
+def test_policy_must_define_both_steps():
+    class ScalarOnly(ReplenishmentPolicy):
+        name = "scalar_only"
+
+        def order(self, params, stock, on_order, pending, working_day, lead_days):
+            return None
+
+    with pytest.raises(TypeError):
+        ScalarOnly()
@@ -0,0 +1,84 @@
+"""Annulation : remplacement par session (SessionRegistry), déconnexion, arrêt des recherches"""
+import asyncio
+import threading
+
+import pytest
+
+from cancellation import CancellationToken, OperationCancelled, SessionRegistry, run_cancellable, sessions
+from optimization_service import calculate_equilibrium_point
+
+CONFIG = {
+    "daily_consumption": 4.25, "initial_stock": 45.0, "reorder_threshold": 36.0, "max_stock": 60.0,
+    "min_order_quantity": 2, "max_order_quantity": 10, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 60, "min_stock_to_start_sales": 20.0, "start_date": "2024-01-01",
+}
+
+
+def test_newer_session_supersedes_previous():
+    registry = SessionRegistry()
+    first = registry.start("slider")
+    other = registry.start("other")
+    second = registry.start("slider")
+    assert first.cancelled and first.reason == "Requête remplacée par une requête plus récente"
+    assert not second.cancelled and not other.cancelled
+    assert registry.active() == 2
+
+    # La fin du calcul remplacé ne retire pas le calcul courant de la session
+    registry.finish("slider", first)
+    assert registry.active() == 2
+    third = registry.start("slider")
+    assert second.cancelled and not third.cancelled
+    registry.finish("slider", third)
+    registry.finish("other", other)
+    assert registry.active() == 0
+
+
+def test_token_cancel_keeps_first_reason():
+    token = CancellationToken()
+    token.raise_if_cancelled()
+    token.cancel("première")
+    token.cancel("seconde")
+    with pytest.raises(OperationCancelled, match="première"):
+        token.raise_if_cancelled()
+
+
+def wait_until_cancelled(started: threading.Event):
+    def compute(token):
+        started.set()
+        for _ in range(500):
+            token.raise_if_cancelled()
+            threading.Event().wait(0.01)
+        return "terminé"
+    return compute
+
+
+def test_run_cancellable_supersedes_same_session():
+    async def scenario():
+        started = threading.Event()
+        first = asyncio.ensure_future(run_cancellable(wait_until_cancelled(started), session_key=("test", "s1")))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        second = await run_cancellable(lambda token: "nouveau", session_key=("test", "s1"), poll_interval=0.01)
+        with pytest.raises(OperationCancelled, match="remplacée"):
+            await first
+        return second
+
+    assert asyncio.run(scenario()) == "nouveau"
+    assert sessions.active() == 0
+
+
+def test_run_cancellable_cancels_on_disconnect():
+    class Disconnected:
+        async def is_disconnected(self):
+            return True
+
+    started = threading.Event()
+    with pytest.raises(OperationCancelled, match="Client déconnecté"):
+        asyncio.run(run_cancellable(wait_until_cancelled(started), request=Disconnected(), poll_interval=0.01))
+
+
+def test_cancelled_token_stops_equilibrium_search():
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(OperationCancelled):
+        calculate_equilibrium_point({**CONFIG, "daily_consumption": 3.9}, cancel=token)
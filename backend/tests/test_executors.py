@@ -0,0 +1,125 @@
+"""Voies d'exécution bornées : refus 503 / 429 avec Retry-After, attente des jobs, identité du client"""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from executors import ExecutorLane, LaneOverloaded, client_key, parse_networks
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "délai dépassé"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def test_lane_rejects_when_full_and_per_client(release):
+    lane = ExecutorLane("test", workers=1, queue_size=1, per_client=1)
+
+    async def scenario():
+        running = lane.submit(release.wait, client="a")
+        with pytest.raises(LaneOverloaded) as per_client:
+            lane.submit(release.wait, client="a")
+        assert per_client.value.status_code == 429
+        queued = lane.submit(release.wait, client="b")
+        with pytest.raises(LaneOverloaded) as full:
+            lane.submit(release.wait, client="c")
+        assert full.value.status_code == 503
+        assert 1 <= int(full.value.headers["Retry-After"]) <= 60
+        assert lane.stats()["rejected"] == 2
+
+        queued.cancel()  # Abandonné avant de commencer : retiré de la file
+        await asyncio.sleep(0.05)
+        assert lane.stats()["pending"] == 1
+        release.set()
+        await running
+        await asyncio.sleep(0.05)
+        assert lane.stats()["pending"] == 0 and lane.stats()["completed"] == 1
+
+    asyncio.run(scenario())
+    lane.shutdown()
+
+
+def test_call_waits_for_a_place_instead_of_refusing(release):
+    lane = ExecutorLane("jobs", workers=1, queue_size=0)
+    blocked = threading.Thread(target=lane.call, args=(release.wait,))
+    blocked.start()
+    wait_until(lambda: lane.stats()["pending"] == 1)
+
+    results = []
+    waiting = threading.Thread(target=lambda: results.append(lane.call(lambda: 42)))
+    waiting.start()
+    time.sleep(0.1)
+    assert results == [] and lane.stats()["pending"] == 1
+    release.set()
+    blocked.join(5)
+    waiting.join(5)
+    assert results == [42]
+    lane.shutdown()
+
+
+def test_simulate_returns_503_with_retry_after_when_lane_is_full(release, monkeypatch):
+    lane = ExecutorLane("simulate", workers=1, queue_size=0)
+    monkeypatch.setattr(main, "simulate_lane", lane)
+    blocked = threading.Thread(target=lane.call, args=(release.wait,))
+    blocked.start()
+    wait_until(lambda: lane.stats()["pending"] == 1)
+
+    response = TestClient(main.app).post("/simulate", json={})
+    assert response.status_code == 503
+    assert 1 <= int(response.headers["retry-after"]) <= 60
+    release.set()
+    blocked.join(5)
+    assert TestClient(main.app).post("/simulate", json={}).status_code == 200
+    lane.shutdown()
+
+
+def test_analyze_returns_429_when_client_has_too_many_computations(release, monkeypatch):
+    lane = ExecutorLane("analysis", workers=2, queue_size=0, per_client=1)
+    monkeypatch.setattr(main, "analysis_lane", lane)
+    # Calcul en cours pour le client du TestClient ("testclient")
+    holder = threading.Thread(target=lambda: asyncio.run(lane.run(release.wait, client="testclient")))
+    holder.start()
+    wait_until(lambda: lane.stats()["pending"] == 1)
+
+    response = TestClient(main.app).post("/analyze", json={})
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+    release.set()
+    holder.join(5)
+    lane.shutdown()
+
+
+def test_client_key_trusts_forwarded_headers_only_from_proxies():
+    trusted = parse_networks("10.0.0.0/8")
+
+    def request(host, headers):
+        return SimpleNamespace(client=SimpleNamespace(host=host), headers=headers)
+
+    assert client_key(request("203.0.113.5", {"x-real-ip": "198.51.100.1"}), trusted) == "203.0.113.5"
+    assert client_key(request("10.0.0.2", {"x-real-ip": "198.51.100.1"}), trusted) == "198.51.100.1"
+    forwarded = {"x-forwarded-for": "192.0.2.99, 198.51.100.7, 10.0.0.3"}
+    assert client_key(request("10.0.0.2", forwarded), trusted) == "198.51.100.7"
+    assert client_key(request("10.0.0.2", {}), trusted) == "10.0.0.2"
+    assert client_key(request("203.0.113.5", {"x-real-ip": "198.51.100.1"}), []) == "203.0.113.5"
+
+
+def test_process_executor_rejected_when_not_allowed(monkeypatch):
+    monkeypatch.setenv("LANE_ANALYSIS_EXECUTOR", "process")
+    with pytest.raises(ValueError):
+        ExecutorLane.from_env("analysis", workers=1, queue_size=0, allow_process=False)
+    assert ExecutorLane.from_env("batch", workers=1, queue_size=0).kind == "thread"
+    monkeypatch.setenv("LANE_BATCH_EXECUTOR", "process")
+    assert ExecutorLane.from_env("batch", workers=1, queue_size=0).kind == "process"
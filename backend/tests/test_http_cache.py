@@ -0,0 +1,88 @@
+"""ETag, 304 et compression des réponses, à travers l'application (TestClient)"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+CONFIG = {
+    "daily_consumption": 4.25, "initial_stock": 45.0, "reorder_threshold": 36.0, "max_stock": 45.0,
+    "min_order_quantity": 2, "max_order_quantity": 10, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 60, "min_stock_to_start_sales": 36.0, "start_date": "2024-01-01",
+}
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def test_simulate_etag_and_not_modified_without_computation(client, monkeypatch):
+    first = client.post("/simulate", json=CONFIG, headers=IDENTITY)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and not etag.startswith("W/")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("304 attendu sans simulation")
+
+    monkeypatch.setattr(main, "_simulation_payload", fail)
+    cached = client.post("/simulate", json=CONFIG, headers={**IDENTITY, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+
+def test_etag_depends_on_config_and_options(client):
+    base = client.post("/simulate", json=CONFIG).headers["etag"]
+    assert client.post("/simulate", json={**CONFIG, "daily_consumption": 4.0}).headers["etag"] != base
+    assert client.post("/simulate", json={**CONFIG, "fields": ["statistics"]}).headers["etag"] != base
+    changed = client.post("/simulate", json={**CONFIG, "initial_stock": 50.0}, headers={"If-None-Match": base})
+    assert changed.status_code == 200
+
+
+def test_no_etag_without_start_date(client):
+    response = client.post("/simulate", json={**CONFIG, "start_date": None})
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_gzip_response_and_suffixed_etag(client):
+    response = client.post("/simulate", json=CONFIG, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert "Accept-Encoding" in response.headers["vary"]
+    plain = client.post("/simulate", json=CONFIG, headers=IDENTITY)
+    assert response.content == plain.content  # httpx décompresse la réponse
+    assert int(response.headers["content-length"]) < len(plain.content)
+
+    # L'ETag suffixé désigne toujours la même ressource
+    cached = client.post("/simulate", json=CONFIG, headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+
+def test_vary_on_small_and_uncompressed_responses(client):
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert "Accept-Encoding" in small.headers["vary"]
+    plain = client.post("/simulate", json=CONFIG, headers=IDENTITY)
+    assert "content-encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+
+def test_event_stream_is_not_compressed(client):
+    with client.stream("POST", "/optimize/stream", json=CONFIG, headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "content-encoding" not in response.headers
+        assert "event: result" in "".join(response.iter_text())
+
+
+def test_optimize_weak_etag_only_when_converged(client):
+    converged = client.post("/optimize", json=CONFIG)
+    assert converged.json()["search_status"]["converged"]
+    etag = converged.headers["etag"]
+    assert etag.startswith("W/")
+    assert client.post("/optimize", json=CONFIG, headers={"If-None-Match": etag}).status_code == 304
+
+    partial = client.post("/optimize", json={**CONFIG, "simulation_budget": 2})
+    assert not partial.json()["search_status"]["converged"]
+    assert "etag" not in partial.headers
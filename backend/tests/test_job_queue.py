@@ -0,0 +1,121 @@
+"""File de jobs : déduplication, relance des jobs en échec, expiration, exécution dans une voie"""
+import threading
+
+import pytest
+
+from executors import ExecutorLane
+from job_queue import JobQueue, public_record
+
+CONFIG = {
+    "daily_consumption": 4.25, "initial_stock": 45.0, "reorder_threshold": 36.0, "max_stock": 60.0,
+    "min_order_quantity": 2, "max_order_quantity": 10, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 60, "min_stock_to_start_sales": 20.0, "start_date": "2024-01-01",
+}
+
+
+class Handler:
+    """Handler de test : compte ses appels, échoue tant que `failures` > 0"""
+
+    def __init__(self, failures=0):
+        self.calls = []
+        self.failures = failures
+
+    def __call__(self, config, **options):
+        self.calls.append((config, options, threading.current_thread().name))
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("panne du calcul")
+        return {"consumption": config["daily_consumption"], **options}
+
+
+def drain(jobs):
+    """Exécute les jobs en file ; retourne leur nombre"""
+    count = 0
+    while jobs.run_next(timeout=0.01):
+        count += 1
+    return count
+
+
+def test_identical_submissions_share_one_job():
+    handler = Handler()
+    jobs = JobQueue({"optimize": handler})
+    first = jobs.submit("optimize", CONFIG, {"simulation_budget": 50, "time_budget": None})
+    reordered = dict(reversed(list(CONFIG.items())))
+    second = jobs.submit("optimize", reordered, {"simulation_budget": 50})
+    assert second["id"] == first["id"] and second["status"] == "queued"
+    assert first["options"] == {"simulation_budget": 50}
+
+    assert drain(jobs) == 1
+    assert len(handler.calls) == 1
+    done = jobs.submit("optimize", CONFIG, {"simulation_budget": 50})
+    assert done["status"] == "done"
+    assert done["result"] == {"consumption": 4.25, "simulation_budget": 50}
+    assert drain(jobs) == 0 and len(handler.calls) == 1
+
+
+def test_kind_config_and_options_identify_the_job():
+    jobs = JobQueue({"analyze": Handler(), "optimize": Handler()})
+    ids = {
+        jobs.submit("optimize", CONFIG)["id"],
+        jobs.submit("analyze", CONFIG)["id"],
+        jobs.submit("optimize", {**CONFIG, "daily_consumption": 4.0})["id"],
+        jobs.submit("optimize", CONFIG, {"simulation_budget": 10})["id"],
+    }
+    assert len(ids) == 4
+
+
+def test_failed_job_is_resubmitted():
+    handler = Handler(failures=1)
+    jobs = JobQueue({"optimize": handler})
+    job_id = jobs.submit("optimize", CONFIG)["id"]
+    drain(jobs)
+    failed = jobs.get(job_id)
+    assert failed["status"] == "failed" and failed["error"] == "panne du calcul"
+    assert failed["started_at"] <= failed["finished_at"]
+
+    again = jobs.submit("optimize", CONFIG)
+    assert again["id"] == job_id and again["status"] == "queued" and again["error"] is None
+    assert drain(jobs) == 1
+    assert jobs.get(job_id)["status"] == "done"
+    assert len(handler.calls) == 2
+
+
+def test_expired_jobs_are_forgotten():
+    handler = Handler()
+    jobs = JobQueue({"optimize": handler}, ttl=-1)
+    record = jobs.submit("optimize", CONFIG)
+    assert jobs.get(record["id"]) is None
+    drain(jobs)
+    assert handler.calls == []
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError, match="Type de job inconnu"):
+        JobQueue({"optimize": Handler()}).submit("pareto", CONFIG)
+
+
+def test_jobs_run_in_the_lane_and_worker_threads():
+    handler = Handler()
+    lane = ExecutorLane("analysis", workers=1, queue_size=0)
+    jobs = JobQueue({"optimize": handler}, lane=lane)
+    ids = [jobs.submit("optimize", {**CONFIG, "daily_consumption": value})["id"] for value in (3.0, 3.5, 4.0)]
+    jobs.start(2)
+    try:
+        for job_id in ids:
+            for _ in range(500):
+                if jobs.get(job_id)["status"] == "done":
+                    break
+                threading.Event().wait(0.01)
+    finally:
+        jobs.stop()
+    assert [jobs.get(job_id)["result"]["consumption"] for job_id in ids] == [3.0, 3.5, 4.0]
+    assert all(name.startswith("lane-analysis") for _, _, name in handler.calls)
+    assert lane.stats()["completed"] == 3
+    lane.shutdown()
+
+
+def test_public_record_hides_config_and_result():
+    jobs = JobQueue({"optimize": Handler()})
+    record = jobs.submit("optimize", CONFIG)
+    assert "config" not in public_record(record) and "result" not in public_record(record)
+    assert public_record(record, with_result=True)["result"] is None
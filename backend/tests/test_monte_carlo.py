@@ -0,0 +1,49 @@
+"""Monte Carlo : reproductible pour une graine quel que soit le nombre de processus"""
+import pytest
+
+import monte_carlo
+from monte_carlo import generate_demand, run_monte_carlo
+from simulation_engine import DetailLevel, simulate_config
+
+CONFIG = {
+    "daily_consumption": 4.25, "initial_stock": 45.0, "reorder_threshold": 36.0, "max_stock": 45.0,
+    "min_order_quantity": 2, "max_order_quantity": 10, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 60, "min_stock_to_start_sales": 36.0, "start_date": "2024-01-01",
+}
+
+
+@pytest.mark.parametrize("distribution, options", [
+    ("poisson", {}),
+    ("normal", {"std": 2.0}),
+    ("empirical", {"samples": [0, 2, 3, 4, 5, 9]}),
+])
+def test_same_seed_same_result_for_any_workers(monkeypatch, distribution, options):
+    monkeypatch.setattr(monte_carlo, "CHUNK_SIZE", 64)  # Plusieurs lots, donc plusieurs processus
+    results = [
+        run_monte_carlo(CONFIG, distribution, replications=300, seed=42, workers=workers, **options)
+        for workers in (1, 2, 3)
+    ]
+    assert results[1] == results[0]
+    assert results[2] == results[0]
+    assert run_monte_carlo(CONFIG, distribution, replications=300, seed=43, **options) != results[0]
+
+
+def test_chunking_does_not_change_result(monkeypatch):
+    whole = run_monte_carlo(CONFIG, replications=200, seed=5)
+    monkeypatch.setattr(monte_carlo, "CHUNK_SIZE", 30)
+    assert run_monte_carlo(CONFIG, replications=200, seed=5) == whole
+
+
+def test_constant_demand_matches_deterministic_simulation():
+    result = run_monte_carlo(CONFIG, "empirical", replications=20, samples=[CONFIG["daily_consumption"]])
+    expected = simulate_config(CONFIG, DetailLevel.STATS)
+    assert result["stock_end_mean"] == pytest.approx(list(expected.series.stock_end))
+    assert result["stockout_probability"] == (1.0 if expected.stockouts_count else 0.0)
+    assert result["expected_stockout_days"] == expected.stockouts_count
+
+
+def test_generate_demand_errors():
+    with pytest.raises(ValueError, match="échantillons"):
+        generate_demand(4.0, "empirical", 10, 5, 0)
+    with pytest.raises(ValueError, match="Distribution inconnue"):
+        generate_demand(4.0, "uniform", 10, 5, 0)
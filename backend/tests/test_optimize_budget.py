@@ -0,0 +1,77 @@
+"""Budgets de /optimize : résultats partiels cohérents avec la recherche complète"""
+import pytest
+
+from optimization_service import calculate_equilibrium_point
+from result_cache import cached_verdict
+from search import SearchBudget, ViabilityOracle, bisect_max
+
+CONFIG = {
+    "daily_consumption": 4.25, "initial_stock": 45.0, "reorder_threshold": 36.0, "max_stock": 60.0,
+    "min_order_quantity": 2, "max_order_quantity": 10, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 60, "min_stock_to_start_sales": 20.0, "start_date": "2024-01-01",
+}
+
+
+@pytest.fixture(scope="module")
+def full():
+    return calculate_equilibrium_point(CONFIG)
+
+
+def searches(result):
+    return result["search_statistics"]["max_viable_consumption"], result["search_statistics"]["min_required_max_order"]
+
+
+def test_unlimited_budget_converges(full):
+    assert full["search_status"]["status"] == "converged"
+    assert full["search_status"]["budget"] == {"seconds": None, "simulations": None}
+    assert full["search_status"]["simulations"] > 8
+
+
+@pytest.mark.parametrize("simulations", [0, 1, 3, 5, 8])
+def test_simulation_budget_gives_partial_results_within_full_search(full, simulations):
+    result = calculate_equilibrium_point(CONFIG, simulation_budget=simulations)
+    status = result["search_status"]
+    assert status["simulations"] <= simulations
+    assert status["status"] == "partial" and not status["converged"]
+    assert status["budget"] == {"seconds": None, "simulations": simulations}
+
+    consumption, order = searches(result)
+    full_consumption, full_order = searches(full)
+    # Les recherches sont déterministes : l'arrêt tronque la suite de points de la recherche complète
+    assert consumption["low"] <= full_consumption["value"] <= consumption["high"]
+    if consumption["value"] is not None:
+        assert consumption["value"] <= full_consumption["value"]
+        assert cached_verdict({**CONFIG, "daily_consumption": consumption["value"]}, "viability")
+    if not consumption["converged"]:
+        assert order["simulations"] == 0 and order["value"] is None
+    assert order["value"] in (None, full_order["value"])
+    assert status["intervals"]["max_viable_consumption"] == [consumption["low"], consumption["high"]]
+
+
+def test_large_budget_matches_full_search(full):
+    result = calculate_equilibrium_point(CONFIG, simulation_budget=full["search_status"]["simulations"])
+    assert result["search_status"]["status"] == "converged"
+    assert result["equilibrium_analysis"] == full["equilibrium_analysis"]
+
+
+def test_zero_time_budget_stops_before_any_search(full):
+    result = calculate_equilibrium_point(CONFIG, time_budget=0)
+    assert result["search_status"]["status"] == "partial"
+    assert result["search_status"]["simulations"] == 0
+    # La configuration actuelle est toujours évaluée (hors budget)
+    assert result["current_status"] == full["current_status"]
+
+
+@pytest.mark.parametrize("simulations", [1, 4, 9])
+def test_bisect_budget_interval_contains_full_answer(simulations):
+    def predicate(x):
+        return x <= 61.3
+
+    def oracle(budget=None):
+        return ViabilityOracle(lambda config: predicate(config["x"]), budget=budget)
+
+    complete = bisect_max(oracle(), {}, "x", 0.0, 100.0, 0.01)
+    partial = bisect_max(oracle(SearchBudget(simulations=simulations)), {}, "x", 0.0, 100.0, 0.01)
+    assert not partial.converged and partial.simulations == simulations
+    assert partial.low <= complete.value <= partial.high
+    assert partial.value is None or predicate(partial.value)
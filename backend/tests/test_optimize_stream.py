@@ -0,0 +1,83 @@
+"""/optimize/stream : suite des événements Server-Sent Events et résultat identique à /optimize"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from cancellation import OperationCancelled
+
+CONFIG = {
+    "daily_consumption": 4.25, "initial_stock": 45.0, "reorder_threshold": 36.0, "max_stock": 60.0,
+    "min_order_quantity": 2, "max_order_quantity": 10, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 60, "min_stock_to_start_sales": 20.0, "start_date": "2024-01-01",
+}
+PHASES = ("current_status", "max_viable_consumption", "min_required_max_order", "recommendations")
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def read_events(response):
+    """(type, données) de chaque message du flux"""
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for block in response.text.split("\n\n"):
+        if not block:
+            continue
+        kind, data = block.split("\n")
+        assert kind.startswith("event: ") and data.startswith("data: ")
+        events.append((kind[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_event_sequence_and_result(client):
+    events = read_events(client.post("/optimize/stream", json=CONFIG))
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == "result"
+    assert set(kinds[:-1]) <= {"phase", "step"}
+
+    phases = [(data["phase"], data["status"]) for kind, data in events if kind == "phase"]
+    assert phases == [(phase, status) for phase in PHASES for status in ("start", "finish")]
+
+    # Chaque pas appartient à la recherche de la phase en cours, dans son intervalle
+    current = None
+    steps = {phase: 0 for phase in PHASES}
+    for kind, data in events[:-1]:
+        if kind == "phase":
+            current = data["phase"] if data["status"] == "start" else None
+            continue
+        assert data["search"] == current
+        steps[current] += 1
+        low, high = data["bracket"]
+        assert low is None or high is None or low <= high
+    assert steps["max_viable_consumption"] > 0 and steps["min_required_max_order"] > 0
+
+    result = events[-1][1]
+    expected = client.post("/optimize", json=CONFIG).json()
+    for response in (result, expected):
+        del response["search_status"]["elapsed_seconds"]
+    assert result == expected
+    finished = {data["phase"]: data for kind, data in events if kind == "phase" and data["status"] == "finish"}
+    for search in ("max_viable_consumption", "min_required_max_order"):
+        assert finished[search]["value"] == result["equilibrium_analysis"][search]
+
+
+@pytest.mark.parametrize("error, kind, detail", [
+    (OperationCancelled("Requête remplacée"), "cancelled", "Optimisation annulée: Requête remplacée"),
+    (RuntimeError("panne"), "error", "Erreur lors de l'optimisation: panne"),
+])
+def test_early_end_events(client, monkeypatch, error, kind, detail):
+    def fail(request, cancel=None, progress=None):
+        progress({"event": "phase", "phase": "current_status", "status": "start"})
+        raise error
+
+    monkeypatch.setattr(main, "_run_optimization", fail)
+    events = read_events(client.post("/optimize/stream", json=CONFIG))
+    assert events == [
+        ("phase", {"event": "phase", "phase": "current_status", "status": "start"}),
+        (kind, {"event": kind, "detail": detail}),
+    ]
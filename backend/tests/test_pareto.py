@@ -0,0 +1,60 @@
+"""Front de Pareto : points mutuellement non dominés, viables et reproductibles"""
+import numpy as np
+import pytest
+
+from optimization_service import _check_viability
+from pareto import non_dominated, pareto_front
+from simulation_engine import DetailLevel, result_statistics, simulate_config
+
+BASE = {
+    "daily_consumption": 4.25, "initial_stock": 45.0, "reorder_threshold": 36.0, "max_stock": 60.0,
+    "min_order_quantity": 4, "max_order_quantity": 20, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 90, "min_stock_to_start_sales": 20.0, "start_date": "2024-01-01",
+}
+
+
+def dominates(a, b):
+    return all(x <= y for x, y in zip(a, b)) and any(x < y for x, y in zip(a, b))
+
+
+def test_non_dominated_mask():
+    points = np.array([[1.0, 5.0], [2.0, 2.0], [3.0, 3.0], [5.0, 1.0], [2.0, 2.0], [6.0, 6.0]])
+    assert non_dominated(points).tolist() == [True, True, False, True, True, False]
+    assert non_dominated(np.zeros((0, 2))).tolist() == []
+
+
+@pytest.mark.parametrize("objectives", [
+    ("average_stock", "total_orders"),
+    ("average_stock", "total_orders", "min_stock"),
+])
+def test_front_points_mutually_non_dominated_and_viable(objectives):
+    result = pareto_front(BASE, objectives, population=64, generations=3, seed=1)
+    front = result["front"]
+    assert front
+    scores = [tuple(point["objectives"][name] for name in objectives) for point in front]
+    for i, a in enumerate(scores):
+        for j, b in enumerate(scores):
+            assert i == j or not dominates(a, b), (a, b)
+    assert len(set(scores)) == len(scores)
+    assert scores == sorted(scores)
+
+    for point in front:
+        config = {**BASE, **point["configuration"]}
+        simulated = simulate_config(config, DetailLevel.DAILY)
+        assert _check_viability(simulated, config["reorder_threshold"])
+        statistics = result_statistics(simulated)
+        assert {name: statistics[name] for name in objectives} == point["objectives"]
+
+
+def test_same_seed_same_front():
+    first = pareto_front(BASE, population=32, generations=2, seed=7)
+    second = pareto_front(BASE, population=32, generations=2, seed=7)
+    assert first["front"] == second["front"]
+    assert (first["evaluated"], first["viable"]) == (second["evaluated"], second["viable"])
+
+
+def test_invalid_objectives_and_variables():
+    with pytest.raises(ValueError, match="Objectifs invalides"):
+        pareto_front(BASE, ("unknown",))
+    with pytest.raises(ValueError, match="Variables inconnues"):
+        pareto_front(BASE, bounds={"lot_size": (1, 2)})
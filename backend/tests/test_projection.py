@@ -0,0 +1,91 @@
+"""Projection et pagination : erreurs, niveau de détail, pages par dates et offset / limit"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import random_config
+from projection import Page, Projection, _days_page, _events_page, project_result
+from simulation_engine import DetailLevel, run_simulation_with_config, simulate_config
+
+
+@pytest.mark.parametrize("selectors, message", [
+    (["unknown"], "Champs inconnus: unknown"),
+    (["statistics.unknown", "events"], "Champs inconnus: statistics.unknown"),
+    ([], "Projection vide"),
+])
+def test_parse_errors(selectors, message):
+    with pytest.raises(ValueError, match=message):
+        Projection.parse(selectors)
+
+
+def test_parse_merges_fields_and_whole_sections():
+    projection = Projection.parse(["statistics.final_stock", "statistics.min_stock", "statistics.final_stock"])
+    assert projection.sections == {"statistics": ("final_stock", "min_stock")}
+    projection = Projection.parse(["daily_details.stock_end", "daily_details"])
+    assert projection.sections == {"daily_details": None}
+
+
+@pytest.mark.parametrize("selectors, level", [
+    (None, DetailLevel.FULL),
+    (["events.date"], DetailLevel.FULL),
+    (["orders"], DetailLevel.DAILY),
+    (["daily_details.deliveries"], DetailLevel.DAILY),
+    (["daily_details"], DetailLevel.DAILY),
+    (["daily_details.stock_end", "daily_details.has_stockout"], DetailLevel.STATS),
+    (["statistics", "config"], DetailLevel.STATS),
+])
+def test_detail_level(selectors, level):
+    assert Projection.parse(selectors).detail_level == level
+
+
+def test_projection_at_its_detail_level_matches_full_response():
+    rng = random.Random(11)
+    for _ in range(20):
+        config = random_config(rng, simulation_days=rng.randint(10, 120))
+        full = run_simulation_with_config(config)
+        for selectors in (["statistics"], ["daily_details.stock_end", "daily_details.date"], ["orders"]):
+            projection = Projection.parse(selectors)
+            projected = project_result(simulate_config(config, projection.detail_level), config, projection)
+            for section, names in projection.sections.items():
+                rows = full[section] if isinstance(full[section], list) else [full[section]]
+                fields = names or projection.fields_of(section)
+                expected = [{name: row[name] for name in fields} for row in rows]
+                got = projected[section] if isinstance(projected[section], list) else [projected[section]]
+                assert got == expected
+
+
+@pytest.mark.parametrize("page", [
+    Page(),
+    Page(offset=5, limit=10),
+    Page(offset=200),
+    Page(date_from=datetime(2024, 1, 10, 15, 30)),
+    Page(date_to=datetime(2024, 2, 3)),
+    Page(date_from=datetime(2024, 1, 20), date_to=datetime(2024, 2, 10), offset=2, limit=4),
+    Page(date_from=datetime(2024, 3, 1), date_to=datetime(2024, 2, 1)),
+    Page(date_from=datetime(2023, 12, 1), date_to=datetime(2024, 12, 31), limit=0),
+])
+def test_pages_match_filtering_full_lists(page):
+    config = random_config(random.Random(3), simulation_days=60, start_date="2024-01-01")
+    result = simulate_config(config, DetailLevel.FULL)
+    low = page.date_from.date() if page.date_from else None
+    high = page.date_to.date() if page.date_to else None
+
+    def expected(items, date_of):
+        selected = [item for item in items
+                    if (low is None or date_of(item) >= low) and (high is None or date_of(item) <= high)]
+        end = None if page.limit is None else page.offset + page.limit
+        return selected[page.offset:end], {"offset": page.offset, "limit": page.limit, "total": len(selected)}
+
+    start = result.series.start_date
+    days, pagination = _days_page(result.series, page)
+    assert (list(days), pagination) == expected(range(len(result.series)), lambda d: (start + timedelta(days=d)).date())
+
+    events, pagination = _events_page(result.events, page)
+    assert (events, pagination) == expected(result.events, lambda e: e.date.date())
+
+
+def test_no_page_returns_everything_without_pagination():
+    result = simulate_config(random_config(random.Random(4)), DetailLevel.FULL)
+    assert _days_page(result.series, None) == (range(len(result.series)), None)
+    assert _events_page(result.events, None) == (result.events, None)
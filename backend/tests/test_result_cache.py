@@ -0,0 +1,83 @@
+"""Cache des simulations : clé canonique, compteurs de hits/misses, L2 et éviction"""
+from result_cache import InMemoryBackend, SimulationCache, config_hash, simulate_config_cached, simulation_cache
+from simulation_engine import DetailLevel
+
+CONFIG = {
+    "daily_consumption": 4.25, "initial_stock": 45.0, "reorder_threshold": 36.0, "max_stock": 45.0,
+    "min_order_quantity": 2, "max_order_quantity": 10, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 60, "min_stock_to_start_sales": 36.0, "start_date": "2024-01-01",
+}
+
+
+def test_config_hash_stable_across_key_order_and_number_types():
+    reordered = dict(reversed(list(CONFIG.items())))
+    assert config_hash(reordered) == config_hash(CONFIG)
+    assert config_hash({**CONFIG, "initial_stock": 45, "lot_size": 2.0}) == config_hash(CONFIG)
+    assert config_hash({**CONFIG, "start_date": "2024-01-01T00:00:00"}) == config_hash(CONFIG)
+
+
+def test_config_hash_depends_on_config_and_options():
+    base = config_hash(CONFIG)
+    assert config_hash({**CONFIG, "daily_consumption": 4.0}) != base
+    assert config_hash({**CONFIG, "start_date": "2024-01-02"}) != base
+    assert config_hash(CONFIG, detail_level="stats") != base
+    assert config_hash(CONFIG, detail_level="stats") != config_hash(CONFIG, detail_level="daily")
+
+
+def test_hit_and_miss_counters():
+    cache = SimulationCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    assert cache.get_or_compute("a", compute) == {"value": 1}
+    assert cache.get_or_compute("a", compute) == {"value": 1}
+    assert cache.get_or_compute("b", compute) == {"value": 2}
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert (stats["hits_l1"], stats["hits_l2"], stats["misses"]) == (1, 0, 2)
+    assert stats["hit_rate"] == round(1 / 3, 4)
+    assert stats["entries"] == 2
+
+
+def test_l2_shared_between_caches():
+    l2 = InMemoryBackend()
+    first, second = SimulationCache(l2=l2), SimulationCache(l2=l2)
+    first.get_or_compute("key", lambda: [1, 2, 3])
+    assert second.get_or_compute("key", lambda: [0]) == [1, 2, 3]
+    assert (second.stats()["hits_l2"], second.stats()["misses"]) == (1, 0)
+    assert second.get_or_compute("key", lambda: [0]) == [1, 2, 3]
+    assert second.stats()["hits_l1"] == 1
+
+
+def test_native_values_stay_in_l1():
+    l2 = InMemoryBackend()
+    cache = SimulationCache(l2=l2)
+    value = object()
+    assert cache.get_or_compute("native", lambda: value, size_of=lambda v: 10) is value
+    assert cache.get_or_compute("native", lambda: None, size_of=lambda v: 10) is value
+    assert l2.get("simulation:native") is None
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = SimulationCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, lambda: key)
+    assert cache.get_or_compute("a", lambda: "recomputed") == "recomputed"
+    assert cache.stats()["entries"] == 2
+
+    small = SimulationCache(max_bytes=100)
+    small.get_or_compute("big", lambda: "x" * 200)
+    assert small.stats()["entries"] == 0
+
+
+def test_native_results_shared_per_detail_level():
+    config = {**CONFIG, "daily_consumption": 3.7125}  # Absente des autres tests (cache global)
+    misses = simulation_cache.stats()["misses"]
+    stats = simulate_config_cached(config, DetailLevel.STATS)
+    assert simulate_config_cached(dict(reversed(list(config.items()))), DetailLevel.STATS) is stats
+    full = simulate_config_cached(config, DetailLevel.FULL)
+    assert full is not stats and full.events and not stats.events
+    assert simulation_cache.stats()["misses"] == misses + 2
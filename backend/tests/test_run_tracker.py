@@ -0,0 +1,40 @@
+"""RunTracker : verdicts de l'arrêt anticipé identiques à ceux de la simulation complète"""
+import random
+
+import pytest
+
+from conftest import random_config
+from optimization_service import _check_viability
+from simulation_engine import DetailLevel, analyze_stock_trend, simulate_config, simulate_tracked
+
+DAYS = (20, 59, 60, 61, 90, 200, 365)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_early_stop_matches_full_run(seed):
+    rng = random.Random(seed)
+    stopped_early = 0
+    for _ in range(60):
+        config = random_config(rng, simulation_days=rng.choice(DAYS))
+        full = simulate_config(config, DetailLevel.DAILY)
+        viable = _check_viability(full, config["reorder_threshold"])
+        trend = analyze_stock_trend(full.daily_details, 30)
+        stable = full.stockouts_count == 0 and trend["trend"] in ["stable", "ascending"]
+
+        tracker = simulate_tracked(config, stop_on_failure=False)
+        assert tracker.complete
+        assert (tracker.viable(), tracker.stable()) == (viable, stable)
+        assert tracker.trend() == trend
+        assert tracker.stockouts == full.stockouts_count
+
+        early = simulate_tracked(config)
+        assert (early.viable(), early.stable()) == (viable, stable)
+        if full.stockouts_count:
+            # Arrêt le jour de la première rupture
+            first = next(day for day, value in enumerate(full.series.stock_end) if value < 0)
+            assert early.days_tracked == first + 1
+            assert early.has_failed
+            stopped_early += early.days_tracked < config["simulation_days"]
+        else:
+            assert early.complete
+    assert stopped_early > 0
@@ -0,0 +1,113 @@
+"""Recherches de search.py contre un parcours linéaire, prédicats monotones ou non"""
+import random
+
+import pytest
+
+from search import Lattice, SearchBudget, ViabilityOracle, bisect_max, first_viable, scan_first_viable
+
+
+def oracle_for(predicate, batched=False, budget=None):
+    return ViabilityOracle(
+        lambda config: predicate(config["x"]),
+        (lambda configs: [predicate(config["x"]) for config in configs]) if batched else None,
+        budget=budget
+    )
+
+
+def linear_first(points, predicate):
+    return next((point for point in points if predicate(point)), None)
+
+
+@pytest.mark.parametrize("width", [1, 3, 7])
+@pytest.mark.parametrize("gallop", [False, True])
+def test_first_viable_monotone_matches_linear_scan(gallop, width):
+    points = range(0, 60, 3)
+    for threshold in range(-3, 65):
+        predicate = lambda x: x >= threshold
+        search = first_viable(oracle_for(predicate, batched=width > 1), {}, "x", points, gallop=gallop, width=width)
+        assert search.value == linear_first(points, predicate)
+        assert search.converged
+
+
+def test_first_viable_descending_lattice():
+    points = Lattice(10.0, -0.5, 20)
+    for limit in (-1.0, 0.5, 3.25, 7.0, 10.0, 11.0):
+        predicate = lambda x: x <= limit
+        assert first_viable(oracle_for(predicate), {}, "x", points, gallop=True).value == linear_first(points, predicate)
+
+
+@pytest.mark.parametrize("gallop", [False, True])
+def test_first_viable_non_monotone_returns_a_boundary(gallop):
+    """Sans monotonie, le point retourné est viable et précédé d'un point non viable testé"""
+    rng = random.Random(5)
+    points = range(40)
+    for _ in range(200):
+        viable = {point for point in points if rng.random() < 0.3}
+        predicate = lambda x: x in viable
+        search = first_viable(oracle_for(predicate), {}, "x", points, gallop=gallop)
+        if search.value is not None:
+            assert predicate(search.value)
+            assert search.low is None or not predicate(search.low)
+
+
+@pytest.mark.parametrize("width", [1, 4])
+def test_scan_first_viable_non_monotone_matches_linear_scan(width):
+    rng = random.Random(6)
+    points = Lattice(8.0, -0.5, 16)
+    found_where_bisection_fails = False
+    for _ in range(300):
+        viable = {point for point in points if rng.random() < 0.15}
+        predicate = lambda x: x in viable
+        search = scan_first_viable(oracle_for(predicate, batched=width > 1), {}, "x", points, width=width)
+        assert search.value == linear_first(points, predicate)
+        gallop = first_viable(oracle_for(predicate), {}, "x", points, gallop=True)
+        found_where_bisection_fails |= gallop.value is None and search.value is not None
+    # Cas qui justifie le parcours : la dichotomie manque des points viables
+    assert found_where_bisection_fails
+
+
+@pytest.mark.parametrize("width", [1, 3, 7])
+def test_bisect_max_matches_linear_scan(width):
+    precision = 0.01
+    for limit in (0.3, 1.0, 2.5, 4.75, 9.99):
+        predicate = lambda x: x <= limit
+        search = bisect_max(oracle_for(predicate, batched=width > 1), {}, "x", 0.0, 10.0, precision, width=width)
+        grid = [i * precision / 2 for i in range(int(10.0 / (precision / 2)) + 1)]
+        linear_max = max(x for x in grid if predicate(x))
+        assert predicate(search.value)
+        assert linear_max - search.value <= precision
+
+
+def test_bisect_max_non_monotone_returns_a_viable_value():
+    rng = random.Random(7)
+    for _ in range(100):
+        cut = sorted(rng.uniform(0, 10) for _ in range(4))
+        predicate = lambda x: x <= cut[0] or cut[1] <= x <= cut[2]
+        search = bisect_max(oracle_for(predicate), {}, "x", 0.0, 10.0, 0.01)
+        assert search.value is None or predicate(search.value)
+
+
+def test_k_ary_mode_visits_the_sequential_points():
+    points = range(0, 200, 2)
+    for threshold in (0, 17, 101, 190, 500):
+        predicate = lambda x: x >= threshold
+        sequential = first_viable(oracle_for(predicate), {}, "x", points, gallop=True)
+        k_ary = first_viable(oracle_for(predicate, batched=True), {}, "x", points, gallop=True, width=7)
+        assert (k_ary.value, k_ary.low, k_ary.high) == (sequential.value, sequential.low, sequential.high)
+
+
+def test_oracle_memoizes_shared_points():
+    calls = []
+    oracle = ViabilityOracle(lambda config: calls.append(config["x"]) or config["x"] >= 10)
+    first_viable(oracle, {}, "x", range(30))
+    first_viable(oracle, {}, "x", range(30))
+    assert len(calls) == len(set(calls)) == oracle.simulations
+    assert oracle.memo_hits > 0
+
+
+def test_budget_stops_search_with_best_known_point():
+    budget = SearchBudget(simulations=3)
+    search = first_viable(oracle_for(lambda x: x >= 37, budget=budget), {}, "x", range(100))
+    assert not search.converged
+    assert search.simulations <= 3
+    assert search.value is None or search.value >= 37
@@ -0,0 +1,82 @@
+"""Sensibilité : pentes connues, pentes recalculées par simulations scalaires, bornes"""
+import random
+
+import pytest
+
+from conftest import random_config
+from main import SENSITIVITY_BOUNDS
+from sensitivity import run_sensitivity
+from simulation_engine import DetailLevel, result_statistics, simulate_config
+
+# Sans commande sur l'horizon : final_stock = initial_stock - daily_consumption x jours
+NO_ORDERS = {
+    "daily_consumption": 2.0, "initial_stock": 100.0, "reorder_threshold": 10.0, "max_stock": 120.0,
+    "min_order_quantity": 4, "max_order_quantity": 20, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 28, "min_stock_to_start_sales": 0.0, "start_date": "2024-01-01",
+}
+DAYS = 28  # La consommation court aussi les jours fermés
+
+
+def rows_by_field(result):
+    return {row["field"]: row for row in result["sensitivities"]}
+
+
+def test_known_slopes_without_orders():
+    result = run_sensitivity(NO_ORDERS, 0.1, statistics=("final_stock", "total_orders"))
+    assert result["is_base_valid"]
+    assert result["base"] == {"final_stock": 100.0 - 2.0 * DAYS, "total_orders": 0}
+    rows = rows_by_field(result)
+
+    initial = rows["initial_stock"]
+    assert (initial["minus_value"], initial["plus_value"]) == (90.0, 110.0)
+    assert initial["statistics"]["final_stock"]["slope"] == pytest.approx(1.0)
+    assert initial["statistics"]["final_stock"]["elasticity"] == pytest.approx(100.0 / 44.0)
+
+    consumption = rows["daily_consumption"]["statistics"]["final_stock"]
+    assert consumption["slope"] == pytest.approx(-DAYS)
+    assert (consumption["minus"], consumption["plus"]) == pytest.approx((100.0 - 1.8 * DAYS, 100.0 - 2.2 * DAYS))
+
+    for name in ("max_stock", "lot_size", "delivery_lead_time_days", "min_stock_to_start_sales"):
+        assert rows[name]["statistics"]["final_stock"]["slope"] == 0.0, name
+        assert rows[name]["statistics"]["total_orders"]["slope"] == 0.0, name
+
+
+def test_slopes_match_scalar_simulations():
+    rng = random.Random(6)
+    statistics = ("final_stock", "min_stock", "stockouts_count", "average_stock")
+    for _ in range(10):
+        config = random_config(rng, simulation_days=rng.randint(20, 90))
+        result = run_sensitivity(config, 0.1, statistics=statistics, bounds=SENSITIVITY_BOUNDS)
+        base = result_statistics(simulate_config(config, DetailLevel.STATS))
+        assert result["base"] == {name: base[name] for name in statistics}
+        for row in result["sensitivities"]:
+            name = row["field"]
+            perturbed = {}
+            for side in ("minus", "plus"):
+                value = row[f"{side}_value"]
+                if value is not None:
+                    simulated = simulate_config({**config, name: value}, DetailLevel.STATS)
+                    perturbed[side] = (value, result_statistics(simulated))
+            low = perturbed.get("minus", (config[name], base))
+            high = perturbed.get("plus", (config[name], base))
+            for statistic in statistics:
+                entry = row["statistics"][statistic]
+                for side, (_, simulated) in perturbed.items():
+                    assert entry[side] == simulated[statistic]
+                if high[0] == low[0]:
+                    assert entry["slope"] is None
+                else:
+                    slope = (high[1][statistic] - low[1][statistic]) / (high[0] - low[0])
+                    assert entry["slope"] == pytest.approx(slope), (name, statistic)
+
+
+def test_bounds_and_business_rules_skip_perturbations():
+    result = run_sensitivity(NO_ORDERS, 0.1, fields=("initial_stock", "reorder_threshold", "min_order_quantity"),
+                             bounds={"initial_stock": (95.0, None)})
+    rows = rows_by_field(result)
+    # Hors bornes : seule la perturbation vers le haut, pente unilatérale
+    assert (rows["initial_stock"]["minus_value"], rows["initial_stock"]["plus_value"]) == (None, 110.0)
+    assert rows["initial_stock"]["statistics"]["final_stock"]["slope"] == pytest.approx(1.0)
+    # min_order_quantity perturbée d'un lot (multiple de lot_size)
+    assert (rows["min_order_quantity"]["minus_value"], rows["min_order_quantity"]["plus_value"]) == (2, 6)
+    assert result["simulations"] == 1 + 1 + 2 + 2
@@ -0,0 +1,70 @@
+"""/simulate/batch contre /simulate appelé configuration par configuration"""
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from conftest import random_config
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def api_configs(rng, count, **overrides):
+    """Configurations valides pour l'API (min_order_quantity >= 2)"""
+    configs = []
+    while len(configs) < count:
+        config = random_config(rng, **overrides)
+        if config["min_order_quantity"] >= 2:
+            configs.append(config)
+    return configs
+
+
+def batch_results(client, configs, **options):
+    response = client.post("/simulate/batch", json={"configs": configs, **options})
+    assert response.status_code == 200
+    return response.json()["results"]
+
+
+def test_default_matches_simulate_without_events(client, monkeypatch):
+    rng = random.Random(5)
+    configs = api_configs(rng, 12, simulation_days=rng.randint(7, 120))
+
+    def scalar(*args, **kwargs):
+        raise AssertionError("sans événements demandés, le moteur par lots est attendu")
+
+    fields = ["config", "orders", "daily_details", "statistics"]
+    expected = [client.post("/simulate", json={**config, "fields": fields}).json() for config in configs]
+    monkeypatch.setattr(main, "_simulation_payload", scalar)
+    results = batch_results(client, configs)
+    assert [entry["status_code"] for entry in results] == [200] * len(configs)
+    assert [entry["result"] for entry in results] == expected
+
+
+@pytest.mark.parametrize("fields", [
+    ["statistics"],
+    ["daily_details.stock_end", "statistics.final_stock"],
+    ["events", "statistics"],
+    ["orders.quantity", "config.lot_size"],
+])
+def test_projection_matches_simulate(client, fields):
+    rng = random.Random(len(fields))
+    configs = api_configs(rng, 6)
+    pages = {"daily_details": {"offset": 3, "limit": 10}, "events": {"date_from": "2024-01-10", "limit": 5}}
+    results = batch_results(client, configs, fields=fields, pages=pages)
+    expected = [
+        client.post("/simulate", json={**config, "fields": fields, "pages": pages}).json() for config in configs
+    ]
+    assert [entry["result"] for entry in results] == expected
+
+
+def test_invalid_config_reported_at_its_position(client):
+    rng = random.Random(9)
+    valid = api_configs(rng, 2)
+    configs = [valid[0], {**valid[1], "lot_size": 0}, valid[1]]
+    results = batch_results(client, configs, fields=["statistics"])
+    assert [entry["status_code"] for entry in results] == [200, 400, 200]
+    assert results[2]["result"] == client.post("/simulate", json={**configs[2], "fields": ["statistics"]}).json()
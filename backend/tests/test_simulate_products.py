@@ -0,0 +1,60 @@
+"""/simulate/products contre /simulate appelé produit par produit"""
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from conftest import random_config
+
+PRODUCT_FIELDS = ("daily_consumption", "initial_stock", "reorder_threshold", "max_stock", "min_order_quantity",
+                  "max_order_quantity", "lot_size", "delivery_lead_time_days", "min_stock_to_start_sales")
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def products(rng, count):
+    items = []
+    while len(items) < count:
+        config = random_config(rng)
+        if config["min_order_quantity"] >= 2:
+            items.append({"sku": f"parfum-{len(items)}", **{name: config[name] for name in PRODUCT_FIELDS}})
+    return items
+
+
+def test_products_match_per_product_simulate(client):
+    items = products(random.Random(21), 15)
+    body = {"products": items, "simulation_days": 75, "start_date": "2024-03-01",
+            "include_daily": True, "daily_fields": ["stock_end", "order_quantity", "has_stockout"]}
+    response = client.post("/simulate/products", json=body)
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["start_date"] == "2024-03-01T00:00:00" and payload["simulation_days"] == 75
+
+    stockouts = 0
+    for item, entry in zip(items, payload["products"], strict=True):
+        config = {name: item[name] for name in PRODUCT_FIELDS}
+        expected = client.post("/simulate", json={**config, "simulation_days": 75, "start_date": "2024-03-01"}).json()
+        assert entry["sku"] == item["sku"]
+        assert entry["statistics"] == expected["statistics"]
+        days = expected["daily_details"]
+        assert entry["daily"]["stock_end"] == [day["stock_end"] for day in days]
+        assert entry["daily"]["order_quantity"] == [day["order_quantity"] for day in days]
+        assert [bool(value) for value in entry["daily"]["has_stockout"]] == [day["has_stockout"] for day in days]
+        stockouts += expected["statistics"]["stockouts_count"] > 0
+    assert payload["summary"]["products"] == len(items)
+    assert payload["summary"]["products_with_stockouts"] == stockouts
+
+
+def test_invalid_products_and_fields_are_rejected(client):
+    items = products(random.Random(22), 2)
+    items[1] = {**items[1], "min_order_quantity": items[1]["lot_size"] * 2 + 1, "lot_size": 2}
+    response = client.post("/simulate/products", json={"products": items})
+    assert response.status_code == 400
+    assert response.json()["detail"][0].startswith("parfum-1: ")
+
+    response = client.post("/simulate/products", json={"products": items[:1], "daily_fields": ["unknown"]})
+    assert response.status_code == 400 and response.json()["detail"] == "Séries inconnues: unknown"
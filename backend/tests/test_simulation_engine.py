@@ -0,0 +1,139 @@
+"""Moteur scalaire : colonnes quotidiennes, calendrier des jours ouvrés, niveaux de détail"""
+import json
+import random
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conftest import random_config
+from simulation_engine import (
+    DailyDetailView,
+    DetailLevel,
+    InventorySimulator,
+    SimulationConfig,
+    WorkingCalendar,
+    _series_to_dicts,
+    analyze_stock_trend,
+    result_statistics,
+    result_to_dict,
+    run_simulation_with_config,
+    simulate_config,
+)
+
+
+def _json_row(detail):
+    return {**asdict(detail), "date": detail.date.isoformat()}
+
+
+def test_series_rows_match_json_rows():
+    rng = random.Random(1)
+    for _ in range(20):
+        result = simulate_config(random_config(rng, simulation_days=rng.randint(1, 120)), DetailLevel.FULL)
+        rows = result.series.rows()
+        assert len(rows) == len(result.series) == result.series.days
+        assert [_json_row(detail) for detail in rows] == _series_to_dicts(result.series)
+
+
+def test_detail_view_indexing_and_slices():
+    result = simulate_config(random_config(random.Random(2), simulation_days=50), DetailLevel.FULL)
+    rows = result.series.rows()
+    materialized = [result.series.row(day) for day in range(50)]
+    assert rows[-1] == materialized[-1] and rows[7] == materialized[7]
+    for window in (slice(-30, None), slice(5, 20, 3), slice(40, 10, -2), slice(60, None)):
+        view = rows[window]
+        assert isinstance(view, DailyDetailView)
+        assert list(view) == materialized[window]
+        assert list(view[1:4]) == materialized[window][1:4]
+    with pytest.raises(IndexError):
+        rows[50]
+
+
+@pytest.mark.parametrize("period", [7, 30, 200])
+def test_trend_on_view_matches_materialized_rows(period):
+    rng = random.Random(period)
+    for _ in range(10):
+        result = simulate_config(random_config(rng, simulation_days=rng.randint(10, 90)), DetailLevel.FULL)
+        rows = result.series.rows()
+        assert analyze_stock_trend(rows, period) == analyze_stock_trend(list(rows), period)
+
+
+def _naive_add_working_days(start, days, closed_weekdays, holidays):
+    """Parcours jour par jour (ancienne implémentation)"""
+    current, added = start, 0
+    while added < days:
+        current += timedelta(days=1)
+        if current.weekday() not in closed_weekdays and current.date() not in holidays:
+            added += 1
+    return current
+
+
+@pytest.mark.parametrize("closed_weekdays, holidays", [
+    ((6,), ()),
+    ((5, 6), (date(2024, 1, 1), date(2024, 5, 1), date(2024, 5, 8), date(2024, 12, 25))),
+    ((), (date(2024, 2, 29),)),
+    ((0, 1, 2, 3, 4, 5), ()),
+])
+def test_calendar_matches_day_by_day_walk(closed_weekdays, holidays):
+    start = datetime(2024, 1, 1)
+    calendar = WorkingCalendar(start, 10, closed_weekdays, holidays)
+    for day in range(0, 400, 7):
+        for days in (0, 1, 3, 7, 30):
+            expected = _naive_add_working_days(start + timedelta(days=day), days, closed_weekdays, holidays)
+            assert calendar.date(calendar.add_working_days(day, days)) == expected, (day, days)
+        current = start + timedelta(days=day)
+        assert calendar.is_working(day) == (current.weekday() not in closed_weekdays and current.date() not in holidays)
+    # L'index s'est étendu au-delà des 10 jours demandés
+    assert len(calendar) > 400
+
+
+def test_calendar_rejects_a_week_without_working_day():
+    with pytest.raises(ValueError, match="Au moins un jour"):
+        WorkingCalendar(datetime(2024, 1, 1), 10, range(7))
+
+
+def test_simulator_add_working_days_before_start_date():
+    simulator = InventorySimulator(SimulationConfig(), start_date=datetime(2024, 3, 4))
+    before = datetime(2024, 2, 28)
+    assert simulator.add_working_days(before, 4) == _naive_add_working_days(before, 4, (6,), ())
+    after = datetime(2024, 3, 9)
+    assert simulator.add_working_days(after, 3) == datetime(2024, 3, 13)
+
+
+STATS_COLUMNS = ("stock_start", "stock_end", "has_stockout")
+DAILY_COLUMNS = STATS_COLUMNS + ("is_working_day", "deliveries", "consumption", "order_quantity",
+                                 "order_id", "delivery_id", "has_threshold_crossed")
+
+
+def test_lower_detail_levels_match_full_simulation():
+    rng = random.Random(12)
+    for _ in range(40):
+        config = random_config(rng, simulation_days=rng.randint(1, 200))
+        full = simulate_config(config, DetailLevel.FULL)
+        assert len(full.events) == full.total_events
+        for level, columns in ((DetailLevel.STATS, STATS_COLUMNS), (DetailLevel.DAILY, DAILY_COLUMNS)):
+            result = simulate_config(config, level)
+            assert result.events == []
+            assert result_statistics(result) == result_statistics(full)
+            for name in columns:
+                assert list(getattr(result.series, name)) == list(getattr(full.series, name)), (level, name)
+        assert simulate_config(config, DetailLevel.DAILY).orders == full.orders
+
+
+def test_stats_level_response_keeps_only_filled_columns():
+    config = random_config(random.Random(13))
+    response = result_to_dict(simulate_config(config, DetailLevel.STATS), config, DetailLevel.STATS)
+    full = result_to_dict(simulate_config(config, DetailLevel.FULL), config)
+    assert response["events"] == [] and response["orders"] == []
+    assert response["statistics"] == full["statistics"]
+    assert response["daily_details"] == [{name: row[name] for name in STATS_COLUMNS} for row in full["daily_details"]]
+
+
+@pytest.mark.parametrize("level", list(DetailLevel))
+def test_native_result_converts_to_the_json_response(level):
+    rng = random.Random(14)
+    for _ in range(10):
+        config = random_config(rng, simulation_days=rng.randint(1, 90))
+        response = result_to_dict(simulate_config(config, level), config, level)
+        assert response == run_simulation_with_config(config, level)
+        assert json.loads(json.dumps(response)) == response
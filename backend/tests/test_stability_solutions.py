@@ -0,0 +1,109 @@
+"""
+find_stability_solutions et la phase 3 de calculate_equilibrium_point contre les parcours
+linéaires d'origine : les critères de stabilité et de viabilité ne sont pas monotones, les
+recherches doivent retourner le premier point viable de chaque réseau.
+"""
+import random
+
+import pytest
+
+from conftest import random_config
+from optimization_service import _check_viability, calculate_equilibrium_point
+from simulation_engine import DetailLevel, analyze_stock_trend, find_stability_solutions, simulate_config
+
+
+def _is_stable(config):
+    try:
+        result = simulate_config(config, DetailLevel.STATS)
+    except Exception:
+        return False
+    trend = analyze_stock_trend(result.daily_details, 30)
+    return result.stockouts_count == 0 and trend["trend"] in ["stable", "ascending"]
+
+
+def linear_scan(config_dict):
+    """Parcours de référence (version d'origine de find_stability_solutions)"""
+    max_viable_consumption = None
+    test_consumption = config_dict["daily_consumption"]
+    while test_consumption >= 0.5:
+        if _is_stable({**config_dict, "daily_consumption": test_consumption, "simulation_days": 60}):
+            max_viable_consumption = test_consumption
+            break
+        test_consumption -= 0.5
+        if test_consumption < 0.5:
+            break
+
+    min_required_max_order = None
+    test_max_order = config_dict["max_order_quantity"]
+    while test_max_order <= 50:
+        if test_max_order % config_dict["lot_size"] != 0:
+            test_max_order += 1
+            continue
+        if _is_stable({**config_dict, "max_order_quantity": test_max_order, "simulation_days": 60}):
+            min_required_max_order = test_max_order
+            break
+        test_max_order += config_dict["lot_size"]
+    return max_viable_consumption, min_required_max_order
+
+
+EXAMPLE = {
+    "daily_consumption": 4.25, "initial_stock": 45.0, "reorder_threshold": 36.0, "max_stock": 45.0,
+    "min_order_quantity": 2, "max_order_quantity": 10, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 60, "min_stock_to_start_sales": 36.0, "start_date": "2024-01-01",
+}
+
+
+@pytest.mark.parametrize("search_width", [1, 7])
+def test_matches_linear_scan(search_width):
+    rng = random.Random(11)
+    for config in [EXAMPLE] + [random_config(rng) for _ in range(60)]:
+        solutions = find_stability_solutions(config, search_width=search_width)
+        found = (solutions["max_viable_consumption"], solutions["min_required_max_order"])
+        assert found == linear_scan(config), config
+
+
+def min_required_max_order_scan(config_dict):
+    """Parcours de référence de la phase 3 de calculate_equilibrium_point (version d'origine)"""
+    lot_size = config_dict["lot_size"]
+    current_max_order = config_dict["max_order_quantity"]
+    threshold = config_dict["reorder_threshold"]
+    min_order, max_order = lot_size, current_max_order * 3
+    if _check_viability(simulate_config(config_dict), threshold):
+        max_order = current_max_order
+    else:
+        min_order = current_max_order
+    for test_order in range(min_order, max_order + lot_size, lot_size):
+        if _check_viability(simulate_config({**config_dict, "max_order_quantity": test_order}), threshold):
+            return test_order
+    return None
+
+
+NON_MONOTONE_ORDER = {
+    "daily_consumption": 9.22, "initial_stock": 30.38, "reorder_threshold": 23.07, "max_stock": 61.97,
+    "min_order_quantity": 4, "max_order_quantity": 10, "lot_size": 2, "delivery_lead_time_days": 1,
+    "simulation_days": 60, "min_stock_to_start_sales": 23.07, "start_date": "2024-03-07",
+}
+
+
+@pytest.mark.parametrize("search_width", [1, 7])
+def test_min_required_max_order_matches_linear_scan(search_width):
+    rng = random.Random(13)
+    for config in [NON_MONOTONE_ORDER] + [random_config(rng) for _ in range(60)]:
+        found = calculate_equilibrium_point(config, search_width=search_width)["equilibrium_analysis"]["min_required_max_order"]
+        assert found == min_required_max_order_scan(config), config
+
+
+@pytest.mark.parametrize("search_width", [3, 7, 15])
+def test_k_ary_equilibrium_matches_sequential(search_width):
+    rng = random.Random(search_width)
+    for config in [EXAMPLE, NON_MONOTONE_ORDER] + [random_config(rng) for _ in range(20)]:
+        sequential = calculate_equilibrium_point(config)
+        k_ary = calculate_equilibrium_point(config, search_width=search_width)
+        for key in ("current_status", "equilibrium_analysis", "optimal_configuration", "recommendations",
+                    "tested_scenarios"):
+            assert k_ary[key] == sequential[key], (config, key)
+        for search in ("max_viable_consumption", "min_required_max_order"):
+            found, expected = k_ary["search_statistics"][search], sequential["search_statistics"][search]
+            assert (found["value"], found["low"], found["high"]) == (expected["value"], expected["low"], expected["high"])
+        # Les points spéculés en trop coûtent des simulations, jamais un résultat différent
+        assert k_ary["search_statistics"]["total_simulations"] >= sequential["search_statistics"]["total_simulations"]
@@ -0,0 +1,56 @@
+"""Grille de /sweep contre _check_viability et les statistiques de chaque configuration"""
+import base64
+import itertools
+import math
+
+import numpy as np
+
+from optimization_service import _check_viability
+from simulation_engine import DetailLevel, result_statistics, simulate_config
+from sweep import SWEEP_STATISTICS, encode_array, run_sweep
+
+BASE = {
+    "daily_consumption": 4.25, "initial_stock": 45.0, "reorder_threshold": 36.0, "max_stock": 60.0,
+    "min_order_quantity": 4, "max_order_quantity": 20, "lot_size": 2, "delivery_lead_time_days": 3,
+    "simulation_days": 90, "min_stock_to_start_sales": 20.0, "start_date": "2024-01-01",
+}
+AXES = [
+    ("daily_consumption", [2.0, 4.25, 6.5, 9.0]),
+    ("max_order_quantity", [2, 8, 14, 20, 26]),
+    ("reorder_threshold", [10.0, 30.0, 50.0]),
+]
+
+
+def test_grid_matches_per_config_viability_and_statistics():
+    grid = run_sweep(BASE, AXES, SWEEP_STATISTICS)
+    shape = tuple(len(values) for _, values in AXES)
+    assert grid["valid"].shape == grid["viable"].shape == shape
+
+    for index in itertools.product(*(range(n) for n in shape)):
+        config = {**BASE, **{name: values[i] for (name, values), i in zip(AXES, index)}}
+        valid = (config["max_order_quantity"] >= config["min_order_quantity"]
+                 and config["reorder_threshold"] < config["initial_stock"])
+        assert grid["valid"][index] == valid, config
+        if not valid:
+            assert not grid["viable"][index]
+            assert math.isnan(grid["final_stock"][index]) and grid["stockouts_count"][index] == 0
+            continue
+        result = simulate_config(config, DetailLevel.DAILY)
+        assert grid["viable"][index] == _check_viability(result, config["reorder_threshold"]), config
+        statistics = result_statistics(result)
+        for name in SWEEP_STATISTICS:
+            assert grid[name][index] == statistics[name], (config, name)
+
+
+def test_grid_has_both_verdicts():
+    viable = run_sweep(BASE, AXES)["viable"]
+    assert viable.any() and not viable.all()
+
+
+def test_encode_array_round_trip():
+    values = np.array([[1.5, np.nan], [3.0, -2.25]])
+    encoded = encode_array(values)
+    assert encoded == {"dtype": "<f8", "shape": [2, 2], "data": [[1.5, None], [3.0, -2.25]]}
+    encoded = encode_array(values, "base64")
+    decoded = np.frombuffer(base64.b64decode(encoded["data"]), dtype=encoded["dtype"]).reshape(encoded["shape"])
+    np.testing.assert_array_equal(decoded, values)
@@ -0,0 +1,94 @@
+"""Négociation du format (Accept, q-values) et aller-retour en colonnes contre project_result"""
+import json
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import wire_format
+from conftest import random_config
+from projection import Page, Projection, project_result
+from simulation_engine import DetailLevel, simulate_config
+from wire_format import ARROW, COLUMNAR_JSON, JSON, MSGPACK, columnar_result, encode, negotiate
+
+
+@pytest.fixture
+def all_formats(monkeypatch):
+    monkeypatch.setattr(wire_format, "available_media_types", lambda: [JSON, COLUMNAR_JSON, MSGPACK, ARROW])
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON),
+    ("", JSON),
+    ("*/*", JSON),
+    ("application/*;q=0.8", JSON),
+    (f"{MSGPACK};q=0.5, {COLUMNAR_JSON};q=0.9", COLUMNAR_JSON),
+    (f"{COLUMNAR_JSON};q=0.4, {ARROW}", ARROW),
+    (f"{ARROW}, {MSGPACK}", ARROW),
+    (f"{MSGPACK}, {ARROW}", MSGPACK),
+    ("application/x-msgpack", MSGPACK),
+    (f"{ARROW};q=0, */*;q=0.1", JSON),
+    (f"{ARROW};q=abc, {COLUMNAR_JSON};q=0.2", COLUMNAR_JSON),
+    ("text/html, image/png;q=0.9", None),
+    (f"{ARROW};q=0", None),
+])
+def test_negotiate_q_values(all_formats, accept, expected):
+    assert negotiate(accept) == expected
+
+
+def test_negotiate_skips_unavailable_formats(monkeypatch):
+    monkeypatch.setattr(wire_format, "available_media_types", lambda: [JSON, COLUMNAR_JSON])
+    assert negotiate(f"{MSGPACK}, {COLUMNAR_JSON};q=0.5") == COLUMNAR_JSON
+    assert negotiate(MSGPACK) is None
+
+
+def _decode(column):
+    if column["dtype"] == "str":
+        return column["data"]
+    return np.array(column["data"], dtype=np.dtype(column["dtype"])).tolist()
+
+
+def _rows(section):
+    """Lignes reconstruites depuis les colonnes décodées"""
+    columns = {name: _decode(column) for name, column in section["columns"].items()}
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def _with_zero_ids(row, names):
+    """Identifiants absents : None en JSON, 0 en colonnes"""
+    return {**row, **{name: row[name] or 0 for name in names if name in row}}
+
+
+def test_columnar_round_trip_matches_project_result():
+    rng = random.Random(8)
+    projection = Projection.parse(None)
+    pages = {"daily_details": Page(offset=4, limit=20), "events": Page(date_from=datetime(2024, 1, 15), limit=30)}
+    for _ in range(10):
+        config = random_config(rng, simulation_days=rng.randint(20, 90), start_date="2024-01-01")
+        result = simulate_config(config, DetailLevel.FULL)
+        expected = project_result(result, config, projection, pages)
+        decoded = json.loads(encode(columnar_result(result, config, projection, pages), COLUMNAR_JSON))
+        start = datetime.fromisoformat(decoded["start_date"])
+
+        assert decoded["config"] == expected["config"]
+        assert decoded["statistics"] == expected["statistics"]
+        assert decoded["pagination"] == expected["pagination"]
+
+        daily = decoded["daily_details"]
+        assert daily["days"] == len(expected["daily_details"])
+        for offset, (row, full) in enumerate(zip(_rows(daily), expected["daily_details"], strict=True)):
+            assert (start + timedelta(days=daily["first_day"] + offset)).isoformat() == full["date"]
+            assert row == {name: value for name, value in _with_zero_ids(full, ("order_id", "delivery_id")).items()
+                           if name in row}
+
+        for row, full in zip(_rows(decoded["events"]), expected["events"], strict=True):
+            day = start + timedelta(days=row.pop("date"))
+            assert day.date() == datetime.fromisoformat(full.pop("date")).date()
+            assert row == _with_zero_ids(full, ("order_id",))
+
+        for row, full in zip(_rows(decoded["orders"]), expected["orders"], strict=True):
+            for name in ("order_date", "delivery_date"):
+                day = start + timedelta(days=row.pop(name))
+                assert day.date() == datetime.fromisoformat(full.pop(name)).date()
+            assert row == full
@@ -0,0 +1,236 @@
+"""
+Encodage en colonnes des résultats de /simulate, choisi par négociation de contenu (Accept).
+
+Au lieu d'une liste d'objets par jour (clés répétées à chaque ligne), chaque champ est un
+tableau typé construit directement depuis les colonnes de DailySeries, sans passer par
+des dicts par ligne. Les dates sont une date de début plus des décalages en jours
+("first_day" pour les jours ; colonnes de dates des événements et des commandes).
+Les identifiants absents valent 0, comme dans DailySeries.
+
+Formats :
+- application/json : réponse habituelle (lignes JSON)
+- application/vnd.inventory.columnar+json : colonnes JSON (encode_array, format "list")
+- application/msgpack : mêmes colonnes, tableaux en octets little-endian (module msgpack)
+- application/vnd.apache.arrow.stream : table Arrow IPC des détails quotidiens, config et
+  statistiques en métadonnées du schéma (module pyarrow)
+
+msgpack et pyarrow sont optionnels : sans eux, leurs formats ne sont pas proposés.
+"""
+import importlib
+import json
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from projection import Page, Projection, _days_page, _events_page
+from simulation_engine import SimulationEvent, SimulationResult, result_statistics
+from sweep import encode_array
+
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.inventory.columnar+json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+# Alias courants -> type servi
+_MEDIA_ALIASES = {"application/x-msgpack": MSGPACK, "application/vnd.msgpack": MSGPACK}
+_OPTIONAL_MODULES = {MSGPACK: "msgpack", ARROW: "pyarrow"}
+
+# Colonne de DailySeries -> dtype NumPy de la colonne exposée
+DAILY_COLUMNS: Dict[str, np.dtype] = {
+    "is_working_day": np.dtype(np.bool_),
+    "stock_start": np.dtype(np.float64),
+    "deliveries": np.dtype(np.float64),
+    "consumption": np.dtype(np.float64),
+    "stock_end": np.dtype(np.float64),
+    "order_quantity": np.dtype(np.int64),
+    "order_id": np.dtype(np.int64),
+    "delivery_id": np.dtype(np.int64),
+    "has_threshold_crossed": np.dtype(np.bool_),
+    "has_stockout": np.dtype(np.bool_),
+}
+EVENT_COLUMNS: Dict[str, np.dtype] = {
+    "stock_before": np.dtype(np.float64),
+    "stock_after": np.dtype(np.float64),
+    "quantity": np.dtype(np.float64),
+    "is_working_day": np.dtype(np.bool_),
+    "order_id": np.dtype(np.int64),
+}
+_EVENT_TEXT = ("event_type", "description")
+
+
+@lru_cache(maxsize=None)
+def _module_available(name: str) -> bool:
+    try:
+        importlib.import_module(name)
+        return True
+    except ImportError:
+        return False
+
+
+def available_media_types() -> List[str]:
+    """Formats servis, dans l'ordre de préférence à qualité égale"""
+    return [media_type for media_type in (JSON, COLUMNAR_JSON, MSGPACK, ARROW)
+            if media_type not in _OPTIONAL_MODULES or _module_available(_OPTIONAL_MODULES[media_type])]
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    Format de réponse pour l'en-tête Accept : JSON si absent ou générique,
+    None si aucun format accepté n'est disponible (406).
+    """
+    if not accept:
+        return JSON
+    available = available_media_types()
+    candidates: List[Tuple[float, int, str]] = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *parameters = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, media_type.lower()))
+    for _, _, media_type in sorted(candidates):
+        media_type = _MEDIA_ALIASES.get(media_type, media_type)
+        if media_type in ("*/*", "application/*"):
+            return JSON
+        if media_type in available:
+            return media_type
+    return None
+
+
+def columnar_result(
+    result: SimulationResult,
+    config_dict: Dict,
+    projection: Projection,
+    pages: Optional[Dict[str, Page]] = None
+) -> Dict:
+    """
+    Résultat en colonnes NumPy (mêmes sections, champs et pagination que project_result).
+    Les champs dérivés des dates (date, day_of_week) et orders_placed (order_id != 0)
+    ne sont pas transmis.
+    """
+    pages = pages or {}
+    series = result.series
+    start_date = series.start_date
+    response: Dict = {"start_date": start_date.isoformat()}
+    pagination: Dict = {}
+    for section in projection.sections:
+        names = projection.fields_of(section)
+        if section == "config":
+            response["config"] = {name: config_dict[name] for name in names if name in config_dict}
+        elif section == "statistics":
+            statistics = result_statistics(result)
+            response["statistics"] = {name: statistics[name] for name in names}
+        elif section == "daily_details":
+            days, pagination["daily_details"] = _days_page(series, pages.get("daily_details"))
+            response["daily_details"] = {
+                "first_day": days.start,
+                "days": len(days),
+                "columns": {
+                    name: _series_column(getattr(series, name), DAILY_COLUMNS[name])[days.start:days.stop]
+                    for name in names if name in DAILY_COLUMNS
+                }
+            }
+        elif section == "events":
+            events, pagination["events"] = _events_page(result.events, pages.get("events"))
+            response["events"] = {"columns": _event_columns(events, names, start_date)}
+        else:
+            orders = result.orders
+            columns = {
+                "order_id": np.array([o.order_id for o in orders], dtype=np.int64),
+                "order_date": _day_offsets([o.order_date for o in orders], start_date),
+                "delivery_date": _day_offsets([o.delivery_date for o in orders], start_date),
+                "quantity": np.array([o.quantity for o in orders], dtype=np.int64),
+                "delivered": np.array([o.delivered for o in orders], dtype=np.bool_),
+            }
+            response["orders"] = {"columns": {name: columns[name] for name in names}}
+    pagination = {section: page for section, page in pagination.items() if page is not None}
+    if pagination:
+        response["pagination"] = pagination
+    return response
+
+
+def encode(columnar: Dict, media_type: str) -> bytes:
+    """Sérialise un résultat de columnar_result dans le format négocié (hors JSON en lignes)"""
+    if media_type == COLUMNAR_JSON:
+        return json.dumps(_encode_columns(columnar, binary=False), separators=(",", ":")).encode("utf-8")
+    if media_type == MSGPACK:
+        import msgpack  # Dépendance optionnelle (available_media_types)
+        return msgpack.packb(_encode_columns(columnar, binary=True), use_bin_type=True)
+    if media_type == ARROW:
+        return _encode_arrow(columnar)
+    raise ValueError(f"Format non supporté: {media_type}")
+
+
+def _series_column(values, dtype: np.dtype) -> np.ndarray:
+    """Vue NumPy sans copie d'une colonne array.array de DailySeries"""
+    if dtype == np.bool_:
+        return np.frombuffer(values, dtype=np.int8).view(np.bool_)
+    return np.frombuffer(values, dtype=dtype)
+
+
+def _day_offsets(dates: List[datetime], start_date: datetime) -> np.ndarray:
+    return np.array([(date - start_date).days for date in dates], dtype=np.int64)
+
+
+def _event_columns(events: List[SimulationEvent], names: Tuple[str, ...], start_date: datetime) -> Dict:
+    columns: Dict = {}
+    for name in names:
+        if name == "date":
+            columns["date"] = _day_offsets([e.date for e in events], start_date)
+        elif name == "event_type":
+            columns[name] = [e.event_type.value for e in events]
+        elif name == "description":
+            columns[name] = [e.description for e in events]
+        elif name == "order_id":
+            columns[name] = np.array([e.order_id or 0 for e in events], dtype=np.int64)
+        else:
+            columns[name] = np.array([getattr(e, name) for e in events], dtype=EVENT_COLUMNS[name])
+    return columns
+
+
+def _encode_columns(columnar: Dict, binary: bool) -> Dict:
+    """Remplace les tableaux NumPy : encode_array (JSON) ou octets little-endian (msgpack)"""
+    encoded = {}
+    for key, value in columnar.items():
+        if isinstance(value, dict) and key != "config" and key != "statistics":
+            encoded[key] = _encode_columns(value, binary)
+        elif isinstance(value, np.ndarray):
+            encoded[key] = _binary_array(value) if binary else encode_array(value)
+        elif isinstance(value, list) and key in _EVENT_TEXT:
+            encoded[key] = {"dtype": "str", "shape": [len(value)], "data": value}
+        else:
+            encoded[key] = value
+    return encoded
+
+
+def _binary_array(values: np.ndarray) -> Dict:
+    values = np.ascontiguousarray(values)
+    values = values.astype(values.dtype.newbyteorder("<"), copy=False)
+    return {"dtype": values.dtype.str, "shape": list(values.shape), "data": values.tobytes()}
+
+
+def _encode_arrow(columnar: Dict) -> bytes:
+    """Flux Arrow IPC : une ligne par jour (date + colonnes), le reste en métadonnées"""
+    import pyarrow as pa  # Dépendance optionnelle (available_media_types)
+
+    daily = columnar.get("daily_details", {"first_day": 0, "days": 0, "columns": {}})
+    start = np.datetime64(columnar["start_date"], "D")
+    dates = start + np.arange(daily["first_day"], daily["first_day"] + daily["days"])
+    table = pa.table({"date": pa.array(dates), **{name: pa.array(values) for name, values in daily["columns"].items()}})
+    metadata = {
+        key: json.dumps(value, default=lambda item: item.item())
+        for key, value in columnar.items() if key in ("config", "statistics", "pagination", "start_date")
+    }
+    table = table.replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
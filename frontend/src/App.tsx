@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { ConfigModal } from './components/ConfigModal';
 import { StockChart } from './components/StockChart';
 import { EventsCalendar } from './components/EventsCalendar';
@@ -18,6 +18,44 @@ const GRAMS_PER_BALL = 85;
 const GRAMS_PER_ASAFATE = 4000;
 const BALLS_PER_ASAFATE = GRAMS_PER_ASAFATE / GRAMS_PER_BALL;
 const STORAGE_KEY = 'simulation_config';
+// Identifiant de session : une nouvelle optimisation annule la précédente côté serveur
+const SESSION_ID = Math.random().toString(36).slice(2) + Date.now().toString(36);
+// Dernières réponses par requête, avec leur ETag : réutilisées quand l'API répond 304
+const ETAG_CACHE_SIZE = 20;
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
+const postWithEtag = async (
+  path: string,
+  body: unknown,
+  init: RequestInit = {}
+): Promise<{ ok: boolean; data: any }> => {
+  const payload = JSON.stringify(body);
+  const key = `${path} ${payload}`;
+  const cached = etagCache.get(key);
+  const response = await fetch(`${API_URL}${path}`, {
+    ...init,
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(cached ? { 'If-None-Match': cached.etag } : {}),
+      ...init.headers,
+    },
+    body: payload,
+  });
+  if (response.status === 304 && cached) {
+    return { ok: true, data: cached.data };
+  }
+  const data = await response.json();
+  const etag = response.headers.get('ETag');
+  if (response.ok && etag) {
+    etagCache.delete(key);
+    etagCache.set(key, { etag, data });
+    if (etagCache.size > ETAG_CACHE_SIZE) {
+      etagCache.delete(etagCache.keys().next().value as string);
+    }
+  }
+  return { ok: response.ok, data };
+};
 
 const defaultConfig: SimulationConfig = {
   daily_consumption: 100 / BALLS_PER_ASAFATE,
@@ -64,6 +102,7 @@ function App() {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [isConfigModalOpen, setIsConfigModalOpen] = useState(false);
+  const optimizationAbort = useRef<AbortController | null>(null);
 
   // Exposer des fonctions de débogage dans la console
   useEffect(() => {
@@ -100,36 +139,30 @@ function App() {
 
     try {
       // Lancer la simulation
-      const simResponse = await fetch(`${API_URL}/simulate`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(configToRun),
-      });
+      const simResponse = await postWithEtag('/simulate', configToRun);
 
       if (!simResponse.ok) {
-        const errorData = await simResponse.json();
-        throw new Error(errorData.detail || 'Erreur lors de la simulation');
+        throw new Error(simResponse.data.detail || 'Erreur lors de la simulation');
       }
 
-      const simData: SimulationResult = await simResponse.json();
+      const simData: SimulationResult = simResponse.data;
       setSimulationResult(simData);
 
-      // Lancer l'optimisation
-      const optimizationResponse = await fetch(`${API_URL}/optimize`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(configToRun),
+      // Lancer l'optimisation (en abandonnant celle qui serait encore en cours)
+      optimizationAbort.current?.abort();
+      const controller = new AbortController();
+      optimizationAbort.current = controller;
+      const optimizationResponse = await postWithEtag('/optimize', configToRun, {
+        headers: { 'X-Session-Id': SESSION_ID },
+        signal: controller.signal,
       });
 
       if (optimizationResponse.ok) {
-        const optimizationData = await optimizationResponse.json();
-        setOptimizationResult(optimizationData);
+        setOptimizationResult(optimizationResponse.data);
       }
     } catch (err) {
+      // Optimisation remplacée par une plus récente : pas une erreur
+      if (err instanceof DOMException && err.name === 'AbortError') return;
       setError(err instanceof Error ? err.message : 'Une erreur est survenue');
       console.error('Erreur:', err);
     } finally {